@@ -0,0 +1,152 @@
+"""
+A host-side stand-in for the SPIKE firmware's ``hub`` module
+
+This lets spikedev run, be profiled and be benchmarked on Linux. Put the
+``simulator`` directory in front of the repo on ``PYTHONPATH`` so that both
+``import hub`` and ``import utime`` resolve here:
+
+.. code:: bash
+
+    PYTHONPATH=simulator:. python3 demo/sensors/button.py
+
+Every port starts out with a motor attached (``hub.port.X.motor``) and a
+sensor device (``hub.port.X.device``), ``hub.motion`` is a virtual IMU. Simulated
+time only moves when the code under test sleeps, so blocking calls such as
+``Motor.run_for_degrees`` return as soon as the host has done the bookkeeping.
+
+Anything prefixed with ``sim_`` does not exist on the real hub.
+"""
+
+# standard libraries
+from simclock import clock
+
+from ._button import SimButton, SimButtons  # noqa: F401
+from ._device import SimDevice
+from ._display import Image, SimDisplay  # noqa: F401
+from ._motion import SimMotion
+from ._motor import DEFAULT_MAX_DPS, SimMotor, SimMotorPair  # noqa: F401
+
+PORT_LETTERS = ("A", "B", "C", "D", "E", "F")
+
+
+class SimPort:
+    """
+    A simulated ``hub.port.X``
+    """
+
+    def __init__(self, letter):
+        self.letter = letter
+        self.motor = SimMotor(letter)
+        self.device = SimDevice(letter)
+
+    def __str__(self):
+        return "Port({})".format(self.letter)
+
+    def __repr__(self):
+        return str(self)
+
+    def info(self):
+        if self.motor is None:
+            return {"type": None}
+        return {"type": 48 if self.motor.max_dps == DEFAULT_MAX_DPS else 49}
+
+
+class SimPorts:
+    """
+    The ``hub.port`` namespace
+    """
+
+    def __init__(self):
+        for letter in PORT_LETTERS:
+            setattr(self, letter, SimPort(letter))
+
+    def __iter__(self):
+        return iter([getattr(self, letter) for letter in PORT_LETTERS])
+
+
+port = SimPorts()
+button = SimButtons()
+display = SimDisplay()
+motion = SimMotion()
+
+# set by sim_use_physics()
+sim_physics = None
+
+
+def sim_reset():
+    """
+    Rewind the virtual clock and put every port, button, the display and the IMU
+    back into their power-on state. ``hub.port.X`` objects are reset in place so
+    references already held by the code under test stay valid.
+    """
+    global sim_physics
+    clock.reset()
+    sim_physics = None
+
+    for sim_port in port:
+        sim_port.__init__(sim_port.letter)
+
+    for name in ("left", "right", "center", "connect"):
+        getattr(button, name).__init__(name)
+
+    display.__init__()
+    motion.__init__()
+
+
+def sim_attach_motor(letter, max_dps=DEFAULT_MAX_DPS):
+    """
+    Attach a motor that does ``max_dps`` degrees-per-second at 100% to port ``letter``
+
+    Returns:
+        SimMotor: the new motor
+    """
+    sim_port = getattr(port, letter)
+
+    if sim_physics is None:
+        sim_port.motor = SimMotor(letter, max_dps=max_dps)
+    else:
+        sim_port.motor = sim_physics.attach_motor(letter, PORT_LETTERS.index(letter), max_dps)
+
+    return sim_port.motor
+
+
+def sim_attach_sensor(letter):
+    """
+    Attach a sensor, and nothing else, to port ``letter``
+
+    Returns:
+        SimDevice: the new sensor device
+    """
+    sim_port = getattr(port, letter)
+    sim_port.motor = None
+    sim_port.device = SimDevice(letter)
+    return sim_port.device
+
+
+def sim_use_physics(step_ms=1):
+    """
+    Replace the ideal motor model on every port with the time-stepped physics
+    model in ``simulator/physics.py``. This needs NumPy. Call it before creating
+    any spikedev motors, motors already attached keep their ``max_dps``.
+
+    Args:
+        step_ms (int): the physics integration step
+
+    Returns:
+        physics.PhysicsWorld: use ``add_chassis()`` on this to track a robot's pose
+    """
+    global sim_physics
+
+    # third party libraries
+    from physics import PhysicsWorld
+
+    if sim_physics is not None:
+        sim_physics.close()
+
+    sim_physics = PhysicsWorld(len(PORT_LETTERS), step_ms=step_ms)
+
+    for (index, sim_port) in enumerate(port):
+        if sim_port.motor is not None:
+            sim_port.motor = sim_physics.attach_motor(sim_port.letter, index, sim_port.motor.max_dps)
+
+    return sim_physics
@@ -0,0 +1,85 @@
+"""
+Simulated ``hub.button.X``
+"""
+
+# standard libraries
+from simclock import clock
+
+
+class SimButton:
+    """
+    A simulated hub button. Use :meth:`sim_press`, :meth:`sim_release` and
+    :meth:`sim_bump` to drive it from a test or benchmark.
+
+    Args:
+        name (str): left, right, center or connect
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._pressed = False
+        self._was_pressed = False
+        self._presses = 0
+        self._pressed_us = 0
+        self._callback = None
+
+    def __str__(self):
+        return "Button({})".format(self.name)
+
+    def is_pressed(self):
+        return self._pressed
+
+    def was_pressed(self):
+        result = self._was_pressed
+        self._was_pressed = False
+        return result
+
+    def presses(self):
+        result = self._presses
+        self._presses = 0
+        return result
+
+    def callback(self, *args):
+        if not args:
+            return self._callback
+        self._callback = args[0]
+
+    def sim_press(self):
+        if self._pressed:
+            return
+
+        self._pressed = True
+        self._was_pressed = True
+        self._presses += 1
+        self._pressed_us = clock.now_us
+
+        if self._callback is not None:
+            self._callback(0)
+
+    def sim_release(self):
+        if not self._pressed:
+            return
+
+        self._pressed = False
+
+        if self._callback is not None:
+            self._callback((clock.now_us - self._pressed_us) // 1000)
+
+    def sim_bump(self, after_ms=0, held_ms=100):
+        """
+        Press the button ``after_ms`` from now and release it ``held_ms`` later
+        """
+        clock.call_later(after_ms * 1000, self.sim_press)
+        clock.call_later((after_ms + held_ms) * 1000, self.sim_release)
+
+
+class SimButtons:
+    """
+    The ``hub.button`` namespace
+    """
+
+    def __init__(self):
+        self.left = SimButton("left")
+        self.right = SimButton("right")
+        self.center = SimButton("center")
+        self.connect = SimButton("connect")
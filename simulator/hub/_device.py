@@ -0,0 +1,72 @@
+"""
+Simulated ``hub.port.X.device`` for sensors
+"""
+
+# standard libraries
+from simclock import clock
+
+
+class SimDevice:
+    """
+    A simulated sensor. Readings come from a per-mode table that a test or
+    benchmark fills in via :meth:`sim_set`. A value can also be a callable,
+    which is called on every ``get()`` so readings can follow simulated time.
+
+    A real sensor takes a while to settle after a change of mode. Set
+    ``sim_switch_ms`` and every change of mode takes that long in simulated time.
+
+    Args:
+        port_letter (str): A, B, C, D, E or F
+    """
+
+    def __init__(self, port_letter):
+        self.port_letter = port_letter
+        self._mode = [(0, 0)]
+        self._values = {}
+        self.mode_switches = 0
+        self.sim_switch_ms = 0
+
+    def __str__(self):
+        return "Device(port {})".format(self.port_letter)
+
+    def sim_set(self, mode, values):
+        """
+        Set what ``get()`` returns while the device is in ``mode``
+
+        Args:
+            mode (int): the sensor mode
+            values (list, callable): the list of readings, or a function returning one
+        """
+        self._values[mode] = values
+
+    def mode(self, *args):
+        if not args:
+            return list(self._mode)
+
+        mode = args[0]
+
+        if isinstance(mode, int):
+            mode = [(mode, 0)]
+        else:
+            mode = [tuple(entry) for entry in mode]
+
+        if mode != self._mode:
+            self.mode_switches += 1
+
+            if self.sim_switch_ms:
+                clock.advance(self.sim_switch_ms * 1000)
+
+        self._mode = mode
+
+    def get(self, *args):
+        result = []
+
+        for (mode, _) in self._mode:
+            values = self._values.get(mode, [0])
+
+            if callable(values):
+                values = values()
+
+            result.extend(values)
+
+        return result
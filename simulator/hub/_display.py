@@ -0,0 +1,74 @@
+"""
+Simulated ``hub.display`` and ``hub.Image``
+"""
+
+
+class Image:
+    """
+    A 5x5 image described the same way as the firmware, ``"00900:00000:00000:00000:00000"``
+    """
+
+    def __init__(self, *args):
+        if len(args) == 1 and isinstance(args[0], str):
+            rows = args[0].rstrip(":").split(":")
+            self._width = max(len(row) for row in rows)
+            self._height = len(rows)
+            self._pixels = [[int(char) for char in row.ljust(self._width, "0")] for row in rows]
+        else:
+            (self._width, self._height) = (args[0], args[1]) if len(args) >= 2 else (5, 5)
+            self._pixels = [[0] * self._width for _ in range(self._height)]
+
+            if len(args) == 3:
+                for (index, value) in enumerate(args[2]):
+                    self._pixels[index // self._width][index % self._width] = value
+
+    def __repr__(self):
+        return "Image('{}')".format(str(self))
+
+    def __str__(self):
+        return ":".join("".join(str(value) for value in row) for row in self._pixels) + ":"
+
+    def __eq__(self, other):
+        return isinstance(other, Image) and self._pixels == other._pixels
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def get_pixel(self, x, y):
+        return self._pixels[y][x]
+
+    def set_pixel(self, x, y, value):
+        self._pixels[y][x] = value
+
+
+class SimDisplay:
+    """
+    The ``hub.display`` namespace. Everything shown is kept in :attr:`shown`.
+    """
+
+    def __init__(self):
+        self.shown = []
+        self._rotation = 0
+        self._pixels = Image(5, 5)
+
+    def show(self, image, delay=400, level=9, clear=False, wait=True, loop=False, fade=0):
+        self.shown.append(image)
+
+        if isinstance(image, Image):
+            self._pixels = image
+
+    def clear(self):
+        self._pixels = Image(5, 5)
+
+    def pixel(self, x, y, brightness=None):
+        if brightness is None:
+            return self._pixels.get_pixel(x, y)
+        self._pixels.set_pixel(x, y, brightness)
+
+    def rotation(self, rotation=None):
+        if rotation is None:
+            return self._rotation
+        self._rotation = rotation
@@ -0,0 +1,64 @@
+"""
+Simulated ``hub.motion``, a virtual IMU
+"""
+
+# standard libraries
+import math
+
+from simclock import clock
+
+
+class SimMotion:
+    """
+    A simulated IMU. Only yaw is modelled, pitch and roll are always 0.
+
+    Mount it on a physics chassis with :meth:`sim_mount` and yaw follows the chassis
+    heading, otherwise set it by hand with :meth:`sim_set_yaw`. Like the hub, yaw is in
+    whole degrees from -180 to 179, clockwise positive.
+
+    Args:
+        drift_dps (float): gyro drift in degrees-per-second, added to yaw as time passes
+    """
+
+    def __init__(self, drift_dps=0.0):
+        self.sim_drift_dps = drift_dps
+        self._chassis = None
+        self._robot = 0
+        self._yaw = 0.0
+        self._offset = 0.0
+        self._zero_us = clock.now_us
+
+    def __str__(self):
+        return "Motion"
+
+    def sim_mount(self, chassis, robot=0):
+        """
+        Make yaw follow ``chassis``, a :class:`physics.DifferentialPose` from ``PhysicsWorld.add_chassis()``
+        """
+        self._chassis = chassis
+        self._robot = robot
+        self._offset = 0.0
+        self._zero_us = clock.now_us
+
+    def sim_set_yaw(self, yaw):
+        """
+        Set the true yaw of an unmounted IMU
+        """
+        self._yaw = yaw
+
+    def _true_yaw(self):
+        if self._chassis is not None:
+            # the chassis heading is counter-clockwise positive radians
+            yaw = -math.degrees(self._chassis.heading[self._robot])
+        else:
+            yaw = self._yaw
+
+        return yaw + self.sim_drift_dps * (clock.now_us - self._zero_us) / 1000000
+
+    def yaw_pitch_roll(self, *args):
+        if args:
+            # preset the yaw
+            self._offset = args[0] - self._true_yaw()
+
+        yaw = int(round(self._true_yaw() + self._offset))
+        return ((yaw + 180) % 360 - 180, 0, 0)
@@ -0,0 +1,426 @@
+"""
+Simulated ``hub.port.X.motor`` and motor pairs
+
+The model is ideal kinematics: a motor reaches its commanded speed instantly and
+holds it until the move completes. Completion is computed analytically and
+scheduled on the virtual clock so a move costs a handful of Python calls no matter
+how long it runs in simulated time.
+
+``SimMotor.sim_jam()`` puts an obstacle in a motor's way so stall handling can be
+exercised, ``SimMotor.sim_load()`` a load that back-drives an idle motor.
+"""
+
+# standard libraries
+from simclock import clock
+
+# These mirror spikedev.motor.MotorCallbackEvent
+COMPLETED = 0
+INTERRUPTED = 1
+STALL = 2
+
+# These mirror spikedev.motor.MotorMode
+MODE_POWER = 0
+MODE_SPEED = 1
+MODE_POS = 2
+MODE_APOS = 3
+MODE_LOAD = 4
+MODE_CALIB = 5
+
+# A freshly connected motor reports speed, position, absolute position and power
+DEFAULT_MODE = [(MODE_SPEED, 0), (MODE_POS, 0), (MODE_APOS, 0), (MODE_POWER, 0)]
+
+# SPIKE medium motor, the default motor_class throughout spikedev
+DEFAULT_MAX_DPS = 810
+
+# How long the simulated firmware pushes against a jam before it reports STALL
+FIRMWARE_STALL_MS = 1000
+
+
+def _sign(value):
+    if value > 0:
+        return 1
+    elif value < 0:
+        return -1
+    return 0
+
+
+class SimMotor:
+    """
+    A simulated SPIKE motor
+
+    Args:
+        port_letter (str): A, B, C, D, E or F
+        max_dps (int): the degrees-per-second this motor does at 100% speed
+    """
+
+    def __init__(self, port_letter, max_dps=DEFAULT_MAX_DPS):
+        self.port_letter = port_letter
+        self.max_dps = max_dps
+        self._mode = list(DEFAULT_MODE)
+        self._callback = None
+        self._timer = None
+        self._owner = None
+
+        # see sim_jam(), max_power and stall are those of the last command
+        self._jam = None
+        self._stall_timer = None
+        self._max_power = 100
+        self._stall = True
+
+        # see sim_load()
+        self._load_dps = 0.0
+
+        # position is anchored at _anchor_pos at time _anchor_us and moves at _dps from there
+        self._anchor_pos = 0.0
+        self._anchor_us = clock.now_us
+        self._dps = 0.0
+        self._power = 0
+
+    def __str__(self):
+        return "Motor(port {})".format(self.port_letter)
+
+    # ------------------------------------------------------------------
+    # kinematic model
+    # ------------------------------------------------------------------
+    def _position(self):
+        # a load only moves the motor while it is not being driven
+        dps = self._dps if self._dps else self._load_dps
+        position = self._anchor_pos + dps * (clock.now_us - self._anchor_us) / 1000000
+
+        # the motor cannot get past a jam
+        if self._jam is not None and (position - self._jam[0]) * self._jam[1] > 0:
+            return self._jam[0]
+
+        return position
+
+    def _pinned(self):
+        # True while the motor is pushing against a jam
+        return self._jam is not None and self._position() == self._jam[0] and self._dps * self._jam[1] > 0
+
+    def _set_dps(self, dps, acceleration=None, deceleration=None):
+        self._anchor_pos = self._position()
+        self._anchor_us = clock.now_us
+        self._dps = float(dps)
+        self._power = int(round(dps * 100 / self.max_dps))
+        self._arm_stall()
+
+    def _arm_stall(self):
+        """
+        If the motor is heading into a jam, schedule the STALL the firmware would report
+        """
+        if self._stall_timer is not None:
+            clock.cancel(self._stall_timer)
+            self._stall_timer = None
+
+        if self._jam is None or not self._dps:
+            return
+
+        (position, side, break_power, stall_ms) = self._jam
+
+        if break_power is not None and self._max_power >= break_power:
+            # enough power to push through, the jam clears
+            self._jam = None
+            return
+
+        if self._dps * side > 0 and self._stall:
+            reach_us = max(0, (position - self._anchor_pos) * 1000000 / self._dps)
+            self._stall_timer = clock.call_later(reach_us + stall_ms * 1000, self._stalled)
+
+    def _stalled(self):
+        self._stall_timer = None
+
+        if self._owner is None:
+            self._set_dps(0)
+            self._notify(STALL)
+        else:
+            self._finish(self._jam[0], STALL)
+
+    def _blocked(self, target):
+        return self._jam is not None and (target - self._jam[0]) * self._jam[1] > 0
+
+    def _speed_to_dps(self, speed):
+        speed = max(-100, min(100, speed))
+        return speed * self.max_dps / 100
+
+    def _interrupt(self):
+        """
+        Stop tracking the in-flight command. Whoever was waiting on it is told it was interrupted.
+        """
+        if self._timer is not None:
+            clock.cancel(self._timer)
+            self._timer = None
+
+        owner = self._owner
+        self._owner = None
+
+        if owner is not None:
+            owner._notify(INTERRUPTED)
+
+    def _notify(self, reason):
+        if self._callback is not None:
+            # The firmware schedules callbacks instead of calling them from inside
+            # the motor API so we do the same
+            clock.call_later(0, self._callback, reason)
+
+    def _finish(self, position, reason=COMPLETED):
+        self._timer = None
+        owner = self._owner
+        self._owner = None
+        self._set_dps(0)
+        self._anchor_pos = float(position)
+
+        if owner is not None:
+            owner._notify(reason)
+
+    def _start_move(self, degrees, dps, owner, acceleration=None, deceleration=None):
+        """
+        Move ``degrees`` (always positive) in the direction of ``dps`` and notify ``owner`` when done.
+        The ideal model ignores ``acceleration`` and ``deceleration``.
+        """
+        self._interrupt()
+        start = self._position()
+        target = start + _sign(dps) * abs(degrees)
+        self._set_dps(dps)
+        self._owner = owner
+
+        # a move that runs into a jam never completes, it stalls or pushes forever
+        if dps and not self._blocked(target):
+            duration_us = abs(degrees) * 1000000 / abs(dps)
+            self._timer = clock.call_later(duration_us, self._finish, target)
+
+    def _start_timed(self, msec, dps, owner, acceleration=None, deceleration=None):
+        self._interrupt()
+        self._set_dps(dps)
+        self._owner = owner
+        self._timer = clock.call_later(msec * 1000, self._finish_timed)
+
+    def _finish_timed(self):
+        self._finish(self._position())
+
+    # ------------------------------------------------------------------
+    # hub.port.X.motor API
+    # ------------------------------------------------------------------
+    def mode(self, *args):
+        if not args:
+            return list(self._mode)
+
+        mode = args[0]
+
+        if isinstance(mode, int):
+            self._mode = [(mode, 0)]
+        else:
+            self._mode = [tuple(entry) for entry in mode]
+
+    def _mode_value(self, mode):
+        position = self._position()
+
+        if mode == MODE_POWER:
+            return self._power
+        elif mode == MODE_SPEED:
+            return 0 if self._pinned() else int(round(self._dps * 100 / self.max_dps))
+        elif mode == MODE_POS:
+            return int(round(position))
+        elif mode == MODE_APOS:
+            return int(round((position + 180) % 360 - 180))
+        return 0
+
+    def get(self, *args):
+        return [self._mode_value(mode) for (mode, _) in self._mode]
+
+    def callback(self, *args):
+        if not args:
+            return self._callback
+        self._callback = args[0]
+
+    def preset(self, position):
+        self._anchor_pos = float(position)
+        self._anchor_us = clock.now_us
+
+    def busy(self, busy_type=1):
+        if busy_type == 0:
+            return False
+        return self._dps != 0
+
+    def sim_jam(self, position, break_power=None, stall_ms=FIRMWARE_STALL_MS):
+        """
+        Put an obstacle at encoder ``position`` on whichever side of the motor it is now.
+        The motor stops dead there. If the command was started with ``stall=True``, the
+        firmware's default, it reports STALL after pushing for ``stall_ms``.
+
+        Args:
+            position (int): where the obstacle is, ``None`` to remove it
+            break_power (int): a command with at least this ``max_power`` pushes through and clears
+                the jam, ``None`` for an obstacle that never gives
+            stall_ms (int): how long the firmware pushes before reporting STALL
+        """
+        if position is None:
+            self._jam = None
+        else:
+            side = 1 if position >= self._position() else -1
+            self._jam = (float(position), side, break_power, stall_ms)
+
+        self._set_dps(self._dps)
+
+    def sim_load(self, dps):
+        """
+        Hang a load on the motor that turns it at ``dps`` whenever it is stopped, like an arm
+        sagging under its own weight. A running motor overpowers it.
+
+        Args:
+            dps (float): degrees per second, 0 to remove the load
+        """
+        self._set_dps(self._dps)
+        self._load_dps = float(dps)
+
+    def _command(self, max_power, stall):
+        self._max_power = max_power
+        self._stall = stall
+
+    def run_at_speed(self, speed, max_power=100, acceleration=100, deceleration=150, stall=True):
+        self._interrupt()
+        self._command(max_power, stall)
+        self._set_dps(self._speed_to_dps(speed), acceleration, deceleration)
+
+    def run_for_degrees(self, degrees, speed, max_power=100, stop=1, acceleration=100, deceleration=150, stall=True):
+        self._command(max_power, stall)
+        self._start_move(degrees, self._speed_to_dps(speed), self, acceleration, deceleration)
+
+    def run_to_position(self, position, speed, max_power=100, stop=1, acceleration=100, deceleration=150, stall=True):
+        self._command(max_power, stall)
+        delta = position - self._position()
+        dps = _sign(delta) * abs(self._speed_to_dps(speed))
+        self._start_move(abs(delta), dps, self, acceleration, deceleration)
+
+    def run_for_time(self, msec, speed, max_power=100, stop=1, acceleration=100, deceleration=150, stall=True):
+        self._command(max_power, stall)
+        self._start_timed(msec, self._speed_to_dps(speed), self, acceleration, deceleration)
+
+    def pwm(self, value):
+        self._interrupt()
+        self._set_dps(self._speed_to_dps(value))
+
+    def float(self):
+        self._interrupt()
+        self._set_dps(0)
+
+    def brake(self):
+        self._interrupt()
+        self._set_dps(0)
+
+    def hold(self):
+        self._interrupt()
+        self._set_dps(0)
+
+    def pair(self, other):
+        return SimMotorPair(self, other)
+
+
+class SimMotorPair:
+    """
+    A simulated ``hub.port.X.motor.pair()``
+    """
+
+    def __init__(self, primary, secondary):
+        self.primary = primary
+        self.secondary = secondary
+        self._callback = None
+        self._timer = None
+        self._pending = 0
+
+    def _notify(self, reason):
+        # Both motors report to us. A move is complete once every motor we are
+        # waiting on has completed, an interruption of either one ends it early.
+        if not self._pending:
+            return
+
+        if reason == COMPLETED:
+            self._pending -= 1
+
+            if self._pending:
+                return
+
+        self._pending = 0
+
+        if self._callback is not None:
+            clock.call_later(0, self._callback, reason)
+
+    def _interrupt(self):
+        if self._timer is not None:
+            clock.cancel(self._timer)
+            self._timer = None
+
+        self.primary._interrupt()
+        self.secondary._interrupt()
+
+    def _finish(self):
+        self._timer = None
+        self._pending = 0
+        self.primary._finish(self.primary._position())
+        self.secondary._finish(self.secondary._position())
+
+        if self._callback is not None:
+            clock.call_later(0, self._callback, COMPLETED)
+
+    def _start(self, duration_us, dps_primary, dps_secondary):
+        self._interrupt()
+        self.primary._set_dps(dps_primary)
+        self.secondary._set_dps(dps_secondary)
+        self.primary._owner = self
+        self.secondary._owner = self
+        self._pending = 1
+
+        if duration_us is not None:
+            self._timer = clock.call_later(duration_us, self._finish)
+
+    def callback(self, *args):
+        if not args:
+            return self._callback
+        self._callback = args[0]
+
+    def run_at_speed(self, speed_0, speed_1, max_power=100, acceleration=100, deceleration=150):
+        self._interrupt()
+        self.primary._set_dps(self.primary._speed_to_dps(speed_0))
+        self.secondary._set_dps(self.secondary._speed_to_dps(speed_1))
+
+    def run_for_degrees(self, degrees, speed_0, speed_1, max_power=100, stop=1, acceleration=100, deceleration=150):
+        dps_0 = self.primary._speed_to_dps(speed_0)
+        dps_1 = self.secondary._speed_to_dps(speed_1)
+
+        # the two motors combined move an average of ``degrees``
+        avg_dps = (abs(dps_0) + abs(dps_1)) / 2
+        duration_us = abs(degrees) * 1000000 / avg_dps if avg_dps else None
+        self._start(duration_us, dps_0, dps_1)
+
+    def run_to_position(self, position_0, position_1, speed, max_power=100, stop=1, acceleration=100, deceleration=150):
+        delta_0 = position_0 - self.primary._position()
+        delta_1 = position_1 - self.secondary._position()
+        longest = max(abs(delta_0), abs(delta_1))
+        dps = abs(self.primary._speed_to_dps(speed))
+
+        if not longest or not dps:
+            self._start(0, 0, 0)
+            return
+
+        duration_us = longest * 1000000 / dps
+        self._start(duration_us, delta_0 * 1000000 / duration_us, delta_1 * 1000000 / duration_us)
+
+    def run_for_time(self, msec, speed_0, speed_1, max_power=100, stop=1, acceleration=100, deceleration=150):
+        self._start(msec * 1000, self.primary._speed_to_dps(speed_0), self.secondary._speed_to_dps(speed_1))
+
+    def pwm(self, value_0, value_1):
+        self.run_at_speed(value_0, value_1)
+
+    def float(self):
+        self._interrupt()
+        self.primary._set_dps(0)
+        self.secondary._set_dps(0)
+
+    def brake(self):
+        self.float()
+
+    def hold(self):
+        self.float()
+
+    def unpair(self):
+        self._interrupt()
+        return True
@@ -0,0 +1,762 @@
+"""
+A vectorised, time-stepped physics backend for the ``hub`` simulator
+
+Where the default simulator model is ideal (motors jump to speed instantly),
+this one limits acceleration and deceleration the same way the firmware's
+``acceleration``/``deceleration`` kwargs do: the number of milliseconds to go
+from 0 to 100% of the motor's maximum speed. Degree moves brake so they stop
+on target, and differential-drive chassis integrate their pose from the
+encoder deltas every step.
+
+All motor state lives in NumPy arrays so a whole batch of robots is stepped
+with a handful of array operations. There are two ways in:
+
+* :func:`hub.sim_use_physics` swaps every ``hub.port.X.motor`` for a
+  :class:`PhysicsMotor` so unmodified spikedev code (``MoveDifferential``,
+  ``Motor.run_for_degrees``...) drives the physics model
+* :class:`DriveBatch` steps thousands of independent robots at once for
+  path-planning benchmarks and calibration sweeps
+
+NumPy is only needed on the host, it never runs on the hub.
+"""
+
+# standard libraries
+import math
+
+# third party libraries
+import numpy as np
+from simclock import clock
+
+# spikedev libraries
+from spikedev.motor import SpikeMediumMotor
+from spikedev.unit import distance_in_mm
+
+from hub._motor import COMPLETED, FIRMWARE_STALL_MS, MODE_POWER, MODE_SPEED, STALL, SimMotor, SimMotorPair, _sign
+
+# firmware defaults for the acceleration and deceleration kwargs, in ms from 0 to 100%
+DEFAULT_ACCELERATION_MS = 100
+DEFAULT_DECELERATION_MS = 150
+
+DEFAULT_STEP_MS = 1
+
+# A degree move never slows below this fraction of max speed until it arrives,
+# otherwise the braking curve would approach the target asymptotically
+CREEP_FRACTION = 0.02
+
+
+def _rate(max_dps, ramp_ms):
+    """
+    deg/sec^2 needed to cover 0 to ``max_dps`` in ``ramp_ms``
+    """
+    ramp_ms = np.asarray(ramp_ms, dtype=float)
+    return np.where(ramp_ms > 0, max_dps * 1000.0 / np.maximum(ramp_ms, 1e-9), np.inf)
+
+
+class MotorBank:
+    """
+    The state of ``count`` motors held in parallel arrays
+
+    Args:
+        count (int): the number of motors
+        max_dps (int, numpy.ndarray): degrees-per-second at 100%, one value or one per motor
+    """
+
+    def __init__(self, count, max_dps=SpikeMediumMotor.MAX_DPS):
+        self.count = count
+        self.max_dps = np.broadcast_to(np.asarray(max_dps, dtype=float), (count,)).copy()
+        self.creep_dps = self.max_dps * CREEP_FRACTION
+
+        self.pos = np.zeros(count)
+        self.vel = np.zeros(count)
+
+        # signed commanded speed
+        self.cmd = np.zeros(count)
+
+        # degrees still to go for degree moves, inf for everything else
+        self.remaining = np.full(count, np.inf)
+
+        # end time of timed moves, -1 for everything else
+        self.end_us = np.full(count, -1, dtype=np.int64)
+
+        # True while a move that will complete is in flight
+        self.moving = np.zeros(count, dtype=bool)
+
+        self.accel = _rate(self.max_dps, DEFAULT_ACCELERATION_MS)
+        self.decel = _rate(self.max_dps, DEFAULT_DECELERATION_MS)
+
+        # an obstacle at jam_pos on the jam_side (+1 or -1) of each motor, nan and 0 for none, see jam()
+        self.jam_pos = np.full(count, np.nan)
+        self.jam_side = np.zeros(count)
+
+        # how long a motor pushes against its jam before it stalls, and since when it has been pushing
+        self.stall_ms = np.full(count, np.inf)
+        self.push_us = np.full(count, -1, dtype=np.int64)
+
+        # True for the motors that stalled during the last step
+        self.stalled = np.zeros(count, dtype=bool)
+
+        # the speed an external load turns each motor at while it is not being driven, see load()
+        self.load_dps = np.zeros(count)
+
+    def _command(self, index, dps, acceleration, deceleration, scale=1.0):
+        """
+        ``scale`` slows the ramps down for the slower motor of a pair so both
+        motors reach cruise speed at the same time and the arc keeps its shape
+        """
+        acceleration = DEFAULT_ACCELERATION_MS if acceleration is None else acceleration
+        deceleration = DEFAULT_DECELERATION_MS if deceleration is None else deceleration
+        self.cmd[index] = dps
+        self.accel[index] = _rate(self.max_dps[index], acceleration) * scale
+        self.decel[index] = _rate(self.max_dps[index], deceleration) * scale
+        self.remaining[index] = np.inf
+        self.end_us[index] = -1
+        self.moving[index] = False
+
+        # a new command pushes against a jam afresh
+        self.push_us[index] = -1
+
+    def jam(self, index, position, stall_ms=np.inf):
+        """
+        Put an obstacle at ``position`` on whichever side of the motor it is now, ``None`` removes it.
+        A motor that reaches it stops dead and, once it has pushed against it for ``stall_ms``, stalls.
+        """
+        if position is None:
+            self.jam_pos[index] = np.nan
+            self.jam_side[index] = 0
+            self.stall_ms[index] = np.inf
+        else:
+            self.jam_pos[index] = position
+            self.jam_side[index] = 1 if position >= self.pos[index] else -1
+            self.stall_ms[index] = stall_ms
+
+        self.push_us[index] = -1
+
+    def load(self, index, dps):
+        """
+        Hang a load on a motor that turns it at ``dps`` whenever it is not being driven
+        """
+        self.load_dps[index] = dps
+
+    def set_speed(self, index, dps, acceleration=None, deceleration=None, scale=1.0):
+        """
+        Ramp to ``dps`` and stay there
+        """
+        self._command(index, dps, acceleration, deceleration, scale)
+
+    def move_degrees(self, index, degrees, dps, acceleration=None, deceleration=None, scale=1.0):
+        """
+        Move ``degrees`` (always positive) in the direction of ``dps``, then stop
+        """
+        self._command(index, dps, acceleration, deceleration, scale)
+        self.remaining[index] = np.abs(degrees)
+        self.moving[index] = True
+
+    def move_time(self, index, end_us, dps, acceleration=None, deceleration=None, scale=1.0):
+        """
+        Run at ``dps`` until the clock reaches ``end_us``, then stop
+        """
+        self._command(index, dps, acceleration, deceleration, scale)
+        self.end_us[index] = end_us
+        self.moving[index] = True
+
+    def step(self, dt, now_us):
+        """
+        Advance every motor ``dt`` seconds
+
+        Returns:
+            numpy.ndarray: the indexes of the motors whose move completed during this step
+        """
+        direction = np.sign(self.cmd)
+        speed = np.abs(self.cmd)
+
+        # brake in time to stop on target
+        braking = np.sqrt(2.0 * self.decel * np.maximum(self.remaining, 0.0))
+        speed = np.minimum(speed, np.maximum(braking, np.minimum(speed, self.creep_dps)))
+
+        # an idle motor is back-driven by its load, a driven one overpowers it
+        target = np.where(self.cmd == 0, self.load_dps, direction * speed)
+
+        speeding_up = (np.abs(target) > np.abs(self.vel)) & (target * self.vel >= 0)
+        limit = np.where(speeding_up, self.accel, self.decel) * dt
+        new_vel = self.vel + np.clip(target - self.vel, -limit, limit)
+
+        delta = (self.vel + new_vel) * (0.5 * dt)
+        self.vel = new_vel
+        self.pos += delta
+        self.remaining -= direction * delta
+
+        # nothing gets past a jam, a motor that reaches one stops dead against it
+        past = (self.pos - self.jam_pos) * self.jam_side > 0
+
+        if past.any():
+            self.remaining[past] += direction[past] * (self.pos[past] - self.jam_pos[past])
+            self.pos[past] = self.jam_pos[past]
+            self.vel[past] = 0.0
+
+        # the firmware reports a stall once a motor has pushed against a jam for stall_ms
+        pushing = (self.pos == self.jam_pos) & (self.cmd * self.jam_side > 0)
+        self.push_us = np.where(pushing, np.where(self.push_us < 0, now_us, self.push_us), -1)
+        self.stalled = pushing & ((now_us - self.push_us) >= self.stall_ms * 1000)
+
+        arrived = self.moving & (self.remaining <= 0)
+        expired = self.moving & (self.end_us >= 0) & (self.end_us <= now_us)
+
+        if arrived.any():
+            # stop exactly on target, the brake takes out whatever we overshot by
+            self.pos[arrived] += direction[arrived] * self.remaining[arrived]
+            self.vel[arrived] = 0.0
+            self.cmd[arrived] = 0.0
+            self.remaining[arrived] = np.inf
+
+        if expired.any():
+            # timed moves decelerate from here on
+            self.cmd[expired] = 0.0
+            self.end_us[expired] = -1
+
+        if self.stalled.any():
+            # a stalled move never completes, the firmware gives up and stops pushing
+            self.cmd[self.stalled] = 0.0
+            self.remaining[self.stalled] = np.inf
+            self.end_us[self.stalled] = -1
+            self.push_us[self.stalled] = -1
+            self.moving &= ~self.stalled
+
+        done = arrived | expired
+        self.moving &= ~done
+        return np.flatnonzero(done)
+
+
+class DifferentialPose:
+    """
+    Integrates (x, y, heading) for differential-drive robots from a :class:`MotorBank`
+
+    Heading is in radians, counter-clockwise positive, with the robot starting
+    at the origin facing along +x.
+
+    Args:
+        bank (MotorBank): the motors
+        left_index (numpy.ndarray): the bank index of each robot's left motor
+        right_index (numpy.ndarray): the bank index of each robot's right motor
+        left_forward (int): +1 or -1, the sign of a left motor encoder delta when driving forward
+        right_forward (int): +1 or -1, the sign of a right motor encoder delta when driving forward
+        wheel_circumference_mm (float): wheel circumference
+        wheel_distance_mm (float): distance between the wheels
+    """
+
+    def __init__(
+        self, bank, left_index, right_index, left_forward, right_forward, wheel_circumference_mm, wheel_distance_mm
+    ):
+        self.bank = bank
+        self.left_index = np.atleast_1d(np.asarray(left_index))
+        self.right_index = np.atleast_1d(np.asarray(right_index))
+        count = len(self.left_index)
+        self.left_mm_per_degree = np.broadcast_to(left_forward * wheel_circumference_mm / 360.0, (count,)).copy()
+        self.right_mm_per_degree = np.broadcast_to(right_forward * wheel_circumference_mm / 360.0, (count,)).copy()
+        self.wheel_distance_mm = np.broadcast_to(np.asarray(wheel_distance_mm, dtype=float), (count,)).copy()
+        self.x = np.zeros(count)
+        self.y = np.zeros(count)
+        self.heading = np.zeros(count)
+        self._last_left = bank.pos[self.left_index].copy()
+        self._last_right = bank.pos[self.right_index].copy()
+
+    def reset(self):
+        self.x[:] = 0.0
+        self.y[:] = 0.0
+        self.heading[:] = 0.0
+        self._last_left = self.bank.pos[self.left_index].copy()
+        self._last_right = self.bank.pos[self.right_index].copy()
+
+    def update(self):
+        left = self.bank.pos[self.left_index]
+        right = self.bank.pos[self.right_index]
+        left_mm = (left - self._last_left) * self.left_mm_per_degree
+        right_mm = (right - self._last_right) * self.right_mm_per_degree
+        self._last_left = left
+        self._last_right = right
+
+        distance_mm = (left_mm + right_mm) * 0.5
+        turn = (right_mm - left_mm) / self.wheel_distance_mm
+        mid_heading = self.heading + turn * 0.5
+        self.x += distance_mm * np.cos(mid_heading)
+        self.y += distance_mm * np.sin(mid_heading)
+        self.heading += turn
+
+
+class PhysicsMotor(SimMotor):
+    """
+    A ``hub.port.X.motor`` whose state is one row of a :class:`PhysicsWorld` bank
+    """
+
+    def __init__(self, port_letter, world, index, max_dps):
+        SimMotor.__init__(self, port_letter, max_dps=max_dps)
+        self.world = world
+        self.index = index
+        world.bank.max_dps[index] = max_dps
+        world.bank.creep_dps[index] = max_dps * CREEP_FRACTION
+        world.motors[index] = self
+
+    def _position(self):
+        return float(self.world.bank.pos[self.index])
+
+    def _set_dps(self, dps, acceleration=None, deceleration=None):
+        self.world.bank.set_speed(self.index, dps, acceleration, deceleration)
+        self._arm_stall()
+
+    def _start_move(self, degrees, dps, owner, acceleration=None, deceleration=None):
+        self._interrupt()
+        self._owner = owner
+        self.world.bank.move_degrees(self.index, degrees, dps, acceleration, deceleration)
+        self._arm_stall()
+
+    def _start_timed(self, msec, dps, owner, acceleration=None, deceleration=None):
+        self._interrupt()
+        self._owner = owner
+        self.world.bank.move_time(self.index, clock.now_us + msec * 1000, dps, acceleration, deceleration)
+        self._arm_stall()
+
+    def _arm_stall(self):
+        """
+        Apply the ``max_power`` and ``stall`` kwargs of a new command to the jam, the bank
+        does the rest
+        """
+        if self._jam is None:
+            return
+
+        (position, side, break_power, stall_ms) = self._jam
+
+        if break_power is not None and self._max_power >= break_power:
+            # enough power to push through, the jam clears
+            self.sim_jam(None)
+            return
+
+        self.world.bank.stall_ms[self.index] = stall_ms if self._stall else np.inf
+
+    def _stalled(self):
+        # the bank has already stopped the motor
+        owner = self._owner
+        self._owner = None
+        (owner if owner is not None else self)._notify(STALL)
+
+    def _finish(self, position=None, reason=COMPLETED):
+        owner = self._owner
+        self._owner = None
+
+        if owner is not None:
+            owner._notify(reason)
+
+    def _mode_value(self, mode):
+        if mode == MODE_SPEED:
+            return int(round(self.world.bank.vel[self.index] * 100 / self.max_dps))
+        elif mode == MODE_POWER:
+            return int(round(self.world.bank.cmd[self.index] * 100 / self.max_dps))
+        return SimMotor._mode_value(self, mode)
+
+    def preset(self, position):
+        self.world.bank.pos[self.index] = position
+
+        for chassis in self.world.chassis:
+            chassis.reset()
+
+    def busy(self, busy_type=1):
+        if busy_type == 0:
+            return False
+
+        # turning under its load alone does not make a motor busy
+        bank = self.world.bank
+        return bool(bank.cmd[self.index] != 0 or bank.vel[self.index] != bank.load_dps[self.index])
+
+    def sim_jam(self, position, break_power=None, stall_ms=FIRMWARE_STALL_MS):
+        """
+        See :meth:`hub._motor.SimMotor.sim_jam`. The motor stops dead at the jam, its speed
+        reads 0 and the bank raises its stall flag once it has pushed for ``stall_ms``.
+        """
+        if position is None:
+            self._jam = None
+        else:
+            side = 1 if position >= self._position() else -1
+            self._jam = (float(position), side, break_power, stall_ms)
+
+        self.world.bank.jam(self.index, position, stall_ms)
+        self._arm_stall()
+
+    def sim_load(self, dps):
+        """
+        See :meth:`hub._motor.SimMotor.sim_load`. The load ramps an idle motor up to ``dps`` as
+        a command would, a driven motor overpowers it.
+        """
+        self._load_dps = float(dps)
+        self.world.bank.load(self.index, dps)
+
+    def pair(self, other):
+        return PhysicsMotorPair(self, other)
+
+
+class PhysicsMotorPair(SimMotorPair):
+    """
+    A motor pair where both motors ramp together so that arcs keep their shape
+    while accelerating and braking
+    """
+
+    def _begin(self):
+        self._interrupt()
+        self.primary._owner = self
+        self.secondary._owner = self
+        self._pending = 2
+
+    def _start(self, duration_us, dps_primary, dps_secondary, acceleration=None, deceleration=None):
+        self._begin()
+        bank = self.primary.world.bank
+        fastest = max(abs(dps_primary), abs(dps_secondary)) or 1.0
+
+        for (motor, dps) in ((self.primary, dps_primary), (self.secondary, dps_secondary)):
+            # a motor told to stop brakes at the full rate, a zero rate would never get there
+            scale = abs(dps) / fastest if dps else 1.0
+
+            if duration_us is None:
+                bank.set_speed(motor.index, dps, acceleration, deceleration, scale=scale)
+            else:
+                bank.move_time(motor.index, clock.now_us + duration_us, dps, acceleration, deceleration, scale=scale)
+
+        if duration_us is None:
+            self._pending = 0
+
+    def _move(self, degrees_primary, degrees_secondary, dps_primary, dps_secondary, acceleration, deceleration):
+        self._begin()
+        bank = self.primary.world.bank
+        fastest = max(abs(dps_primary), abs(dps_secondary))
+
+        if not fastest:
+            self._pending = 0
+            self._finish()
+            return
+
+        for (motor, degrees, dps) in (
+            (self.primary, degrees_primary, dps_primary),
+            (self.secondary, degrees_secondary, dps_secondary),
+        ):
+            if degrees and dps:
+                bank.move_degrees(motor.index, degrees, dps, acceleration, deceleration, scale=abs(dps) / fastest)
+            else:
+                bank.set_speed(motor.index, 0)
+                self._pending -= 1
+
+        if not self._pending:
+            self._finish()
+
+    def _finish(self):
+        self._timer = None
+        self._pending = 0
+
+        if self._callback is not None:
+            clock.call_later(0, self._callback, COMPLETED)
+
+    def run_at_speed(self, speed_0, speed_1, max_power=100, acceleration=100, deceleration=150):
+        self._start(
+            None, self.primary._speed_to_dps(speed_0), self.secondary._speed_to_dps(speed_1), acceleration, deceleration
+        )
+
+    def run_for_degrees(self, degrees, speed_0, speed_1, max_power=100, stop=1, acceleration=100, deceleration=150):
+        dps_0 = self.primary._speed_to_dps(speed_0)
+        dps_1 = self.secondary._speed_to_dps(speed_1)
+        avg_dps = (abs(dps_0) + abs(dps_1)) / 2
+
+        if not avg_dps:
+            self._move(0, 0, 0, 0, acceleration, deceleration)
+            return
+
+        # the two motors combined move an average of ``degrees``, each in proportion to its speed
+        degrees = abs(degrees)
+        self._move(
+            degrees * abs(dps_0) / avg_dps, degrees * abs(dps_1) / avg_dps, dps_0, dps_1, acceleration, deceleration
+        )
+
+    def run_to_position(self, position_0, position_1, speed, max_power=100, stop=1, acceleration=100, deceleration=150):
+        delta_0 = position_0 - self.primary._position()
+        delta_1 = position_1 - self.secondary._position()
+        longest = max(abs(delta_0), abs(delta_1))
+        dps = abs(self.primary._speed_to_dps(speed))
+
+        if not longest:
+            self._move(0, 0, 0, 0, acceleration, deceleration)
+            return
+
+        self._move(
+            abs(delta_0),
+            abs(delta_1),
+            _sign(delta_0) * dps * abs(delta_0) / longest,
+            _sign(delta_1) * dps * abs(delta_1) / longest,
+            acceleration,
+            deceleration,
+        )
+
+    def float(self):
+        self._interrupt()
+        bank = self.primary.world.bank
+        bank.set_speed(self.primary.index, 0)
+        bank.set_speed(self.secondary.index, 0)
+
+
+class PhysicsWorld:
+    """
+    The physics state behind every port of one simulated hub
+
+    Args:
+        step_ms (int): the integration step
+    """
+
+    def __init__(self, port_count, step_ms=DEFAULT_STEP_MS):
+        self.bank = MotorBank(port_count)
+        self.motors = [None] * port_count
+        self.chassis = []
+        self.traces = []
+        self._stepper = clock.add_stepper(step_ms * 1000, self.step)
+
+    def close(self):
+        clock.remove_stepper(self._stepper)
+
+    def attach_motor(self, port_letter, index, max_dps):
+        return PhysicsMotor(port_letter, self, index, max_dps)
+
+    def step(self, now_us, dt_us):
+        done = self.bank.step(dt_us / 1000000, now_us)
+
+        for chassis in self.chassis:
+            chassis.update()
+
+        for trace in self.traces:
+            trace.record(now_us)
+
+        for index in done:
+            motor = self.motors[index]
+
+            if motor is not None:
+                motor._finish()
+
+        if self.bank.stalled.any():
+            for index in np.flatnonzero(self.bank.stalled):
+                motor = self.motors[index]
+
+                if motor is not None:
+                    motor._stalled()
+
+    def add_chassis(
+        self, left_motor, right_motor, wheel, wheel_distance, left_forward=-1, right_forward=1, trace=False
+    ):
+        """
+        Track the pose of a differential-drive robot driven by two of our motors
+
+        Args:
+            left_motor (PhysicsMotor): e.g. ``hub.port.A.motor``
+            right_motor (PhysicsMotor): e.g. ``hub.port.E.motor``
+            wheel (Wheel): a wheel from ``spikedev.wheel``, class or instance
+            wheel_distance (DistanceValue): the distance between the wheels, or an int of mm
+            left_forward (int): +1 or -1, defaults to -1 to match MoveTank's REVERSED left motor
+            right_forward (int): +1 or -1, defaults to +1
+            trace (bool): if True keep a :class:`Trace` of the encoders and pose
+
+        Returns:
+            DifferentialPose: the pose integrator, ``pose.trace`` holds the trace if requested
+        """
+        if isinstance(wheel, type):
+            wheel = wheel()
+
+        chassis = DifferentialPose(
+            self.bank,
+            left_motor.index,
+            right_motor.index,
+            left_forward,
+            right_forward,
+            wheel.circumference_mm,
+            distance_in_mm(wheel_distance),
+        )
+        chassis.trace = None
+        self.chassis.append(chassis)
+
+        if trace:
+            chassis.trace = Trace(self.bank, chassis)
+            self.traces.append(chassis.trace)
+
+        return chassis
+
+
+class Trace:
+    """
+    Encoder positions and pose of one chassis, one row per physics step
+    """
+
+    def __init__(self, bank, chassis, robot=0):
+        self.bank = bank
+        self.chassis = chassis
+        self.robot = robot
+        self.rows = []
+
+    def record(self, now_us):
+        chassis = self.chassis
+        robot = self.robot
+        self.rows.append(
+            (
+                now_us,
+                float(self.bank.pos[chassis.left_index[robot]]),
+                float(self.bank.pos[chassis.right_index[robot]]),
+                float(chassis.x[robot]),
+                float(chassis.y[robot]),
+                math.degrees(float(chassis.heading[robot])),
+            )
+        )
+
+    def as_array(self):
+        """
+        Returns:
+            numpy.ndarray: columns are time_us, left_degrees, right_degrees, x_mm, y_mm, heading_degrees
+        """
+        return np.array(self.rows)
+
+
+class DriveBatch:
+    """
+    ``count`` independent differential-drive robots stepped in lock-step
+
+    Commands take one value or an array with one value per robot. Speeds are
+    percentages like ``hub.port.X.motor`` expects. Nothing here touches the
+    simulated ``hub`` or the virtual clock.
+
+    Args:
+        count (int): the number of robots
+        wheel_class (Wheel): a wheel from ``spikedev.wheel``
+        wheel_distance (DistanceValue): the distance between the wheels, or an int of mm.
+            Pass a numpy array of mm to sweep this value across the batch.
+        motor_class (Motor): a motor class from ``spikedev.motor``, for its ``MAX_DPS``
+        step_ms (float): the integration step
+        actual_wheel_distance (numpy.ndarray): the real distance between the wheels in mm, for
+            the pose. Defaults to ``wheel_distance``, which is what commands are computed from
+            just like ``MoveDifferential`` does.
+
+    Example:
+
+    .. code:: python
+
+        import numpy as np
+        from spikedev.motor import SpikeLargeMotor
+        from spikedev.unit import DistanceStuds
+        from spikedev.wheel import SpikeLargeWheel
+        from physics import DriveBatch
+
+        # how far off is a 90 degree turn if the real wheel distance is not quite 19 studs?
+        batch = DriveBatch(
+            1000, SpikeLargeWheel, DistanceStuds(19), SpikeLargeMotor, actual_wheel_distance=np.linspace(140, 160, 1000)
+        )
+        batch.turn_degrees(90, 30)
+        batch.run_until_done()
+        print(np.degrees(batch.pose.heading))
+    """
+
+    def __init__(
+        self,
+        count,
+        wheel_class,
+        wheel_distance,
+        motor_class=SpikeMediumMotor,
+        step_ms=DEFAULT_STEP_MS,
+        actual_wheel_distance=None,
+    ):
+        self.count = count
+        self.wheel = wheel_class()
+        self.wheel_distance_mm = np.asarray(
+            wheel_distance if isinstance(wheel_distance, np.ndarray) else distance_in_mm(wheel_distance), dtype=float
+        )
+        self.max_dps = motor_class.MAX_DPS
+        self.step_us = int(step_ms * 1000)
+        self.now_us = 0
+        self.bank = MotorBank(count * 2, self.max_dps)
+        self.left = np.arange(0, count * 2, 2)
+        self.right = np.arange(1, count * 2, 2)
+
+        # left motors are mounted mirrored, see MoveTank's default polarities
+        if actual_wheel_distance is None:
+            actual_wheel_distance = self.wheel_distance_mm
+
+        self.pose = DifferentialPose(
+            self.bank, self.left, self.right, -1, 1, self.wheel.circumference_mm, actual_wheel_distance
+        )
+
+    def _dps(self, speed):
+        return np.clip(np.asarray(speed, dtype=float), -100, 100) * self.max_dps / 100
+
+    def _scale(self, left_dps, right_dps):
+        fastest = np.maximum(np.maximum(np.abs(left_dps), np.abs(right_dps)), 1e-9)
+        return (np.abs(left_dps) / fastest, np.abs(right_dps) / fastest)
+
+    def run_for_degrees(self, degrees, left_speed, right_speed, acceleration=None, deceleration=None):
+        """
+        Like ``MoveTank.run_for_degrees``, the wheels move an average of ``degrees``.
+        Positive speeds drive forward.
+        """
+        left_dps = np.broadcast_to(-self._dps(left_speed), (self.count,))
+        right_dps = np.broadcast_to(self._dps(right_speed), (self.count,))
+        avg_dps = np.maximum((np.abs(left_dps) + np.abs(right_dps)) / 2, 1e-9)
+        degrees = np.abs(np.asarray(degrees, dtype=float))
+        (left_scale, right_scale) = self._scale(left_dps, right_dps)
+        self.bank.move_degrees(
+            self.left, degrees * np.abs(left_dps) / avg_dps, left_dps, acceleration, deceleration, left_scale
+        )
+        self.bank.move_degrees(
+            self.right, degrees * np.abs(right_dps) / avg_dps, right_dps, acceleration, deceleration, right_scale
+        )
+
+    def run_at_speed(self, left_speed, right_speed, acceleration=None, deceleration=None):
+        left_dps = np.broadcast_to(-self._dps(left_speed), (self.count,))
+        right_dps = np.broadcast_to(self._dps(right_speed), (self.count,))
+        (left_scale, right_scale) = self._scale(left_dps, right_dps)
+        self.bank.set_speed(self.left, left_dps, acceleration, deceleration, left_scale)
+        self.bank.set_speed(self.right, right_dps, acceleration, deceleration, right_scale)
+
+    def run_for_distance(self, distance_mm, speed, **kwargs):
+        """
+        Drive ``distance_mm`` in a straight line, see ``MoveDifferential.run_for_distance``
+        """
+        degrees = np.asarray(distance_mm, dtype=float) / self.wheel.circumference_mm * 360
+        self.run_for_degrees(degrees, speed, speed, **kwargs)
+
+    def run_arc(self, radius_mm, distance_mm, speed, arc_right=True, **kwargs):
+        """
+        Drive ``distance_mm`` along a circle of ``radius_mm``, see ``MoveDifferential._run_arc``
+        """
+        half = self.wheel_distance_mm / 2
+        ratio = (np.asarray(radius_mm, dtype=float) - half) / (np.asarray(radius_mm, dtype=float) + half)
+        degrees = np.asarray(distance_mm, dtype=float) / self.wheel.circumference_mm * 360
+
+        if arc_right:
+            self.run_for_degrees(degrees, speed, ratio * speed, **kwargs)
+        else:
+            self.run_for_degrees(degrees, ratio * speed, speed, **kwargs)
+
+    def turn_degrees(self, degrees, speed, **kwargs):
+        """
+        Rotate in place, positive ``degrees`` is clockwise, see ``MoveDifferential.turn_degrees``
+        """
+        degrees = np.asarray(degrees, dtype=float)
+        wheel_degrees = np.abs(degrees) * self.wheel_distance_mm / self.wheel.diameter_mm
+        direction = np.where(degrees >= 0, 1.0, -1.0)
+        self.run_for_degrees(wheel_degrees, direction * speed, -direction * speed, **kwargs)
+
+    def step(self):
+        self.now_us += self.step_us
+        done = self.bank.step(self.step_us / 1000000, self.now_us)
+        self.pose.update()
+        return done
+
+    def run_until_done(self, timeout_ms=60000):
+        """
+        Step until every robot has finished its move and come to rest
+
+        Returns:
+            int: the number of steps taken
+        """
+        steps = 0
+        limit = timeout_ms * 1000 // self.step_us
+
+        while (self.bank.moving.any() or self.bank.vel.any()) and steps < limit:
+            self.step()
+            steps += 1
+
+        return steps
@@ -0,0 +1,134 @@
+"""
+A virtual clock for the host-side ``hub`` simulator
+
+Simulated time only moves forward when something sleeps via ``utime.sleep*`` (or
+when a test calls :meth:`VirtualClock.advance` directly). While time advances any
+timers that come due are fired in order, so a motor that was told to run for one
+second completes, and calls its callback, exactly one simulated second later no
+matter how long that took on the host.
+"""
+
+# standard libraries
+import heapq
+
+
+class VirtualClock:
+    """
+    A microsecond resolution clock with a timer queue
+    """
+
+    def __init__(self):
+        self.now_us = 0
+        self._timers = []
+        self._seq = 0
+        self._steppers = []
+
+    def reset(self):
+        """
+        Rewind to zero and forget all timers and steppers
+        """
+        self.now_us = 0
+        self._timers = []
+        self._seq = 0
+        self._steppers = []
+
+    def call_at(self, due_us, func, *args):
+        """
+        Call ``func(*args)`` when the clock reaches ``due_us``
+
+        Returns:
+            list: a handle that can be passed to :meth:`cancel`
+        """
+        self._seq += 1
+        timer = [int(due_us), self._seq, func, args]
+        heapq.heappush(self._timers, timer)
+        return timer
+
+    def call_later(self, delay_us, func, *args):
+        """
+        Call ``func(*args)`` ``delay_us`` microseconds from now
+        """
+        return self.call_at(self.now_us + max(0, int(delay_us)), func, *args)
+
+    def cancel(self, timer):
+        """
+        Cancel a timer returned by :meth:`call_at` or :meth:`call_later`
+        """
+        if timer is not None:
+            timer[2] = None
+
+    def add_stepper(self, period_us, func):
+        """
+        Call ``func(now_us, dt_us)`` every ``period_us`` microseconds. This is how
+        time-stepped models (physics, IMU integration) hook into the clock.
+        """
+        stepper = [self.now_us + period_us, int(period_us), func]
+        self._steppers.append(stepper)
+        return stepper
+
+    def remove_stepper(self, stepper):
+        if stepper in self._steppers:
+            self._steppers.remove(stepper)
+
+    def _next_due_us(self):
+        due = None
+
+        while self._timers and self._timers[0][2] is None:
+            heapq.heappop(self._timers)
+
+        if self._timers:
+            due = self._timers[0][0]
+
+        for stepper in self._steppers:
+            if due is None or stepper[0] < due:
+                due = stepper[0]
+
+        return due
+
+    def advance(self, delta_us):
+        """
+        Move the clock forward ``delta_us`` microseconds, firing every timer and
+        stepper that comes due along the way
+        """
+        target_us = self.now_us + max(0, int(delta_us))
+
+        while True:
+            due = self._next_due_us()
+
+            if due is None or due > target_us:
+                break
+
+            if due > self.now_us:
+                self.now_us = due
+
+            for stepper in list(self._steppers):
+                if stepper[0] <= self.now_us:
+                    stepper[0] += stepper[1]
+                    stepper[2](self.now_us, stepper[1])
+
+            while self._timers and self._timers[0][0] <= self.now_us:
+                (_, _, func, args) = heapq.heappop(self._timers)
+
+                if func is not None:
+                    func(*args)
+
+        self.now_us = target_us
+
+    def run_until(self, predicate, timeout_us=None, step_us=1000):
+        """
+        Advance in ``step_us`` increments until ``predicate()`` is True
+
+        Returns:
+            bool: ``True`` if ``predicate()`` became True before ``timeout_us`` expired
+        """
+        start_us = self.now_us
+
+        while not predicate():
+            if timeout_us is not None and self.now_us - start_us >= timeout_us:
+                return False
+            self.advance(step_us)
+
+        return True
+
+
+clock = VirtualClock()
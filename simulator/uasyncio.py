@@ -0,0 +1,290 @@
+"""
+Host-side stand-in for MicroPython's ``uasyncio`` that runs on simulated time
+
+Only the parts of the uasyncio v3 API that spikedev uses are here: tasks,
+``sleep``/``sleep_ms``, ``gather``, ``wait_for``/``wait_for_ms`` and ``Event``.
+When every task is sleeping the loop advances :data:`simclock.clock` straight to
+the next wake-up, firing any motor or button callbacks due on the way.
+"""
+
+# standard libraries
+import heapq
+
+from simclock import clock
+
+
+class CancelledError(BaseException):
+    pass
+
+
+class TimeoutError(Exception):
+    pass
+
+
+class _Sleep:
+    __slots__ = ("us",)
+
+    def __init__(self, us):
+        self.us = us
+
+    def __await__(self):
+        yield self
+
+
+class _WaitTask:
+    __slots__ = ("task", "timeout_us")
+
+    def __init__(self, task, timeout_us=None):
+        self.task = task
+        self.timeout_us = timeout_us
+
+    def __await__(self):
+        yield self
+
+
+class _WaitEvent:
+    __slots__ = ("event",)
+
+    def __init__(self, event):
+        self.event = event
+
+    def __await__(self):
+        yield self
+
+
+class Task:
+    """
+    A coroutine scheduled on the loop, returned by :func:`create_task`
+    """
+
+    def __init__(self, coro):
+        self.coro = coro
+        self.done_ = False
+        self.result = None
+        self.exception = None
+        self.waiters = []
+        self.wake_seq = 0
+        self.cancelling = False
+
+    def __await__(self):
+        if not self.done_:
+            yield _WaitTask(self)
+
+        if self.exception is not None:
+            raise self.exception
+
+        return self.result
+
+    def done(self):
+        return self.done_
+
+    def cancel(self):
+        if self.done_:
+            return False
+
+        self.cancelling = True
+        _loop.schedule(self, clock.now_us)
+        return True
+
+
+class Loop:
+    def __init__(self):
+        self._queue = []
+        self._seq = 0
+        self.current = None
+
+    def schedule(self, task, when_us):
+        self._seq += 1
+        task.wake_seq = self._seq
+        heapq.heappush(self._queue, (when_us, self._seq, task))
+
+    def create_task(self, coro):
+        task = coro if isinstance(coro, Task) else Task(coro)
+
+        if not task.wake_seq and not task.done_:
+            self.schedule(task, clock.now_us)
+
+        return task
+
+    def _finish(self, task, result=None, exception=None):
+        task.done_ = True
+        task.result = result
+        task.exception = exception
+
+        for waiter in task.waiters:
+            self.schedule(waiter, clock.now_us)
+
+        task.waiters = []
+
+    def _step(self, task):
+        self.current = task
+
+        try:
+            if task.cancelling:
+                task.cancelling = False
+                awaited = task.coro.throw(CancelledError())
+            else:
+                awaited = task.coro.send(None)
+        except StopIteration as e:
+            self._finish(task, result=e.value)
+            return
+        except (CancelledError, Exception) as e:
+            self._finish(task, exception=e)
+            return
+        finally:
+            self.current = None
+
+        if isinstance(awaited, _Sleep):
+            self.schedule(task, clock.now_us + awaited.us)
+
+        elif isinstance(awaited, _WaitTask):
+            if awaited.task.done_:
+                self.schedule(task, clock.now_us)
+            else:
+                awaited.task.waiters.append(task)
+
+                if awaited.timeout_us is not None:
+                    self.schedule(task, clock.now_us + awaited.timeout_us)
+
+        elif isinstance(awaited, _WaitEvent):
+            if awaited.event.state:
+                self.schedule(task, clock.now_us)
+            else:
+                awaited.event.waiters.append(task)
+
+        else:
+            # a bare yield, go to the back of the queue
+            self.schedule(task, clock.now_us)
+
+    def run_until_complete(self, main_task):
+        main_task = self.create_task(main_task)
+
+        while not main_task.done_:
+            if not self._queue:
+                raise RuntimeError("every task is waiting on something that will never happen")
+
+            (when_us, seq, task) = heapq.heappop(self._queue)
+
+            # skip stale wake-ups, e.g. a timeout for a wait that already finished
+            if task.done_ or seq != task.wake_seq:
+                continue
+
+            if when_us > clock.now_us:
+                clock.advance(when_us - clock.now_us)
+
+            self._step(task)
+
+        if main_task.exception is not None:
+            raise main_task.exception
+
+        return main_task.result
+
+    def run_forever(self):
+        while self._queue:
+            (when_us, seq, task) = heapq.heappop(self._queue)
+
+            if task.done_ or seq != task.wake_seq:
+                continue
+
+            if when_us > clock.now_us:
+                clock.advance(when_us - clock.now_us)
+
+            self._step(task)
+
+
+_loop = Loop()
+
+
+class Event:
+    def __init__(self):
+        self.state = False
+        self.waiters = []
+
+    def is_set(self):
+        return self.state
+
+    def set(self):
+        self.state = True
+
+        for waiter in self.waiters:
+            _loop.schedule(waiter, clock.now_us)
+
+        self.waiters = []
+
+    def clear(self):
+        self.state = False
+
+    async def wait(self):
+        if not self.state:
+            await _WaitEvent(self)
+        return True
+
+
+def sleep_ms(ms):
+    return _Sleep(int(ms * 1000))
+
+
+def sleep(seconds):
+    return _Sleep(int(seconds * 1000000))
+
+
+def create_task(coro):
+    return _loop.create_task(coro)
+
+
+def current_task():
+    return _loop.current
+
+
+def get_event_loop():
+    return _loop
+
+
+def new_event_loop():
+    global _loop
+    _loop = Loop()
+    return _loop
+
+
+def run(coro):
+    return _loop.run_until_complete(create_task(coro))
+
+
+async def wait_for_ms(aw, timeout_ms):
+    task = create_task(aw)
+
+    if timeout_ms is None:
+        return await task
+
+    waiter = _loop.current
+    await _WaitTask(task, int(timeout_ms * 1000))
+
+    if not task.done_:
+        if waiter in task.waiters:
+            task.waiters.remove(waiter)
+        task.cancel()
+        raise TimeoutError()
+
+    if task.exception is not None:
+        raise task.exception
+
+    return task.result
+
+
+async def wait_for(aw, timeout):
+    return await wait_for_ms(aw, None if timeout is None else timeout * 1000)
+
+
+async def gather(*aws, return_exceptions=False):
+    tasks = [create_task(aw) for aw in aws]
+    results = []
+
+    for task in tasks:
+        try:
+            results.append(await task)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+
+    return results
@@ -0,0 +1,55 @@
+"""
+Host-side stand-in for MicroPython's ``utime`` that runs on simulated time
+
+Every ``sleep`` advances :data:`simclock.clock`, which fires any motor, button or
+sensor events that come due while "sleeping".
+"""
+
+# standard libraries
+import time as _host_time
+
+from simclock import clock
+
+_TICKS_PERIOD = 1 << 30
+_TICKS_MAX = _TICKS_PERIOD - 1
+_TICKS_HALFPERIOD = _TICKS_PERIOD // 2
+
+
+def ticks_us():
+    return clock.now_us & _TICKS_MAX
+
+
+def ticks_ms():
+    return (clock.now_us // 1000) & _TICKS_MAX
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & _TICKS_MAX
+
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + _TICKS_HALFPERIOD) & _TICKS_MAX) - _TICKS_HALFPERIOD
+
+
+def sleep_us(us):
+    clock.advance(us)
+
+
+def sleep_ms(ms):
+    clock.advance(ms * 1000)
+
+
+def sleep(seconds):
+    clock.advance(seconds * 1000000)
+
+
+def time():
+    return clock.now_us // 1000000
+
+
+def localtime(secs=None):
+    return _host_time.gmtime(time() if secs is None else secs)[:8]
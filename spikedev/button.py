@@ -1,20 +1,20 @@
-# standard libraries
-import utime
-
 # third party libraries
 import hub
 
 # spikedev libraries
+from spikedev.completion import Completion
 from spikedev.logging import log_msg
-from spikedev.stopwatch import StopWatch
 
 _buttons = {}
 
 
 def _callback(desc, held_ms):
     btn = _buttons.get(desc)
-    btn._rxed_callback = True
     btn.held_ms = held_ms
+    btn._completion.set(held_ms)
+
+    for func in btn.subscribers:
+        func(btn, held_ms)
     # log_msg("{} _callback_{} held {}ms".format(btn, desc, held_ms))
 
 
@@ -43,7 +43,11 @@ class Button:
     def __init__(self, button_name, desc=None):
         super().__init__()
         self.desc = desc
-        self._rxed_callback = False
+        self.held_ms = None
+
+        # called with (button, held_ms) after each callback, see subscribe()
+        self.subscribers = []
+        self._completion = Completion()
         self._button = None
 
     def __str__(self):
@@ -77,19 +81,24 @@ class Button:
         """
         return not self._button.is_pressed()
 
-    def _wait(self, timeout_ms=None):
-        stopwatch = StopWatch()
-        stopwatch.start()
-
-        # This is ugly but SPIKE does not have the _thread module :(
-        while not self._rxed_callback:
-
-            if timeout_ms is not None and stopwatch.value_ms >= timeout_ms:
-                return False
+    def subscribe(self, func):
+        """
+        Call ``func(button, held_ms)`` each time the button is pressed or released, ``held_ms``
+        is 0 for a press. ``func`` is called from the firmware callback so it must be quick and
+        should not allocate, see :meth:`spikedev.scheduler.Scheduler.on_button`.
+        """
+        if func not in self.subscribers:
+            self.subscribers.append(func)
 
-            utime.sleep(0.01)
+    def unsubscribe(self, func):
+        """
+        Stop calling ``func``
+        """
+        if func in self.subscribers:
+            self.subscribers.remove(func)
 
-        return True
+    def _wait(self, timeout_ms=None):
+        return self._completion.wait(timeout_ms)
 
     def wait_for_pressed(self, timeout_ms=None):
         """
@@ -102,7 +111,7 @@ class Button:
             log_msg("{} already pressed".format(self))
             return True
 
-        self._rxed_callback = False
+        self._completion.clear()
 
         if self._wait(timeout_ms):
             log_msg("{} pressed".format(self))
@@ -122,7 +131,7 @@ class Button:
             log_msg("{} already released".format(self))
             return True
 
-        self._rxed_callback = False
+        self._completion.clear()
 
         if self._wait(timeout_ms):
             log_msg("{} released".format(self))
@@ -153,6 +162,41 @@ class Button:
                 log_msg("{} was not bumped within {}ms".format(self, timeout_ms))
                 return False
 
+    async def pressed(self, timeout_ms=None):
+        """
+        Awaitable :meth:`wait_for_pressed`, other ``uasyncio`` tasks run while we wait
+
+        Example:
+
+        .. code:: python
+
+            import uasyncio
+            from spikedev.button import ButtonLeft
+
+            btn = ButtonLeft()
+
+            async def main():
+                if await btn.pressed(5000):
+                    print("pressed")
+
+            uasyncio.run(main())
+        """
+        if self.is_pressed():
+            return True
+
+        self._completion.clear()
+        return await self._completion.wait_async(timeout_ms)
+
+    async def released(self, timeout_ms=None):
+        """
+        Awaitable :meth:`wait_for_released`
+        """
+        if self.is_released():
+            return True
+
+        self._completion.clear()
+        return await self._completion.wait_async(timeout_ms)
+
 
 class ButtonLeft(Button):
     def __init__(self, desc=None):
@@ -0,0 +1,337 @@
+"""
+Classify colors by the nearest calibrated centroid in CIELAB
+"""
+
+# standard libraries
+import utime
+
+# spikedev libraries
+from spikedev.logging import log_msg
+
+# The first line of a saved classifier
+FILE_MAGIC = "spikedev-colors"
+FILE_VERSION = 1
+
+# A grid cell that more than one centroid is nearest to somewhere inside
+AMBIGUOUS = 255
+
+# log_msg prefix of each calibration sample, see spike-train-colors.py
+SAMPLE_PREFIX = "color sample"
+
+
+class ColorClassifier:
+    """
+    Name the color under a :class:`spikedev.sensor.ColorSensor` by which calibrated color
+    it is nearest to in `CIELAB <https://en.wikipedia.org/wiki/CIELAB_color_space>`_, instead
+    of trusting the firmware's color numbers.
+
+    Show the sensor each color with :meth:`calibrate`, or :meth:`add_sample` readings of
+    :meth:`spikedev.sensor.ColorSensor.lab` yourself, then :meth:`train`. Each color's
+    centroid is the mean of its samples.
+
+    Comparing a reading against every centroid costs a distance per color per reading, so
+    :meth:`train` also splits LAB space into cubes ``step`` on a side and notes, in one byte
+    per cube, which centroid is nearest to every point in it. :meth:`classify` then costs one
+    table lookup. The grid covers the samples plus ``margin`` either side, readings
+    outside it and the few cubes straddling the boundary between two colors, which are
+    marked ``AMBIGUOUS``, fall back to comparing against every centroid. So the answer is
+    always the nearest centroid.
+
+    :meth:`save` writes the centroids and the grid to a file, around 20KB for six colors at
+    the default ``step``, that :meth:`load` reads back without recomputing anything.
+    Building the grid is slow on the hub, the ``utils/spike-train-colors.py`` tool does it
+    on a computer from the samples :meth:`calibrate` logs.
+
+    Args:
+        step (int): the side of each grid cube in LAB units, smaller means fewer ``AMBIGUOUS``
+            cubes but a bigger grid
+        margin (int): how far beyond the samples, in LAB units, the grid reaches
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.button import ButtonCenter
+        from spikedev.colorclassifier import ColorClassifier
+        from spikedev.sensor import ColorSensor
+
+        sensor = ColorSensor(hub.port.B)
+        btn = ButtonCenter()
+        classifier = ColorClassifier()
+
+        for name in ("black", "white", "red", "green", "blue", "yellow"):
+            print("show me {} and press the center button".format(name))
+            btn.wait_for_bump()
+            classifier.calibrate(sensor, name)
+
+        classifier.train()
+        classifier.save("colors.bin")
+
+        # later, or in another program
+        classifier = ColorClassifier.load("colors.bin")
+        print(classifier.read(sensor))
+    """
+
+    def __init__(self, step=8, margin=16):
+        if step < 1:
+            raise ValueError("step {} is invalid, must be >= 1".format(step))
+
+        self.step = step
+        self.margin = margin
+        self.names = []
+        self.centroids = []
+        self.grid = None
+        self.fallbacks = 0
+
+        # name: [sum of L, sum of a, sum of b, count], and the lowest and highest L, a and b
+        self._sums = {}
+        self._low = None
+        self._high = None
+
+        # the lowest L, a and b of the grid and how many cubes it has along each
+        self.origin = (0, 0, 0)
+        self.cells = (0, 0, 0)
+
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, ", ".join(self.names))
+
+    def add_sample(self, name, lab):
+        """
+        Args:
+            name (str): the color, without spaces
+            lab (tuple): an (L, a, b) reading of it
+        """
+        if not name or " " in name or "\n" in name:
+            raise ValueError("color name '{}' is invalid, it must not be empty or contain spaces".format(name))
+
+        sums = self._sums.get(name)
+
+        if sums is None:
+            sums = [0, 0, 0, 0]
+            self._sums[name] = sums
+
+        sums[0] += lab[0]
+        sums[1] += lab[1]
+        sums[2] += lab[2]
+        sums[3] += 1
+
+        if self._low is None:
+            self._low = list(lab)
+            self._high = list(lab)
+        else:
+            for axis in range(3):
+                if lab[axis] < self._low[axis]:
+                    self._low[axis] = lab[axis]
+                elif lab[axis] > self._high[axis]:
+                    self._high[axis] = lab[axis]
+
+    def calibrate(self, sensor, name, samples=20, interval_ms=20):
+        """
+        Add ``samples`` readings of the color under ``sensor``, move the sensor about over it
+        while this runs. Each is logged so that ``utils/spike-train-colors.py`` can train on
+        the program's output.
+
+        Args:
+            sensor (ColorSensor): the sensor
+            name (str): the color, without spaces
+            samples (int): how many readings
+            interval_ms (int): milliseconds between readings
+        """
+        for _ in range(samples):
+            lab = sensor.lab()
+            self.add_sample(name, lab)
+            log_msg("{} {} {:.2f} {:.2f} {:.2f}".format(SAMPLE_PREFIX, name, lab[0], lab[1], lab[2]))
+            utime.sleep_ms(interval_ms)
+
+    def train(self):
+        """
+        Work out each color's centroid from its samples and build the grid
+        """
+        if not self._sums:
+            raise ValueError("{}: no samples, call calibrate() or add_sample() first".format(self))
+
+        if len(self._sums) >= AMBIGUOUS:
+            raise ValueError("{}: at most {} colors".format(self, AMBIGUOUS - 1))
+
+        self.names = sorted(self._sums)
+        self.centroids = []
+
+        for name in self.names:
+            (l_sum, a_sum, b_sum, count) = self._sums[name]
+            self.centroids.append((l_sum / count, a_sum / count, b_sum / count))
+
+        # whole cubes from margin below the lowest sample to margin above the highest
+        step = self.step
+        self.origin = tuple(int((low - self.margin) // step) * step for low in self._low)
+        self.cells = tuple(
+            int((high + self.margin - origin) // step) + 1 for (high, origin) in zip(self._high, self.origin)
+        )
+        self.build_grid()
+        log_msg("{}: trained, {} of {} cells ambiguous".format(self, self.grid.count(AMBIGUOUS), len(self.grid)))
+
+    def build_grid(self):
+        """
+        Work out which centroid each grid cube belongs to, :meth:`train` calls this
+        """
+        step = self.step
+        half = step / 2
+        centroids = self.centroids
+        (l_origin, a_origin, b_origin) = self.origin
+        (l_cells, a_cells, b_cells) = self.cells
+        grid = bytearray(l_cells * a_cells * b_cells)
+        cell = 0
+
+        for i in range(l_cells):
+            l_low = l_origin + i * step
+
+            for j in range(a_cells):
+                a_low = a_origin + j * step
+
+                for k in range(b_cells):
+                    b_low = b_origin + k * step
+                    nearest = self.nearest((l_low + half, a_low + half, b_low + half))
+                    (l_near, a_near, b_near) = centroids[nearest]
+                    near_squared = l_near * l_near + a_near * a_near + b_near * b_near
+
+                    for (index, (l_other, a_other, b_other)) in enumerate(centroids):
+                        if index == nearest:
+                            continue
+
+                        # how much further the other centroid is than the nearest, squared, is
+                        # linear across the cube so its lowest is at one of the corners
+                        (l_diff, a_diff, b_diff) = (l_near - l_other, a_near - a_other, b_near - b_other)
+                        margin = (
+                            2 * (l_low if l_diff > 0 else l_low + step) * l_diff
+                            + 2 * (a_low if a_diff > 0 else a_low + step) * a_diff
+                            + 2 * (b_low if b_diff > 0 else b_low + step) * b_diff
+                            + l_other * l_other
+                            + a_other * a_other
+                            + b_other * b_other
+                            - near_squared
+                        )
+
+                        if margin <= 0:
+                            nearest = AMBIGUOUS
+                            break
+
+                    grid[cell] = nearest
+                    cell += 1
+
+        self.grid = grid
+
+    def nearest(self, lab):
+        """
+        Args:
+            lab (tuple): an (L, a, b) reading
+
+        Returns:
+            int: the index in :attr:`names` of the nearest centroid, found by comparing against each
+        """
+        (lightness, a, b) = lab
+        best = 0
+        best_squared = None
+
+        for (index, (l_centroid, a_centroid, b_centroid)) in enumerate(self.centroids):
+            squared = (
+                (lightness - l_centroid) * (lightness - l_centroid)
+                + (a - a_centroid) * (a - a_centroid)
+                + (b - b_centroid) * (b - b_centroid)
+            )
+
+            if best_squared is None or squared < best_squared:
+                (best, best_squared) = (index, squared)
+
+        return best
+
+    def classify(self, lab):
+        """
+        Args:
+            lab (tuple): an (L, a, b) reading
+
+        Returns:
+            str: the name of the nearest color
+        """
+        step = self.step
+        (l_origin, a_origin, b_origin) = self.origin
+        (l_cells, a_cells, b_cells) = self.cells
+        i = (lab[0] - l_origin) / step
+        j = (lab[1] - a_origin) / step
+        k = (lab[2] - b_origin) / step
+
+        if 0 <= i < l_cells and 0 <= j < a_cells and 0 <= k < b_cells:
+            index = self.grid[(int(i) * a_cells + int(j)) * b_cells + int(k)]
+
+            if index != AMBIGUOUS:
+                return self.names[index]
+
+        self.fallbacks += 1
+        return self.names[self.nearest(lab)]
+
+    def read(self, sensor):
+        """
+        Args:
+            sensor (ColorSensor): the sensor
+
+        Returns:
+            str: the name of the color under ``sensor``
+        """
+        return self.classify(sensor.lab())
+
+    def save(self, filename):
+        """
+        Write the centroids and grid to ``filename``: a header line with the grid's size and
+        place, one line per color with its centroid, a blank line, then the grid one byte per cube
+        """
+        if self.grid is None:
+            raise ValueError("{}: nothing to save, call train() first".format(self))
+
+        with open(filename, "wb") as fh:
+            fh.write(
+                "{} {} {} {} {} {} {} {} {} {}\n".format(
+                    FILE_MAGIC, FILE_VERSION, len(self.names), self.step, *(self.origin + self.cells)
+                ).encode()
+            )
+
+            for (name, (lightness, a, b)) in zip(self.names, self.centroids):
+                fh.write("{} {} {} {}\n".format(name, lightness, a, b).encode())
+
+            fh.write(b"\n")
+            fh.write(self.grid)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Read a classifier written by :meth:`save`
+
+        Returns:
+            ColorClassifier: ready to :meth:`classify`
+        """
+        with open(filename, "rb") as fh:
+            header = fh.readline().decode().split()
+
+            if len(header) != 10 or header[0] != FILE_MAGIC or int(header[1]) != FILE_VERSION:
+                raise ValueError("{} is not a spikedev color classifier version {}".format(filename, FILE_VERSION))
+
+            (count, step, l_origin, a_origin, b_origin, l_cells, a_cells, b_cells) = [
+                int(field) for field in header[2:]
+            ]
+            classifier = cls(step)
+            classifier.origin = (l_origin, a_origin, b_origin)
+            classifier.cells = (l_cells, a_cells, b_cells)
+
+            for _ in range(count):
+                (name, lightness, a, b) = fh.readline().decode().split()
+                classifier.names.append(name)
+                classifier.centroids.append((float(lightness), float(a), float(b)))
+
+            fh.readline()
+            size = l_cells * a_cells * b_cells
+            classifier.grid = bytearray(fh.read(size))
+
+        if len(classifier.grid) != size:
+            raise ValueError(
+                "{} is truncated, the grid is {} bytes not {}".format(filename, len(classifier.grid), size)
+            )
+
+        return classifier
@@ -0,0 +1,147 @@
+"""
+A completion flag that callbacks signal and blocking calls wait on
+"""
+
+# standard libraries
+import utime
+
+# When we have no idea how long a wait will take, poll starting at this interval...
+MIN_POLL_MS = 1
+
+# ...and back off to this interval
+MAX_POLL_MS = 10
+
+# While spinning, the granularity of each spin
+SPIN_US = 100
+
+
+class Completion:
+    """
+    Signalled by a callback via :meth:`set`, waited on via :meth:`wait` or :meth:`wait_async`.
+
+    SPIKE does not have the ``_thread`` module so a wait is a sleep loop. Callbacks
+    are delivered between bytecodes, they do not cut a ``utime.sleep`` short, so how
+    long each sleep is decides how late we notice a completion. Waits keep that short
+    without burning the interpreter:
+
+    * if the operation has an expected duration (see :meth:`clear`) we sleep in one
+      go until ``spin_ms`` before it should finish
+    * from there until ``spin_ms`` after it we spin in ``SPIN_US`` steps
+    * otherwise we poll, starting at ``MIN_POLL_MS`` and backing off to ``MAX_POLL_MS``
+
+    Args:
+        spin_ms (int): how long to busy-wait around the expected finish, 0 to never busy-wait
+    """
+
+    def __init__(self, spin_ms=3):
+        self.spin_ms = spin_ms
+        self.done = False
+        self.reason = None
+        self.expected_ms = None
+        self.started = utime.ticks_ms()
+        self._poll_ms = MIN_POLL_MS
+
+    def __str__(self):
+        return "{}(done {}, reason {})".format(self.__class__.__name__, self.done, self.reason)
+
+    def clear(self, expected_ms=None):
+        """
+        Reset the flag before starting a new operation
+
+        Args:
+            expected_ms (int): how long the operation is expected to take, ``None`` if unknown.
+                This must not overestimate, a later finish only costs some polling.
+        """
+        self.done = False
+        self.reason = None
+        self.expected_ms = expected_ms
+        self.started = utime.ticks_ms()
+
+    def set(self, reason=None):
+        """
+        Signal completion. This is called from callbacks so it only assigns two attributes.
+        """
+        self.reason = reason
+        self.done = True
+
+    def is_set(self):
+        """
+        Returns:
+            bool: True if :meth:`set` has been called since the last :meth:`clear`
+        """
+        return self.done
+
+    def _next_sleep_us(self):
+        """
+        How long to sleep before checking again
+        """
+        if self.expected_ms is not None:
+            since_start_ms = utime.ticks_diff(utime.ticks_ms(), self.started)
+
+            if since_start_ms < self.expected_ms - self.spin_ms:
+                return (self.expected_ms - self.spin_ms - since_start_ms) * 1000
+
+            if self.spin_ms and since_start_ms < self.expected_ms + self.spin_ms:
+                return SPIN_US
+
+        sleep_us = self._poll_ms * 1000
+        self._poll_ms = min(self._poll_ms * 2, MAX_POLL_MS)
+        return sleep_us
+
+    def wait(self, timeout_ms=None):
+        """
+        Wait for :meth:`set` to be called
+
+        Args:
+            timeout_ms (int): give up after this many milliseconds, ``None`` waits forever
+
+        Returns:
+            bool: ``True`` if we were signalled, ``False`` if ``timeout_ms`` expired
+        """
+        start = utime.ticks_ms()
+        self._poll_ms = MIN_POLL_MS
+
+        while not self.done:
+            sleep_us = self._next_sleep_us()
+
+            if timeout_ms is not None:
+                remaining_ms = timeout_ms - utime.ticks_diff(utime.ticks_ms(), start)
+
+                if remaining_ms <= 0:
+                    return False
+
+                sleep_us = min(sleep_us, remaining_ms * 1000)
+
+            # sleep_ms lets the hub idle, sleep_us is a busy-wait
+            if sleep_us >= 1000:
+                utime.sleep_ms(sleep_us // 1000)
+            else:
+                utime.sleep_us(sleep_us)
+
+        return True
+
+    async def wait_async(self, timeout_ms=None):
+        """
+        Like :meth:`wait` but lets other ``uasyncio`` tasks run while we wait.
+        Spinning would starve the other tasks so it is replaced by 1ms sleeps.
+        """
+        # third party libraries
+        import uasyncio
+
+        start = utime.ticks_ms()
+        self._poll_ms = MIN_POLL_MS
+
+        while not self.done:
+            sleep_us = self._next_sleep_us()
+
+            if timeout_ms is not None:
+                remaining_ms = timeout_ms - utime.ticks_diff(utime.ticks_ms(), start)
+
+                if remaining_ms <= 0:
+                    return False
+
+                sleep_us = min(sleep_us, remaining_ms * 1000)
+
+            await uasyncio.sleep_ms(max(1, sleep_us // 1000))
+
+        return True
@@ -0,0 +1,224 @@
+"""
+PID controllers for closed-loop motor and sensor control
+"""
+
+# standard libraries
+import utime
+
+# Gains and state of PIDInteger are fixed-point with this many fractional bits
+FIXED_POINT_BITS = 10
+
+
+class PID:
+    """
+    A PID controller whose output is a motor speed percentage.
+
+    Call :meth:`update` with each new measurement and send the result to the motors.
+    ``dt`` is measured with ``utime.ticks_diff`` between updates so the gains do not
+    depend on how often you call it, ``ki`` is per second and ``kd`` is in seconds.
+
+    * the output is clamped to ``output_min``..``output_max``, -100..100 by default, the
+      range ``run_at_speed`` accepts
+    * anti-windup, the integral stops growing while the output is saturated in the same
+      direction and is itself clamped to the output range
+    * the derivative is of the measurement rather than the error, so changing the
+      setpoint does not kick the output, and is low-pass filtered. ``derivative_filter``
+      is how much of the previous derivative to keep each update, 0 for no filtering.
+
+    :meth:`update` creates no lists, tuples or other objects, but on MicroPython every
+    float result is itself a heap object. See :class:`PIDInteger` for a version without
+    floats at all.
+
+    Args:
+        kp (float): proportional gain
+        ki (float): integral gain
+        kd (float): derivative gain
+        setpoint (float): the measurement we want
+        output_min (float): the lowest output
+        output_max (float): the highest output
+        derivative_filter (float): from 0 to less than 1
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.control import PID
+        from spikedev.sensor import ColorSensor
+        from spikedev.tank import MoveTank
+
+        sensor = ColorSensor(hub.port.C)
+        tank = MoveTank(hub.port.E, hub.port.F)
+
+        # follow the edge of a line, 50% reflected light is half on and half off it
+        pid = PID(kp=1.2, ki=0.5, kd=0.05, setpoint=50)
+
+        while True:
+            turn = pid.update(sensor.reflected_light_intensity())
+            tank.run_at_speed(40 + turn / 2, 40 - turn / 2)
+    """
+
+    def __init__(self, kp, ki=0, kd=0, setpoint=0, output_min=-100, output_max=100, derivative_filter=0.5):
+        if output_min >= output_max:
+            raise ValueError("output_min {} must be less than output_max {}".format(output_min, output_max))
+
+        if not 0 <= derivative_filter < 1:
+            raise ValueError("derivative_filter {} is invalid, must be >= 0 and < 1".format(derivative_filter))
+
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.setpoint = setpoint
+        self.output_min = output_min
+        self.output_max = output_max
+        self.derivative_filter = derivative_filter
+        self.reset()
+
+    def __str__(self):
+        return "{}(kp {}, ki {}, kd {})".format(self.__class__.__name__, self.kp, self.ki, self.kd)
+
+    def reset(self):
+        """
+        Forget the integral, derivative and last measurement, e.g. before starting a new move
+        """
+        self.integral = 0
+        self.derivative = 0
+        self.output = 0
+        self._last_measurement = None
+        self._last_ms = 0
+
+    def update(self, measurement, now_ms=None):
+        """
+        Args:
+            measurement (float): the latest measurement
+            now_ms (int): ``utime.ticks_ms()`` of the measurement, defaults to now
+
+        Returns:
+            float: the new output
+        """
+        if now_ms is None:
+            now_ms = utime.ticks_ms()
+
+        error = self.setpoint - measurement
+
+        if self._last_measurement is None:
+            # nothing to integrate or differentiate yet
+            dt = 0
+        else:
+            dt = utime.ticks_diff(now_ms, self._last_ms) / 1000
+
+        if dt > 0:
+            derivative = (self._last_measurement - measurement) / dt
+            self.derivative = self.derivative_filter * self.derivative + (1 - self.derivative_filter) * derivative
+
+            # anti-windup, only integrate while that does not push a saturated output further
+            if not (
+                (self.output >= self.output_max and error > 0) or (self.output <= self.output_min and error < 0)
+            ):
+                self.integral += self.ki * error * dt
+
+                if self.integral > self.output_max:
+                    self.integral = self.output_max
+                elif self.integral < self.output_min:
+                    self.integral = self.output_min
+
+        self._last_measurement = measurement
+        self._last_ms = now_ms
+        output = self.kp * error + self.integral + self.kd * self.derivative
+
+        if output > self.output_max:
+            output = self.output_max
+        elif output < self.output_min:
+            output = self.output_min
+
+        self.output = output
+        return output
+
+
+class PIDInteger(PID):
+    """
+    :class:`PID` in integer fixed-point arithmetic.
+
+    MicroPython allocates every float it creates on the heap, so a float PID running at
+    hundreds of Hz keeps the garbage collector busy. Here the gains are converted to
+    fixed-point once, with ``FIXED_POINT_BITS`` fractional bits, and :meth:`update` only
+    uses small ints. Measurements and the setpoint must be ints, as sensor readings and
+    encoder positions already are, and the output is an int percentage.
+
+    The arguments are the same as :class:`PID`. ``integral`` and ``derivative`` are
+    converted from the fixed-point state each time they are read, in the same units as
+    :class:`PID`, so reading them is what creates a float.
+    """
+
+    def __init__(self, kp, ki=0, kd=0, setpoint=0, output_min=-100, output_max=100, derivative_filter=0.5):
+        super().__init__(kp, ki, kd, setpoint, output_min, output_max, derivative_filter)
+        one = 1 << FIXED_POINT_BITS
+        self._kp = int(round(kp * one))
+        self._ki = int(round(ki * one))
+        self._kd = int(round(kd * one * 1000))
+        self._filter = int(round(derivative_filter * one))
+
+        # the integral is kept in fixed-point milliseconds, so it needs no division per update
+        self._integral_max = output_max * one * 1000
+        self._integral_min = output_min * one * 1000
+
+    @property
+    def integral(self):
+        return self._integral / (1000 << FIXED_POINT_BITS)
+
+    @integral.setter
+    def integral(self, value):
+        self._integral = int(round(value * (1000 << FIXED_POINT_BITS)))
+
+    @property
+    def derivative(self):
+        # fixed-point per millisecond to per second
+        return self._derivative * 1000 / (1 << FIXED_POINT_BITS)
+
+    @derivative.setter
+    def derivative(self, value):
+        self._derivative = int(round(value * (1 << FIXED_POINT_BITS) / 1000))
+
+    def update(self, measurement, now_ms=None):
+        """
+        Args:
+            measurement (int): the latest measurement
+            now_ms (int): ``utime.ticks_ms()`` of the measurement, defaults to now
+
+        Returns:
+            int: the new output
+        """
+        if now_ms is None:
+            now_ms = utime.ticks_ms()
+
+        error = self.setpoint - measurement
+        dt_ms = 0 if self._last_measurement is None else utime.ticks_diff(now_ms, self._last_ms)
+
+        if dt_ms > 0:
+            # the derivative is in fixed-point units of measurement per millisecond
+            derivative = ((self._last_measurement - measurement) << FIXED_POINT_BITS) // dt_ms
+            self._derivative = (
+                self._filter * self._derivative + ((1 << FIXED_POINT_BITS) - self._filter) * derivative
+            ) >> FIXED_POINT_BITS
+
+            if not ((self.output >= self.output_max and error > 0) or (self.output <= self.output_min and error < 0)):
+                self._integral += self._ki * error * dt_ms
+
+                if self._integral > self._integral_max:
+                    self._integral = self._integral_max
+                elif self._integral < self._integral_min:
+                    self._integral = self._integral_min
+
+        self._last_measurement = measurement
+        self._last_ms = now_ms
+        output = (
+            self._kp * error + self._integral // 1000 + ((self._kd * self._derivative) >> FIXED_POINT_BITS)
+        ) >> FIXED_POINT_BITS
+
+        if output > self.output_max:
+            output = self.output_max
+        elif output < self.output_min:
+            output = self.output_min
+
+        self.output = output
+        return output
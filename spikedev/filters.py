@@ -0,0 +1,322 @@
+"""
+Streaming filters for smoothing noisy sensor readings
+"""
+
+# spikedev libraries
+from spikedev.control import FIXED_POINT_BITS
+
+
+class Filter:
+    """
+    A base class for streaming filters. Feed each new reading to ``update()``, or give the
+    filter a ``source`` to read from and call :meth:`read`.
+
+    Filters take and return ints, as sensor readings are. Any state that needs a fraction
+    is kept in fixed-point with ``FIXED_POINT_BITS`` fractional bits, like
+    :class:`spikedev.control.PIDInteger`, so ``update()`` creates no objects. A reading of
+    ``None``, e.g. a :class:`spikedev.sensor.DistanceSensor` with nothing in range, is
+    skipped and the last output returned. Each filter provides ``update(reading)``, which
+    takes the next reading and returns the filtered value.
+
+    Args:
+        source (callable): returns the next reading, e.g. ``sensor.reflected_light_intensity``
+            or ``sensor.latest``
+    """
+
+    def __init__(self, source=None):
+        self.source = source
+        self.reset()
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def reset(self):
+        """
+        Forget every reading so far
+        """
+        self.value = None
+        self.count = 0
+
+    def read(self):
+        """
+        Returns:
+            int: the filtered value after reading one more sample from ``source``
+        """
+        return self.update(self.source())
+
+
+class MedianFilter(Filter):
+    """
+    The median of the last ``window`` readings. A median ignores the odd wild reading
+    entirely where an average is dragged towards it.
+
+    The window is kept both in arrival order and sorted. Each update finds where the oldest
+    reading is and where the new one goes by binary search, then shifts the readings in
+    between along by one in place. That is O(log n) comparisons but up to ``window`` moves,
+    so an update is O(n) in the window. Keep the window to the handful of readings a
+    sensor filter needs.
+
+    Args:
+        window (int): how many readings, an odd number gives a true middle value
+        source (callable): see :class:`Filter`
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.filters import MedianFilter
+        from spikedev.sensor import DistanceSensor
+
+        ds = DistanceSensor(hub.port.A)
+        distance = MedianFilter(5, source=lambda: ds.value()[0])
+
+        while True:
+            print(distance.read())
+    """
+
+    def __init__(self, window=5, source=None):
+        if window < 1:
+            raise ValueError("window {} is invalid, must be >= 1".format(window))
+
+        self.window = window
+        self._ring = [0] * window
+        self._sorted = [0] * window
+        self._next = 0
+        super().__init__(source)
+
+    def reset(self):
+        super().reset()
+        self._next = 0
+
+    def _bisect(self, reading, n, right):
+        # the first index in _sorted[:n] whose value is > reading if right, >= reading if not
+        (lo, hi) = (0, n)
+        values = self._sorted
+
+        while lo < hi:
+            mid = (lo + hi) >> 1
+
+            if values[mid] < reading or (right and values[mid] == reading):
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return lo
+
+    def update(self, reading):
+        if reading is None:
+            return self.value
+
+        values = self._sorted
+        n = self.count
+
+        if n < self.window:
+            # still filling the window, insert the new reading
+            j = self._bisect(reading, n, True)
+
+            for k in range(n, j, -1):
+                values[k] = values[k - 1]
+
+            values[j] = reading
+            n += 1
+            self.count = n
+        else:
+            # replace the oldest reading with the new one
+            i = self._bisect(self._ring[self._next], n, False)
+            j = self._bisect(reading, n, True)
+
+            if j > i:
+                for k in range(i, j - 1):
+                    values[k] = values[k + 1]
+
+                values[j - 1] = reading
+            else:
+                for k in range(i, j, -1):
+                    values[k] = values[k - 1]
+
+                values[j] = reading
+
+        self._ring[self._next] = reading
+        self._next = self._next + 1 if self._next + 1 < self.window else 0
+        self.value = values[n >> 1]
+        return self.value
+
+
+class EMAFilter(Filter):
+    """
+    An exponential moving average, each update moves the output ``alpha`` of the way
+    towards the new reading. O(1), and a smaller ``alpha`` smooths more but lags more.
+
+    Args:
+        alpha (float): from more than 0 to 1
+        source (callable): see :class:`Filter`
+    """
+
+    def __init__(self, alpha=0.3, source=None):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha {} is invalid, must be > 0 and <= 1".format(alpha))
+
+        self.alpha = alpha
+        self._alpha = int(round(alpha * (1 << FIXED_POINT_BITS)))
+        super().__init__(source)
+
+    def reset(self):
+        super().reset()
+        self._state = 0
+
+    def update(self, reading):
+        if reading is None:
+            return self.value
+
+        if not self.count:
+            self._state = reading << FIXED_POINT_BITS
+        else:
+            self._state += (self._alpha * ((reading << FIXED_POINT_BITS) - self._state)) >> FIXED_POINT_BITS
+
+        self.count += 1
+        self.value = (self._state + (1 << (FIXED_POINT_BITS - 1))) >> FIXED_POINT_BITS
+        return self.value
+
+
+class KalmanFilter(Filter):
+    """
+    A one dimensional Kalman filter for a reading that should be steady or changing slowly.
+
+    ``measurement_noise`` is the variance of the sensor's noise and ``process_noise`` how
+    much the true value may change, as a variance, between readings. The filter weighs each
+    reading by how uncertain its estimate is, so it locks on quickly from a cold start and
+    then smooths as hard as those two allow. O(1).
+
+    Args:
+        measurement_noise (float): variance of a reading about the true value
+        process_noise (float): variance of the change in the true value per reading
+        source (callable): see :class:`Filter`
+    """
+
+    def __init__(self, measurement_noise=4, process_noise=0.05, source=None):
+        if measurement_noise <= 0 or process_noise < 0:
+            raise ValueError(
+                "measurement_noise {} must be > 0 and process_noise {} >= 0".format(measurement_noise, process_noise)
+            )
+
+        self.measurement_noise = measurement_noise
+        self.process_noise = process_noise
+        self._r = max(1, int(round(measurement_noise * (1 << FIXED_POINT_BITS))))
+        self._q = int(round(process_noise * (1 << FIXED_POINT_BITS)))
+        super().__init__(source)
+
+    def reset(self):
+        super().reset()
+        self._state = 0
+        self._variance = 0
+        self.gain = 0
+
+    def update(self, reading):
+        if reading is None:
+            return self.value
+
+        if not self.count:
+            # the first reading is all we know
+            self._state = reading << FIXED_POINT_BITS
+            self._variance = self._r
+        else:
+            variance = self._variance + self._q
+            gain = (variance << FIXED_POINT_BITS) // (variance + self._r)
+            self._state += (gain * ((reading << FIXED_POINT_BITS) - self._state)) >> FIXED_POINT_BITS
+            self._variance = (((1 << FIXED_POINT_BITS) - gain) * variance) >> FIXED_POINT_BITS
+            self.gain = gain
+
+        self.count += 1
+        self.value = (self._state + (1 << (FIXED_POINT_BITS - 1))) >> FIXED_POINT_BITS
+        return self.value
+
+
+class OutlierFilter(Filter):
+    """
+    Drop readings more than ``threshold`` from the last accepted one, returning that one
+    instead. A real jump would be dropped forever, so after ``max_rejects`` readings in a
+    row have been dropped the next is accepted. O(1).
+
+    Args:
+        threshold (int): how far from the last accepted reading is too far
+        max_rejects (int): how many readings in a row may be dropped
+        source (callable): see :class:`Filter`
+    """
+
+    def __init__(self, threshold=10, max_rejects=3, source=None):
+        self.threshold = threshold
+        self.max_rejects = max_rejects
+        super().__init__(source)
+
+    def reset(self):
+        super().reset()
+
+        # how many readings have been dropped since the last reset
+        self.rejected = 0
+        self._rejects = 0
+
+    def update(self, reading):
+        if reading is None:
+            return self.value
+
+        if (
+            self.count
+            and self._rejects < self.max_rejects
+            and (reading - self.value > self.threshold or self.value - reading > self.threshold)
+        ):
+            self._rejects += 1
+            self.rejected += 1
+            return self.value
+
+        self._rejects = 0
+        self.count += 1
+        self.value = reading
+        return reading
+
+
+class FilterChain(Filter):
+    """
+    Run each reading through several filters in turn
+
+    Args:
+        *filters: the filters, in order
+        source (callable): see :class:`Filter`
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.filters import EMAFilter, FilterChain, MedianFilter, OutlierFilter
+        from spikedev.sensor import ColorSensor
+
+        sensor = ColorSensor(hub.port.B)
+        reflected = FilterChain(
+            OutlierFilter(20), MedianFilter(5), EMAFilter(0.5), source=sensor.reflected_light_intensity
+        )
+
+        while True:
+            print(reflected.read())
+    """
+
+    def __init__(self, *filters, source=None):
+        self.filters = filters
+        super().__init__(source)
+
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, ", ".join([str(f) for f in self.filters]))
+
+    def reset(self):
+        super().reset()
+
+        for f in self.filters:
+            f.reset()
+
+    def update(self, reading):
+        for f in self.filters:
+            reading = f.update(reading)
+
+        self.count += 1
+        self.value = reading
+        return reading
@@ -0,0 +1,243 @@
+"""
+Start moves on several motors and drive bases at once and wait for them together
+"""
+
+# standard libraries
+import utime
+
+# spikedev libraries
+from spikedev.completion import Completion
+from spikedev.logging import log_msg
+from spikedev.motor import MotorCallbackEvent
+
+
+class GroupWait:
+    """
+    * ``ALL`` the group is done when every member has finished
+    * ``ANY`` the group is done when the first member finishes
+    """
+
+    ALL = 0
+    ANY = 1
+
+
+class MotorGroup:
+    """
+    Run moves on any number of :class:`spikedev.motor.Motor`, :class:`spikedev.tank.MoveTank`
+    or :class:`spikedev.tank.MoveDifferential` at the same time.
+
+    ``block=True`` moves one after another leave every other motor idle. Here every move
+    is started with ``block=False`` in the same tick and the group waits on a single
+    :class:`spikedev.completion.Completion`. The group subscribes to each member's firmware
+    callback, see :meth:`spikedev.motor.Motor.subscribe`, and that completion is set once
+    every member has finished, or the first one, see :class:`GroupWait`.
+
+    A member already busy with a move when the group starts has that move's callback,
+    usually ``INTERRUPTED``, still to come. :meth:`start` notes which members are busy and
+    the group ignores the first callback from each of those.
+
+    After a move :attr:`finish_ms` holds when each member finished, in milliseconds since
+    the moves started, :attr:`reasons` its ``MotorCallbackEvent`` and :attr:`skew_ms` how
+    far apart the first and last finished.
+
+    Args:
+        *members: the motors and drive bases, in the order :meth:`run` takes their moves
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.group import MotorGroup
+        from spikedev.motor import SpikeLargeMotor, SpikeMediumMotor
+        from spikedev.tank import MoveDifferential
+        from spikedev.unit import DistanceStuds
+        from spikedev.wheel import SpikeLargeWheel
+
+        adb = MoveDifferential(hub.port.A, hub.port.E, SpikeLargeWheel, DistanceStuds(19), motor_class=SpikeLargeMotor)
+        rear = SpikeMediumMotor(hub.port.C)
+        front = SpikeMediumMotor(hub.port.D)
+
+        # drive while lowering both arms, return once all three are done
+        group = MotorGroup(adb, rear, front)
+        group.run((adb.run_for_distance, 300, 50), (rear.run_to_position, -180, 40), (front.run_for_degrees, 90, 40))
+    """
+
+    def __init__(self, *members):
+        if not members:
+            raise ValueError("a MotorGroup needs at least one member")
+
+        self.members = members
+        self.completion = Completion()
+        self.completion.set()
+        self.wait_for = GroupWait.ALL
+
+        count = len(members)
+        self.reasons = [None] * count
+        self._armed = [False] * count
+        self._stale = [False] * count
+        self._finish_us = [0] * count
+        self._pending = 0
+        self._start_us = 0
+
+        # one callback per member, created once, that knows which member it belongs to
+        self._callbacks = [self._member_callback(index) for index in range(count)]
+
+        for (member, callback) in zip(members, self._callbacks):
+            member.subscribe(callback)
+
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, ", ".join([str(member) for member in self.members]))
+
+    def _member_callback(self, index):
+        def callback(reason):
+            self._finished(index, reason)
+
+        return callback
+
+    def _finished(self, index, reason):
+        # called from the firmware callback, must not allocate
+        if self._stale[index]:
+            # the end of the move the member was busy with when we started
+            self._stale[index] = False
+            return
+
+        if not self._armed[index]:
+            return
+
+        self._armed[index] = False
+        self._finish_us[index] = utime.ticks_us()
+        self.reasons[index] = reason
+        self._pending -= 1
+
+        if not self._pending or self.wait_for == GroupWait.ANY:
+            self.completion.set(reason)
+
+    def close(self):
+        """
+        Unsubscribe from the members' callbacks, the group cannot be used afterwards
+        """
+        for (member, callback) in zip(self.members, self._callbacks):
+            member.unsubscribe(callback)
+
+    def start(self, wait_for=GroupWait.ALL):
+        """
+        Get ready to start a move on every member, call this before starting them
+        yourself with ``block=False``. :meth:`run` calls it for you.
+
+        Args:
+            wait_for (GroupWait): finish when ``ALL`` members have finished or ``ANY`` has
+        """
+        if wait_for not in (GroupWait.ALL, GroupWait.ANY):
+            raise ValueError("wait_for {} is invalid, must be GroupWait.ALL or GroupWait.ANY".format(wait_for))
+
+        count = len(self.members)
+        self.wait_for = wait_for
+        self._pending = count
+
+        for (index, member) in enumerate(self.members):
+            # a member whose last move has not reported back yet will report on it after ours starts
+            self._stale[index] = member._stale or not member.completion.done
+            self._armed[index] = True
+            self.reasons[index] = None
+
+        self.completion.clear()
+        self._start_us = utime.ticks_us()
+
+    def wait(self, timeout_ms=None):
+        """
+        Wait for the moves started after :meth:`start`
+
+        Args:
+            timeout_ms (int): give up after this many milliseconds, ``None`` waits forever
+
+        Returns:
+            bool: ``True`` if the group finished, ``False`` if ``timeout_ms`` expired
+        """
+        if not self.completion.wait(timeout_ms):
+            return False
+
+        self._log()
+        return True
+
+    async def wait_async(self, timeout_ms=None):
+        """
+        Like :meth:`wait` but lets other ``uasyncio`` tasks run while we wait
+        """
+        if not await self.completion.wait_async(timeout_ms):
+            return False
+
+        self._log()
+        return True
+
+    def _log(self):
+        # logged here rather than in the callback, which must not allocate
+        for (member, reason) in zip(self.members, self.reasons):
+            if reason == MotorCallbackEvent.INTERRUPTED:
+                log_msg("{}: {} INTERRUPTED".format(self, member))
+            elif reason == MotorCallbackEvent.STALL:
+                log_msg("{}: {} STALL".format(self, member))
+
+    def run(self, *moves, wait_for=GroupWait.ALL, block=True, timeout_ms=None):
+        """
+        Start one move per member, in the order the members were given, in the same tick
+
+        Args:
+            *moves: one ``(method, arg, ...)`` tuple per member, ``method`` must take a ``block``
+                keyword, e.g. ``(arm.run_for_degrees, 90, 40)``. ``None`` leaves that member alone.
+            wait_for (GroupWait): finish when ``ALL`` members have finished or ``ANY`` has
+            block (bool): if True wait for the group to finish
+            timeout_ms (int): if blocking, give up after this many milliseconds
+
+        Returns:
+            bool: ``False`` if ``timeout_ms`` expired, else ``True``
+        """
+        if len(moves) != len(self.members):
+            raise ValueError("{}: {} moves for {} members".format(self, len(moves), len(self.members)))
+
+        self.start(wait_for)
+
+        for (index, move) in enumerate(moves):
+            if move is None:
+                # nothing to wait for
+                self._armed[index] = False
+                self._finish_us[index] = None
+                self._pending -= 1
+            else:
+                move[0](*move[1:], block=False)
+
+        if not self._pending:
+            self.completion.set(MotorCallbackEvent.COMPLETED)
+
+        if block:
+            return self.wait(timeout_ms)
+
+        return True
+
+    def stop(self):
+        """
+        Stop every member, e.g. the ones still moving after a :class:`GroupWait.ANY` wait
+        """
+        for member in self.members:
+            member.stop()
+
+    @property
+    def finish_ms(self):
+        """
+        Returns:
+            list: when each member finished in milliseconds since the moves started, ``None`` if it has not
+                or had no move
+        """
+        return [
+            None if armed or finish_us is None else utime.ticks_diff(finish_us, self._start_us) / 1000
+            for (armed, finish_us) in zip(self._armed, self._finish_us)
+        ]
+
+    @property
+    def skew_ms(self):
+        """
+        Returns:
+            float: milliseconds between the first and the last member to finish
+        """
+        finished = [finish_ms for finish_ms in self.finish_ms if finish_ms is not None]
+        return max(finished) - min(finished) if finished else 0
@@ -0,0 +1,291 @@
+"""
+Closed-loop driving and turning of a MoveDifferential using the hub's IMU
+"""
+
+# standard libraries
+import math
+
+import utime
+
+# third party libraries
+import hub
+
+# spikedev libraries
+from spikedev.control import PID
+from spikedev.logging import log_msg
+from spikedev.motor import MotorStop
+from spikedev.profile import (
+    CREEP_FRACTION,
+    DEFAULT_ACCELERATION_MS,
+    DEFAULT_RATE_HZ,
+    PairStallDetector,
+    next_tick,
+    run_pair_at,
+)
+from spikedev.unit import distance_in_mm
+
+
+class Gyro:
+    """
+    The yaw of the hub's IMU, ``hub.motion.yaw_pitch_roll()``, in degrees clockwise.
+
+    The hub reports yaw from -180 to 179, this unwraps it so that turning two full circles
+    clockwise from 0 reads 720.
+
+    Yaw is clockwise positive like :meth:`spikedev.tank.MoveDifferential.turn_degrees`, but
+    :class:`spikedev.odometry.Odometry` headings are counter-clockwise positive. A yaw of
+    ``y`` is an odometry heading of ``-y``, :meth:`heading` does the conversion.
+    """
+
+    def __init__(self):
+        self.motion = hub.motion
+        self.reset()
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def reset(self, yaw=0):
+        """
+        Make the current heading read ``yaw``
+        """
+        self.motion.yaw_pitch_roll(0)
+        self._last = 0
+        self._turns = 0
+        self._base = yaw
+
+    def yaw(self):
+        """
+        Returns:
+            int: degrees clockwise since :meth:`reset`
+        """
+        raw = self.motion.yaw_pitch_roll()[0]
+
+        # wrapped from 179 to -180 or back
+        if raw - self._last > 180:
+            self._turns -= 1
+        elif self._last - raw > 180:
+            self._turns += 1
+
+        self._last = raw
+        return self._base + raw + self._turns * 360
+
+    def heading(self):
+        """
+        Returns:
+            int: degrees counter-clockwise since :meth:`reset`, the :class:`spikedev.odometry.Odometry` convention
+        """
+        return -self.yaw()
+
+
+class GyroDrive:
+    """
+    Drive a :class:`spikedev.tank.MoveDifferential` straight or turn it in place using the
+    hub's IMU to keep it honest.
+
+    ``MoveDifferential.turn_degrees`` turns the wheels the number of degrees that
+    ``wheel_distance_mm`` says should turn the robot, so that has to be tuned by trial and
+    error and still varies with the surface and the battery. :meth:`turn_degrees` here
+    turns until the IMU says we are there. :meth:`run_for_distance` holds the heading the
+    robot had when it started, so it drives straight even if one wheel slips.
+
+    Both read the IMU every ``period_ms`` and correct the wheel speeds with a
+    :class:`spikedev.control.PID`, ``kp`` percent of speed per degree of heading error
+    plus ``ki`` percent per degree-second. Headings are :meth:`Gyro.yaw`, clockwise positive,
+    negate an :class:`spikedev.odometry.Odometry` heading to use it here.
+
+    A move ends early, with the motors stopped, if it takes longer than ``timeout_ms`` or
+    if the robot stops moving, see :class:`spikedev.profile.PairStallDetector`. :attr:`timed_out` and
+    :attr:`stalled` say whether the last move did.
+
+    Args:
+        drive (MoveDifferential): the robot
+        gyro (Gyro): defaults to a new :class:`Gyro`
+        kp (float): proportional gain
+        ki (float): integral gain
+        rate_hz (int): how often to read the IMU and update the wheel speeds
+        tolerance (int): how many degrees off counts as facing the right way
+        acceleration_ms (int): milliseconds for a wheel to go from 0 to ``MAX_DPS``
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.gyro import GyroDrive
+        from spikedev.tank import MoveDifferential
+        from spikedev.unit import DistanceStuds
+        from spikedev.wheel import SpikeWheel
+
+        md = MoveDifferential(hub.port.E, hub.port.F, SpikeWheel, DistanceStuds(11))
+        gd = GyroDrive(md)
+        gd.run_for_distance(500, 60)
+        gd.turn_right(90, 40)
+    """
+
+    def __init__(
+        self,
+        drive,
+        gyro=None,
+        kp=2,
+        ki=1,
+        rate_hz=DEFAULT_RATE_HZ,
+        tolerance=1,
+        acceleration_ms=DEFAULT_ACCELERATION_MS,
+    ):
+        self.drive = drive
+        self.gyro = gyro if gyro is not None else Gyro()
+        self.kp = kp
+        self.ki = ki
+        self.period_ms = max(1, 1000 // rate_hz)
+        self.tolerance = tolerance
+
+        motor = drive.left_motor
+        self.scale = motor.SCALE_DPS
+        self.acceleration = motor.MAX_DPS * 1000 / acceleration_ms
+        self.creep_dps = motor.MAX_DPS * CREEP_FRACTION
+
+        # wheel degrees per degree the robot turns in place, only used to plan how to slow down
+        self.wheel_per_degree = drive.circumference_mm / drive.wheel.circumference_mm
+
+        # the heading that run_for_distance holds and turn_degrees turns to
+        self.target = self.gyro.yaw()
+
+        self.stall_detector = PairStallDetector(drive, self.period_ms)
+        self.timed_out = False
+        self.stalled = False
+
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, self.drive)
+
+    def _positions(self):
+        left = self.drive.left_motor
+        right = self.drive.right_motor
+        return (left._number_with_polarity(left.position), right._number_with_polarity(right.position))
+
+    def _start(self):
+        self.timed_out = False
+        self.stalled = False
+        self.stall_detector.reset(self.creep_dps)
+        return utime.ticks_ms()
+
+    def _ended(self, start_ms, timeout_ms):
+        """
+        Returns:
+            bool: True if the move has run out of time or stalled
+        """
+        if timeout_ms is not None and utime.ticks_diff(utime.ticks_ms(), start_ms) >= timeout_ms:
+            self.timed_out = True
+        elif self.stall_detector.update():
+            self.stalled = True
+
+        return self.timed_out or self.stalled
+
+    def _stop(self, stop):
+        if stop == MotorStop.FLOAT:
+            self.drive.pair.float()
+        else:
+            self.drive.stop()
+
+        if self.timed_out:
+            log_msg("{}: TIMEOUT".format(self))
+        elif self.stalled:
+            self.stall_detector.handle(self)
+
+    def run_for_distance(self, distance, speed, stop=MotorStop.BRAKE, heading=None, timeout_ms=None):
+        """
+        Drive ``distance`` holding ``heading``
+
+        Args:
+            distance (DistanceValue): how far to drive, negative to reverse
+            speed (MotorSpeed): how fast the wheels should turn
+            stop (MotorStop): how to stop the motors, defaults to :class:`MotorStop.BRAKE`
+            heading (int): the yaw to hold, clockwise, defaults to the heading of the last move
+            timeout_ms (int): give up after this many milliseconds, defaults to no limit
+        """
+        if heading is not None:
+            self.target = heading
+
+        distance_mm = distance_in_mm(distance)
+        direction = -1 if distance_mm < 0 else 1
+        wheel_degrees = abs(distance_mm) * 360 / self.drive.wheel.circumference_mm
+        max_dps = abs(self.drive._speed_percentage(speed)) / self.scale
+        (left_start, right_start) = self._positions()
+        (velocity, dt) = (0, self.period_ms / 1000)
+        pid = PID(self.kp, self.ki, setpoint=self.target)
+        start_ms = self._start()
+        next_ms = utime.ticks_add(start_ms, self.period_ms)
+
+        while True:
+            (left, right) = self._positions()
+            remaining = wheel_degrees - direction * ((left - left_start) + (right - right_start)) / 2
+
+            if remaining <= 0 or self._ended(start_ms, timeout_ms):
+                break
+
+            braking = math.sqrt(2 * self.acceleration * remaining)
+            velocity = max(self.creep_dps, min(max_dps, velocity + self.acceleration * dt, braking))
+
+            # clockwise error, speed the left wheel up and the right wheel down to turn clockwise
+            correction = pid.update(self.gyro.yaw()) * velocity / 100
+            run_pair_at(self.drive, direction * velocity + correction, direction * velocity - correction)
+            next_ms = next_tick(next_ms, self.period_ms)
+
+        self._stop(stop)
+        log_msg("{}: drove {}mm, heading {} target {}".format(self, distance_mm, self.gyro.yaw(), self.target))
+
+    def turn_to(self, heading, speed, stop=MotorStop.BRAKE, timeout_ms=None):
+        """
+        Turn in place until the IMU reads ``heading``
+
+        Args:
+            heading (int): the yaw to turn to, clockwise, so an odometry heading ``h`` is ``-h``
+            speed (MotorSpeed): the fastest the wheels should turn
+            stop (MotorStop): how to stop the motors, defaults to :class:`MotorStop.BRAKE`
+            timeout_ms (int): give up after this many milliseconds, defaults to no limit
+        """
+        self.target = heading
+        max_dps = abs(self.drive._speed_percentage(speed)) / self.scale
+        (velocity, dt) = (0, self.period_ms / 1000)
+        pid = PID(self.kp, self.ki, setpoint=heading)
+        start_ms = self._start()
+        next_ms = utime.ticks_add(start_ms, self.period_ms)
+
+        while True:
+            yaw = self.gyro.yaw()
+            error = heading - yaw
+
+            if abs(error) <= self.tolerance or self._ended(start_ms, timeout_ms):
+                break
+
+            # as fast as allowed, as fast as we can accelerate to, slow enough to stop on target
+            braking = math.sqrt(2 * self.acceleration * abs(error) * self.wheel_per_degree)
+            pi_dps = abs(pid.update(yaw)) / self.scale
+            velocity = max(self.creep_dps, min(max_dps, velocity + self.acceleration * dt, braking, pi_dps))
+            turn = velocity if error > 0 else -velocity
+            run_pair_at(self.drive, turn, -turn)
+            next_ms = next_tick(next_ms, self.period_ms)
+
+        self._stop(stop)
+        log_msg(
+            "{}: turned to {} in {}ms, target {}".format(
+                self, self.gyro.yaw(), utime.ticks_diff(utime.ticks_ms(), start_ms), heading
+            )
+        )
+
+    def turn_degrees(self, degrees, speed, stop=MotorStop.BRAKE, timeout_ms=None):
+        """
+        Turn in place ``degrees`` clockwise from the current target heading, negative for counter-clockwise
+        """
+        self.turn_to(self.target + degrees, speed, stop, timeout_ms)
+
+    def turn_right(self, degrees, speed, stop=MotorStop.BRAKE, timeout_ms=None):
+        """
+        Turn clockwise ``degrees`` in place
+        """
+        self.turn_degrees(abs(degrees), speed, stop, timeout_ms)
+
+    def turn_left(self, degrees, speed, stop=MotorStop.BRAKE, timeout_ms=None):
+        """
+        Turn counter-clockwise ``degrees`` in place
+        """
+        self.turn_degrees(-abs(degrees), speed, stop, timeout_ms)
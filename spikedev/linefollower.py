@@ -0,0 +1,236 @@
+"""
+Follow a line with one or two color sensors
+"""
+
+# standard libraries
+import utime
+
+# spikedev libraries
+from spikedev.control import PIDInteger
+from spikedev.logging import log_msg
+from spikedev.motor import MotorPolarity
+from spikedev.sensor import ColorSensorMode
+
+
+class LineEdge:
+    """
+    Which edge of the line a single sensor follows
+
+    * ``LEFT`` the sensor rides the left edge, white to its left and the line to its right
+    * ``RIGHT`` the sensor rides the right edge
+    """
+
+    LEFT = 1
+    RIGHT = -1
+
+
+class LineFollower:
+    """
+    Follow a line with a :class:`spikedev.tank.MoveTank` and one or two :class:`spikedev.sensor.ColorSensor`.
+
+    With one sensor the robot steers to keep the reflected light at ``target``, half on the
+    line and half off it, along one ``edge`` of the line. With two sensors either side of the
+    line it steers to keep both reading the same.
+
+    Everything that does not change from one tick to the next is worked out once, up front:
+
+    * the sensors are put in ``REFLT`` mode once, each tick reads ``port.device.get()``
+      directly instead of going through ``_ensure_mode``
+    * the base speed is converted to a percentage once and the motor polarities become
+      a sign, instead of ``run_at_speed`` redoing ``_speed_percentage`` and
+      ``_speed_with_polarity`` for both wheels every tick
+    * steering comes from a :class:`spikedev.control.PIDInteger` so the loop does no
+      float arithmetic
+
+    :meth:`run` ticks at ``rate_hz`` and records how many ticks it ran, how late each
+    started (jitter) and how many it had to skip (overruns). Or call :meth:`update` from
+    your own loop or a :class:`spikedev.scheduler.Scheduler` task.
+
+    Args:
+        tank (MoveTank): the robot
+        sensor (ColorSensor): the sensor, or the left sensor if there are two
+        right_sensor (ColorSensor): the right sensor, ``None`` for single sensor line following
+        speed (MotorSpeed): the speed of both wheels on a straight line
+        pid (PID): the steering controller, its output is the percentage added to one wheel and
+            taken from the other. Defaults to ``PIDInteger(1, 0, 0.02)``
+        target (int): the reflected light to aim for with a single sensor, ignored with two
+        edge (LineEdge): which edge a single sensor follows
+        rate_hz (int): how often :meth:`run` ticks
+        acceleration (int): passed to ``pair.run_at_speed``, 0 so steering takes effect at once
+        deceleration (int): passed to ``pair.run_at_speed``
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.linefollower import LineFollower
+        from spikedev.sensor import ColorSensor
+        from spikedev.tank import MoveTank
+
+        tank = MoveTank(hub.port.E, hub.port.F)
+        follower = LineFollower(tank, ColorSensor(hub.port.C), speed=40)
+        follower.run(duration_ms=10000)
+        print(follower)
+    """
+
+    def __init__(
+        self,
+        tank,
+        sensor,
+        right_sensor=None,
+        speed=40,
+        pid=None,
+        target=50,
+        edge=LineEdge.LEFT,
+        rate_hz=200,
+        acceleration=0,
+        deceleration=0,
+    ):
+        self.tank = tank
+        self.sensor = sensor
+        self.right_sensor = right_sensor
+        self.pid = pid if pid is not None else PIDInteger(1, 0, 0.02)
+        self.pid.setpoint = 0 if right_sensor is not None else target
+        self.edge = edge if right_sensor is None else 1
+        self.period_us = 1000000 // rate_hz
+        self.acceleration = acceleration
+        self.deceleration = deceleration
+        self.running = False
+
+        # pin the sensor modes and keep the bound get() methods
+        sensor.set_mode(ColorSensorMode.REFLT)
+        self._read = sensor.port.device.get
+
+        if right_sensor is not None:
+            right_sensor.set_mode(ColorSensorMode.REFLT)
+            self._read_right = right_sensor.port.device.get
+
+        # speeds and polarities, as ints
+        self.base_speed = int(tank._speed_percentage(speed))
+        self._left_sign = -1 if tank.left_motor.polarity == MotorPolarity.REVERSED else 1
+        self._right_sign = -1 if tank.right_motor.polarity == MotorPolarity.REVERSED else 1
+        self._run = tank.pair.run_at_speed
+
+        # statistics
+        self.ticks = 0
+        self.overruns = 0
+        self.jitter_max_us = 0
+        self.jitter_total_us = 0
+        self.elapsed_us = 0
+
+    def __str__(self):
+        return "{}: {} ticks at {:.0f}Hz, {} overruns, jitter avg {}us max {}us".format(
+            self.__class__.__name__,
+            self.ticks,
+            self.frequency_hz,
+            self.overruns,
+            self.jitter_avg_us,
+            self.jitter_max_us,
+        )
+
+    @property
+    def frequency_hz(self):
+        """
+        Returns:
+            float: how many ticks per second :meth:`run` achieved
+        """
+        return self.ticks * 1000000 / self.elapsed_us if self.elapsed_us else 0
+
+    @property
+    def jitter_avg_us(self):
+        """
+        Returns:
+            int: how late, on average, each tick of :meth:`run` started
+        """
+        return self.jitter_total_us // self.ticks if self.ticks else 0
+
+    def update(self):
+        """
+        Read the sensors and set the wheel speeds
+        """
+        if self.right_sensor is None:
+            measurement = self._read()[0]
+        else:
+            measurement = self._read()[0] - self._read_right()[0]
+
+        # a positive output means we are drifting right of where we want to be, so turn left
+        turn = int(self.pid.update(measurement, utime.ticks_ms())) * self.edge
+        left = self.base_speed - turn
+        right = self.base_speed + turn
+
+        if left > 100:
+            left = 100
+        elif left < -100:
+            left = -100
+
+        if right > 100:
+            right = 100
+        elif right < -100:
+            right = -100
+
+        # positional args, keyword args would build a dict every tick
+        self._run(left * self._left_sign, right * self._right_sign, 100, self.acceleration, self.deceleration)
+
+    def run(self, duration_ms=None, until=None):
+        """
+        Follow the line until ``duration_ms`` has passed, ``until()`` returns True or :meth:`stop` is called
+
+        Args:
+            duration_ms (int): how long to follow the line for, ``None`` for no limit
+            until (callable): checked after every tick, e.g. a touch sensor's ``is_pressed``
+        """
+        self.pid.reset()
+        self.running = True
+        (ticks, overruns, jitter_max, jitter_total) = (0, 0, 0, 0)
+        period_us = self.period_us
+        start_us = utime.ticks_us()
+        next_us = start_us
+
+        while self.running:
+            wait_us = utime.ticks_diff(next_us, utime.ticks_us())
+
+            if wait_us >= 1000:
+                utime.sleep_ms(wait_us // 1000)
+                wait_us = utime.ticks_diff(next_us, utime.ticks_us())
+
+            if wait_us > 0:
+                utime.sleep_us(wait_us)
+
+            now_us = utime.ticks_us()
+            late_us = utime.ticks_diff(now_us, next_us)
+            self.update()
+            ticks += 1
+            jitter_total += late_us
+
+            if late_us > jitter_max:
+                jitter_max = late_us
+
+            if until is not None and until():
+                break
+
+            if duration_ms is not None and utime.ticks_diff(now_us, start_us) >= duration_ms * 1000:
+                break
+
+            # fixed rate, skip any ticks we were too late for rather than running them back to back
+            next_us = utime.ticks_add(next_us, period_us)
+
+            if late_us >= period_us:
+                missed = late_us // period_us
+                overruns += missed
+                next_us = utime.ticks_add(next_us, missed * period_us)
+
+        self.tank.stop()
+        self.running = False
+        self.ticks = ticks
+        self.overruns = overruns
+        self.jitter_max_us = jitter_max
+        self.jitter_total_us = jitter_total
+        self.elapsed_us = utime.ticks_diff(utime.ticks_us(), start_us)
+        log_msg(str(self))
+
+    def stop(self):
+        """
+        Make :meth:`run` return after the current tick
+        """
+        self.running = False
@@ -0,0 +1,413 @@
+"""
+Queue up MoveDifferential moves and drive them back to back without stopping in between
+"""
+
+# standard libraries
+import math
+
+import utime
+
+# spikedev libraries
+from spikedev.logging import log_msg
+from spikedev.profile import (
+    CREEP_FRACTION,
+    DEFAULT_ACCELERATION_MS,
+    DEFAULT_RATE_HZ,
+    PairStallDetector,
+    run_every,
+    run_pair_at,
+)
+from spikedev.unit import distance_in_mm
+
+# The most a wheel's speed may jump at the boundary between two segments, as a fraction of MAX_DPS
+CORNER_FRACTION = 0.1
+
+
+class Segment:
+    """
+    One queued move. Do not create these directly, use the :class:`MotionQueue` methods.
+
+    ``length`` is in average wheel degrees, the same unit as
+    :meth:`spikedev.tank.MoveTank.run_for_degrees`, and velocities are in average wheel
+    degrees per second. Each wheel turns ``left``/``right`` times the average.
+    """
+
+    def __init__(self, name, length, left, right, max_velocity, acceleration):
+        self.name = name
+        self.length = length
+        self.left = left
+        self.right = right
+        self.max_velocity = max_velocity
+        self.acceleration = acceleration
+
+        # the wheels turn (left, right) * travelled, this recovers travelled from the wheel positions
+        self.norm = left * left + right * right
+
+        # filled in by MotionQueue._plan()
+        self.entry_velocity = 0
+        self.exit_velocity = 0
+
+    def __str__(self):
+        return "{}({} deg, {:.0f} -> {:.0f} deg/sec)".format(
+            self.name, self.length, self.entry_velocity, self.exit_velocity
+        )
+
+    def duration(self, entry_velocity, exit_velocity):
+        """
+        Returns:
+            float: seconds to drive this segment entering and leaving at the given velocities
+        """
+        (length, accel) = (self.length, self.acceleration)
+        peak = min(self.max_velocity, math.sqrt(accel * length + (entry_velocity ** 2 + exit_velocity ** 2) / 2))
+
+        if not peak:
+            return 0
+
+        ramp_up = (peak - entry_velocity) / accel
+        ramp_down = (peak - exit_velocity) / accel
+        ramp_length = (2 * peak * peak - entry_velocity ** 2 - exit_velocity ** 2) / (2 * accel)
+        return ramp_up + ramp_down + max(0, length - ramp_length) / peak
+
+
+class MotionQueue:
+    """
+    A queue of :class:`spikedev.tank.MoveDifferential` moves that are driven as one continuous motion.
+
+    Called one after the other, ``run_for_distance``, ``run_arc_right``, ``turn_left`` etc each
+    brake to a stop before the next one starts from rest. Queue them here instead and the robot
+    carries its speed from one segment into the next. The queue looks ahead over every queued
+    segment to work out how fast it can be going at each boundary:
+
+    * a line into a line, or an arc into a gentler arc, carries on at full speed
+    * where the wheel speeds have to change, the robot slows only as much as it needs to so
+      that neither wheel's speed jumps by more than ``CORNER_FRACTION`` of ``MAX_DPS``
+    * a turn in place reverses a wheel so the robot comes almost to a stop for it
+    * it always slows in time to stop at the end of the last segment
+
+    Queueing never blocks. :meth:`run` drives everything queued, or call :meth:`start`
+    then :meth:`update` every ``period_ms`` from your own loop or a
+    :class:`spikedev.scheduler.Scheduler` task, and keep queueing moves while it runs.
+
+    Driving ends early, with the motors stopped, if it takes longer than ``timeout_ms`` or
+    if the robot stops moving, see :class:`spikedev.profile.PairStallDetector`.
+    :attr:`timed_out` and :attr:`stalled` say whether the last run did, in which case
+    :attr:`actual_ms` and :attr:`saved_ms` are ``None``.
+
+    Args:
+        drive (MoveDifferential): the robot
+        acceleration_ms (int): milliseconds for a wheel to go from 0 to ``MAX_DPS``
+        rate_hz (int): how often to update the wheel speeds
+        timeout_ms (int): give up after driving for this many milliseconds, defaults to no limit
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.motion import MotionQueue
+        from spikedev.tank import MoveDifferential
+        from spikedev.unit import DistanceStuds
+        from spikedev.wheel import SpikeWheel
+
+        md = MoveDifferential(hub.port.E, hub.port.F, SpikeWheel, DistanceStuds(11))
+        queue = MotionQueue(md)
+        queue.run_for_distance(300, 80)
+        queue.run_arc_right(200, 300, 80)
+        queue.run_for_distance(300, 80)
+        queue.turn_left(90, 40)
+        queue.run()
+        print("took {}ms, saved {}ms".format(queue.actual_ms, queue.saved_ms))
+    """
+
+    def __init__(self, drive, acceleration_ms=DEFAULT_ACCELERATION_MS, rate_hz=DEFAULT_RATE_HZ, timeout_ms=None):
+        self.drive = drive
+        self.period_ms = max(1, 1000 // rate_hz)
+        self.timeout_ms = timeout_ms
+        motor = drive.left_motor
+        self.scale = motor.SCALE_DPS
+        self.acceleration = motor.MAX_DPS * 1000 / acceleration_ms
+        self.corner_dps = motor.MAX_DPS * CORNER_FRACTION
+        self.creep_dps = motor.MAX_DPS * CREEP_FRACTION
+        self.segments = []
+        self.index = 0
+        self.running = False
+        self.actual_ms = None
+        self.timed_out = False
+        self.stalled = False
+        self.stall_detector = PairStallDetector(drive, self.period_ms)
+        self._start_ms = 0
+        self._last_ms = 0
+        self._velocity = 0
+
+        # encoder positions where the current segment started
+        self._left_start = 0
+        self._right_start = 0
+
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, self.drive)
+
+    def _queue(self, name, wheel_degrees, left, right, speed):
+        # speeds are for the faster wheel, velocities are for the average of the two
+        fastest = max(abs(left), abs(right))
+        speed_dps = self.drive._speed_percentage(speed) / self.scale
+
+        # a negative speed drives the other way, as it does for MoveDifferential
+        if speed_dps < 0:
+            (wheel_degrees, speed_dps) = (-wheel_degrees, -speed_dps)
+
+        if wheel_degrees < 0:
+            (wheel_degrees, left, right) = (-wheel_degrees, -left, -right)
+
+        segment = Segment(name, wheel_degrees, left, right, speed_dps / fastest, self.acceleration / fastest)
+        self.segments.append(segment)
+        self._plan()
+        return segment
+
+    def _wheel_degrees(self, distance_mm):
+        return distance_mm * 360 / self.drive.wheel.circumference_mm
+
+    def run_for_distance(self, distance, speed):
+        """
+        Queue a straight line, see :meth:`spikedev.tank.MoveDifferential.run_for_distance`
+
+        Returns:
+            Segment: the queued segment
+        """
+        return self._queue("line", self._wheel_degrees(distance_in_mm(distance)), 1, 1, speed)
+
+    def _arc(self, radius, distance, speed, arc_right):
+        radius_mm = distance_in_mm(radius)
+
+        if radius_mm < self.drive.min_circle_radius_mm:
+            raise ValueError(
+                "{}: radius_mm {} is less than min_circle_radius_mm {}".format(
+                    self, radius_mm, self.drive.min_circle_radius_mm
+                )
+            )
+
+        # the outer wheel travels further than the midpoint by the same amount the inner one travels less
+        half = self.drive.wheel_distance_mm / 2
+        outer = (radius_mm + half) / radius_mm
+        inner = (radius_mm - half) / radius_mm
+        (left, right) = (outer, inner) if arc_right else (inner, outer)
+        name = "arc-right" if arc_right else "arc-left"
+        return self._queue(name, self._wheel_degrees(distance_in_mm(distance)), left, right, speed)
+
+    def run_arc_right(self, radius, distance, speed):
+        """
+        Queue a clockwise arc, see :meth:`spikedev.tank.MoveDifferential.run_arc_right`
+
+        Returns:
+            Segment: the queued segment
+        """
+        return self._arc(radius, distance, speed, True)
+
+    def run_arc_left(self, radius, distance, speed):
+        """
+        Queue a counter-clockwise arc, see :meth:`spikedev.tank.MoveDifferential.run_arc_left`
+
+        Returns:
+            Segment: the queued segment
+        """
+        return self._arc(radius, distance, speed, False)
+
+    def turn_degrees(self, degrees, speed):
+        """
+        Queue a turn in place, clockwise if ``degrees`` is positive, see
+        :meth:`spikedev.tank.MoveDifferential.turn_degrees`
+
+        Returns:
+            Segment: the queued segment
+        """
+        wheel_degrees = self._wheel_degrees(degrees * self.drive.circumference_mm / 360)
+        clockwise = (degrees > 0) == (self.drive._speed_percentage(speed) >= 0)
+        name = "turn-right" if clockwise else "turn-left"
+        return self._queue(name, wheel_degrees, 1, -1, speed)
+
+    def turn_right(self, degrees, speed):
+        """
+        Queue a clockwise turn in place
+        """
+        return self.turn_degrees(abs(degrees), speed)
+
+    def turn_left(self, degrees, speed):
+        """
+        Queue a counter-clockwise turn in place
+        """
+        return self.turn_degrees(-abs(degrees), speed)
+
+    def _corner_velocity(self, before, after):
+        """
+        The fastest we can go from ``before`` into ``after`` without a wheel's speed jumping by more than ``corner_dps``
+        """
+        jump = max(abs(before.left - after.left), abs(before.right - after.right))
+        velocity = min(before.max_velocity, after.max_velocity)
+
+        if jump:
+            velocity = min(velocity, self.corner_dps / jump)
+
+        return velocity
+
+    def _plan(self):
+        """
+        Work out the entry and exit velocity of every segment from the current one on
+        """
+        segments = self.segments
+        last = len(segments) - 1
+
+        if last < self.index:
+            return
+
+        # backwards, we must be able to slow down in time for every later segment and stop at the end
+        segments[last].exit_velocity = 0
+
+        for i in range(last - 1, self.index - 1, -1):
+            after = segments[i + 1]
+            stoppable = math.sqrt(after.exit_velocity ** 2 + 2 * after.acceleration * after.length)
+            segments[i].exit_velocity = min(self._corner_velocity(segments[i], after), stoppable)
+
+        # forwards, we can only speed up so much within each segment
+        entry = self._velocity if self.running else 0
+
+        for i in range(self.index, last + 1):
+            segment = segments[i]
+
+            # the segment we are driving keeps the entry velocity it started with
+            if i > self.index or not self.running:
+                segment.entry_velocity = entry
+
+            reachable = math.sqrt(entry ** 2 + 2 * segment.acceleration * segment.length)
+            segment.exit_velocity = min(segment.exit_velocity, reachable)
+            entry = segment.exit_velocity
+
+    @property
+    def planned_ms(self):
+        """
+        Returns:
+            int: how long the queued segments are planned to take driven back to back
+        """
+        return int(sum(s.duration(s.entry_velocity, s.exit_velocity) for s in self.segments) * 1000)
+
+    @property
+    def stop_and_go_ms(self):
+        """
+        Returns:
+            int: how long the queued segments would take if the robot stopped after each one
+        """
+        return int(sum(s.duration(0, 0) for s in self.segments) * 1000)
+
+    @property
+    def saved_ms(self):
+        """
+        Returns:
+            int: how much time driving the segments back to back saves over stopping after each one,
+            ``None`` if the last run timed out or stalled
+        """
+        if self.timed_out or self.stalled:
+            return None
+
+        return self.stop_and_go_ms - self.planned_ms
+
+    def _positions(self):
+        left = self.drive.left_motor
+        right = self.drive.right_motor
+        return (left._number_with_polarity(left.position), right._number_with_polarity(right.position))
+
+    def start(self):
+        """
+        Start driving the queued segments, then call :meth:`update` every ``period_ms``
+        """
+        (self._left_start, self._right_start) = self._positions()
+        self._start_ms = utime.ticks_ms()
+        self._last_ms = self._start_ms
+        self._velocity = 0
+        self.actual_ms = None
+        self.timed_out = False
+        self.stalled = False
+        self.stall_detector.reset(self.creep_dps)
+        self.running = self.index < len(self.segments)
+        self._plan()
+
+    def _finish(self, now_ms):
+        self.drive.stop()
+        self.running = False
+        self._velocity = 0
+
+        if self.timed_out:
+            log_msg("{}: TIMEOUT".format(self))
+        elif self.stalled:
+            self.stall_detector.handle(self)
+        else:
+            self.actual_ms = utime.ticks_diff(now_ms, self._start_ms)
+
+    def update(self):
+        """
+        Update the wheel speeds
+
+        Returns:
+            bool: True while there are segments left to drive, False once they are done or the
+            robot times out or stalls
+        """
+        if not self.running:
+            return False
+
+        now_ms = utime.ticks_ms()
+
+        if self.timeout_ms is not None and utime.ticks_diff(now_ms, self._start_ms) >= self.timeout_ms:
+            self.timed_out = True
+        elif self.stall_detector.update():
+            self.stalled = True
+
+        if self.timed_out or self.stalled:
+            self._finish(now_ms)
+            return False
+
+        dt = utime.ticks_diff(now_ms, self._last_ms) / 1000
+        self._last_ms = now_ms
+        (left_position, right_position) = self._positions()
+
+        while True:
+            segment = self.segments[self.index]
+            travelled = (
+                (left_position - self._left_start) * segment.left + (right_position - self._right_start) * segment.right
+            ) / segment.norm
+
+            # where we will be by the next update, the last segment has to actually get there
+            ahead = self._velocity * self.period_ms / 2000 if self.index < len(self.segments) - 1 else 0
+            remaining = segment.length - travelled - ahead
+
+            if remaining > 0:
+                break
+
+            # On to the next segment. It starts where this one should have ended rather than
+            # where the wheels are now so that errors do not pile up from one segment to the next.
+            self._left_start += segment.length * segment.left
+            self._right_start += segment.length * segment.right
+            self.index += 1
+
+            if self.index == len(self.segments):
+                self._finish(now_ms)
+                return False
+
+        # as fast as the segment allows, as fast as we can accelerate to, slow enough to make the exit
+        braking = math.sqrt(segment.exit_velocity ** 2 + 2 * segment.acceleration * remaining)
+        velocity = min(segment.max_velocity, self._velocity + segment.acceleration * dt, braking)
+        velocity = max(velocity, self.creep_dps / max(abs(segment.left), abs(segment.right)))
+        self._velocity = velocity
+        run_pair_at(self.drive, velocity * segment.left, velocity * segment.right)
+        return True
+
+    def run(self):
+        """
+        Drive every queued segment, return once the robot has stopped, timed out or stalled
+        """
+        log_msg(
+            "{}: {} segments, planned {}ms, stop-and-go {}ms".format(
+                self, len(self.segments) - self.index, self.planned_ms, self.stop_and_go_ms
+            )
+        )
+        self.start()
+        run_every(self.period_ms, self.update, self._start_ms)
+
+        if self.actual_ms is not None:
+            log_msg("{}: took {}ms".format(self, self.actual_ms))
@@ -27,6 +27,7 @@
 import utime
 
 # spikedev libraries
+from spikedev.completion import Completion
 from spikedev.logging import log_msg
 
 MAXINT = 2147483648
@@ -46,29 +47,131 @@ class MotorSpeed:
     * :class:`MotorSpeedRPM`
     * :class:`MotorSpeedDPS`
     * :class:`MotorSpeedDPM`
+
+    A speed's value never changes once it is created and there is no instance ``__dict__``.
+    Each one stores a single number in a canonical unit: a percentage for
+    :class:`MotorSpeedPercent`, which depends on the motor, and degrees-per-second for every
+    other class, which is also how those compare. The only state that does change is a
+    private cache, ``to_native_units`` remembers its answer for the last motor class it was
+    asked about so a speed that is reused, the usual case, is only converted once.
     """
 
+    __slots__ = ("_canonical", "_native_class", "_native")
+
+    # set by each speed class, DPS is how many degrees-per-second one unit is and
+    # MAX/NAME are for error messages
+    DPS = None
+    UNIT = None
+    MAX = None
+    NAME = None
+
+    def __init__(self, value):
+        self._canonical = value * self.DPS if self.DPS is not None else value
+        self._native_class = None
+        self._native = None
+
+    def __str__(self):
+        return "{:g}".format(self._unit_value()) + self.UNIT
+
+    def _unit_value(self):
+        if self.DPS is None:
+            return self._canonical
+
+        # rounded so that MotorSpeedDPM(10000).degrees_per_minute is 10000 and not 10000.000000000002
+        return round(self._canonical / self.DPS, 6)
+
+    def _key(self, other):
+        # speed percentages can only be compared with each other
+        if (self.DPS is None) != (other.DPS is None):
+            raise TypeError("{} and {} can only be compared for a specific motor".format(self, other))
+
+        return (self._canonical, other._canonical)
+
     def __eq__(self, other):
-        return self.to_native_units() == other.to_native_units()
+        if not isinstance(other, MotorSpeed) or (self.DPS is None) != (other.DPS is None):
+            return False
+
+        return self._canonical == other._canonical
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __hash__(self):
+        return hash(self._canonical)
+
     def __lt__(self, other):
-        return self.to_native_units() < other.to_native_units()
+        (ours, theirs) = self._key(other)
+        return ours < theirs
 
     def __le__(self, other):
-        return self.to_native_units() <= other.to_native_units()
+        (ours, theirs) = self._key(other)
+        return ours <= theirs
 
     def __gt__(self, other):
-        return self.to_native_units() > other.to_native_units()
+        (ours, theirs) = self._key(other)
+        return ours > theirs
 
     def __ge__(self, other):
-        return self.to_native_units() >= other.to_native_units()
+        (ours, theirs) = self._key(other)
+        return ours >= theirs
+
+    def __mul__(self, other):
+        if not isinstance(other, (float, int)):
+            raise TypeError("{} can only be multiplied by an int or float".format(self))
+
+        if other == 1:
+            return self
+
+        if self.DPS is None:
+            return self.__class__(self._canonical * other)
+
+        # scale the canonical value directly so we do not round trip through our unit
+        speed = object.__new__(self.__class__)
+        speed._canonical = self._canonical * other
+        speed._native_class = None
+        speed._native = None
+        return speed
 
     def __rmul__(self, other):
         return self.__mul__(other)
 
+    def to_native_units(self, motor):
+        """
+        Return the speed percentage ``motor`` needs to run at this speed. This is the one
+        conversion shared by every speed class.
+
+        Args:
+            motor (Motor): the motor to use for calculating the speed percentage
+
+        Returns:
+            int: the speed percentage, truncated towards zero
+
+        Raises:
+            ValueError: if this speed is faster than ``motor`` can go
+        """
+        if self._native_class is not motor.__class__:
+            if self.DPS is None:
+                # a percentage is already native and was validated when it was created
+                native = self._canonical
+            else:
+                native = self._canonical * motor.SCALE_DPS
+
+                if native < -100 or native > 100:
+                    raise ValueError(
+                        "invalid {}: {} max {} is {}, {} was requested".format(
+                            self.NAME, motor, self.MAX, getattr(motor, "MAX_" + self.MAX), self._unit_value()
+                        )
+                    )
+
+            self._native = int(native)
+            self._native_class = motor.__class__
+
+        return self._native
+
+
+# MotorSpeedPercent(n) for a whole n returns one shared object per n, created on first use
+_percent_interned = [None] * 201
+
 
 class MotorSpeedPercent(MotorSpeed):
     """
@@ -89,31 +192,37 @@ class MotorSpeedPercent(MotorSpeed):
         mtr.run_for_degrees(720, MotorSpeedPercent(40))
     """
 
-    def __init__(self, percent):
+    __slots__ = ()
+    UNIT = "%"
+
+    def __new__(cls, percent):
         if percent < -100 or percent > 100:
             raise ValueError("{} is an invalid percentage, must be between -100 and 100 (inclusive)".format(percent))
 
-        self.percent = int(percent)
+        interned = cls is MotorSpeedPercent and isinstance(percent, int)
 
-    def __str__(self):
-        return str(self.percent) + "%"
+        if interned:
+            speed = _percent_interned[percent + 100]
 
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return MotorSpeedPercent(self.percent * other)
+            if speed is not None:
+                return speed
 
-    def to_native_units(self, motor):
-        """
-        The native unit for a Spike motor is speed percentage so there is nothing to adjust here
+        speed = object.__new__(cls)
+        MotorSpeed.__init__(speed, int(percent))
 
-        Args:
-            motor (Motor): the motor to use for calculating the speed percentage
+        if interned:
+            _percent_interned[percent + 100] = speed
 
-        Returns:
-            int: the speed percentage
-        """
-        return self.percent
+        return speed
+
+    def __init__(self, percent):
+        # __new__ did all of the work, doing it again here would reset the
+        # conversion cache of a shared speed every time it was looked up
+        pass
+
+    @property
+    def percent(self):
+        return self._canonical
 
 
 class MotorSpeedRPS(MotorSpeed):
@@ -135,34 +244,18 @@ class MotorSpeedRPS(MotorSpeed):
         mtr.run_for_degrees(720, MotorSpeedRPS(1.5))
     """
 
-    def __init__(self, rotations_per_second):
-        self.rotations_per_second = rotations_per_second
+    __slots__ = ()
+    DPS = 360
+    UNIT = " rot/sec"
+    MAX = "RPS"
+    NAME = "rotations-per-second"
 
-    def __str__(self):
-        return str(self.rotations_per_second) + " rot/sec"
-
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return MotorSpeedRPS(self.rotations_per_second * other)
-
-    def to_native_units(self, motor):
-        """
-        Return the speed percentage required to achieve the desired rotations-per-second
-
-        Args:
-            motor (Motor): the motor to use for calculating the speed percentage
+    def __init__(self, rotations_per_second):
+        super().__init__(rotations_per_second)
 
-        Returns:
-            int: the speed percentage required to achieve the desired rotations-per-second
-        """
-        if abs(self.rotations_per_second) > motor.MAX_RPS:
-            raise ValueError(
-                "invalid rotations-per-second: {} max RPS is {}, {} was requested".format(
-                    motor, motor.MAX_RPS, self.rotations_per_second
-                )
-            )
-        return int((self.rotations_per_second / motor.MAX_RPS) * 100)
+    @property
+    def rotations_per_second(self):
+        return self._unit_value()
 
 
 class MotorSpeedRPM(MotorSpeed):
@@ -184,34 +277,18 @@ class MotorSpeedRPM(MotorSpeed):
         mtr.run_for_degrees(720, MotorSpeedRPM(20))
     """
 
-    def __init__(self, rotations_per_minute):
-        self.rotations_per_minute = rotations_per_minute
-
-    def __str__(self):
-        return str(self.rotations_per_minute) + " rot/min"
-
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return MotorSpeedRPM(self.rotations_per_minute * other)
-
-    def to_native_units(self, motor):
-        """
-        Return the speed percentage required to achieve the desired rotations-per-minute
+    __slots__ = ()
+    DPS = 6
+    UNIT = " rot/min"
+    MAX = "RPM"
+    NAME = "rotations-per-minute"
 
-        Args:
-            motor (Motor): the motor to use for calculating the speed percentage
+    def __init__(self, rotations_per_minute):
+        super().__init__(rotations_per_minute)
 
-        Returns:
-            int: the speed percentage required to achieve the desired rotations-per-minute
-        """
-        if abs(self.rotations_per_minute) > motor.MAX_RPM:
-            raise ValueError(
-                "invalid rotations-per-minute: {} max RPM is {}, {} was requested".format(
-                    motor, motor.MAX_RPM, self.rotations_per_minute
-                )
-            )
-        return int((self.rotations_per_minute / motor.MAX_RPM) * 100)
+    @property
+    def rotations_per_minute(self):
+        return self._unit_value()
 
 
 class MotorSpeedDPS(MotorSpeed):
@@ -233,34 +310,18 @@ class MotorSpeedDPS(MotorSpeed):
         mtr.run_for_degrees(720, MotorSpeedDPS(180))
     """
 
-    def __init__(self, degrees_per_second):
-        self.degrees_per_second = degrees_per_second
-
-    def __str__(self):
-        return str(self.degrees_per_second) + " deg/sec"
+    __slots__ = ()
+    DPS = 1
+    UNIT = " deg/sec"
+    MAX = "DPS"
+    NAME = "degrees-per-second"
 
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return MotorSpeedDPS(self.degrees_per_second * other)
-
-    def to_native_units(self, motor):
-        """
-        Return the speed percentage required to achieve the desired degrees-per-second
-
-        Args:
-            motor (Motor): the motor to use for calculating the speed percentage
+    def __init__(self, degrees_per_second):
+        super().__init__(degrees_per_second)
 
-        Returns:
-            int: the speed percentage required to achieve the desired degrees-per-second
-        """
-        if abs(self.degrees_per_second) > motor.MAX_DPS:
-            raise ValueError(
-                "invalid degrees-per-second: {} max DPS is {}, {} was requested".format(
-                    motor, motor.MAX_DPS, self.degrees_per_second
-                )
-            )
-        return int((self.degrees_per_second / motor.MAX_DPS) * 100)
+    @property
+    def degrees_per_second(self):
+        return self._canonical
 
 
 class MotorSpeedDPM(MotorSpeed):
@@ -282,32 +343,18 @@ class MotorSpeedDPM(MotorSpeed):
         mtr.run_for_degrees(720, MotorSpeedDPM(10000))
     """
 
-    def __init__(self, degrees_per_minute):
-        self.degrees_per_minute = degrees_per_minute
-
-    def __str__(self):
-        return str(self.degrees_per_minute) + " deg/min"
-
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return MotorSpeedDPM(self.degrees_per_minute * other)
-
-    def to_native_units(self, motor):
-        """
-        Return the speed percentage required to achieve the desired degrees-per-minute
+    __slots__ = ()
+    DPS = 1 / 60
+    UNIT = " deg/min"
+    MAX = "DPM"
+    NAME = "degrees-per-minute"
 
-        Args:
-            motor (Motor): the motor to use for calculating the speed percentage
+    def __init__(self, degrees_per_minute):
+        super().__init__(degrees_per_minute)
 
-        Returns:
-            int: the speed percentage required to achieve the desired degrees-per-minute
-        """
-        if abs(self.degrees_per_minute) > motor.MAX_DPM:
-            "invalid degrees-per-minute: {} max DPM is {}, {} was requested".format(
-                motor, motor.MAX_DPM, self.degrees_per_minute
-            )
-        return int(self.degrees_per_minute / motor.MAX_DPM * motor.max_speed)
+    @property
+    def degrees_per_minute(self):
+        return self._unit_value()
 
 
 class MotorStop:
@@ -343,60 +390,185 @@ class InvalidMotorMode(ValueError):
     pass
 
 
+class MotorStalled(RuntimeError):
+    pass
+
+
+class StallPolicy:
+    """
+    What a blocking move does when its motor stalls, see :meth:`Motor.set_stall_policy`
+
+    * ``IGNORE`` return, :attr:`Motor.is_stalled` is True. This is the default.
+    * ``ABORT`` brake the motor and return
+    * ``BACK_OFF`` run back ``back_off_degrees`` to take the load off whatever jammed, then return
+    * ``RETRY`` finish the move with ``power_step`` more ``max_power``, up to ``retries`` times,
+      then abort. Only moves with a target position can be retried, a ``run_for_time`` aborts.
+    * ``RAISE`` brake the motor and raise :class:`MotorStalled`
+    """
+
+    IGNORE = 0
+    ABORT = 1
+    BACK_OFF = 2
+    RETRY = 3
+    RAISE = 4
+
+
+# How long to wait for the firmware to report a move we stopped as INTERRUPTED
+STOP_TIMEOUT_MS = 100
+
+
+# The modes read by Motor.sample(), get() returns [position, speed, power]
+SAMPLING_MODE = [(MotorMode.POS, 0), (MotorMode.SPEED, 0), (MotorMode.POWER, 0)]
+
+
 # callback() infrastructure
-_portletter2motor = {}
+#
+# (interrupted, stalled) for each MotorCallbackEvent, indexed by reason
+_REASON_FLAGS = ((False, False), (True, False), (False, True))
 
 
-def _callback(mtr, reason):
-    if reason == MotorCallbackEvent.COMPLETED:
-        mtr.interrupted = False
-        mtr.stalled = False
-        # log_msg("{}: _callback COMPLETED".format(mtr))
+class MotorCallbacks:
+    """
+    The handlers for one ``hub.port.X.motor.callback()`` or ``pair.callback()``. Do not create
+    these directly, use :func:`motor_callbacks`.
 
-    elif reason == MotorCallbackEvent.INTERRUPTED:
-        mtr.interrupted = True
-        mtr.stalled = False
-        log_msg("{}: _callback INTERRUPTED".format(mtr))
+    The firmware calls :attr:`callback`, a method bound once up front, which calls the ``owner``
+    (the :class:`Motor` or :class:`spikedev.tank.MoveTank` waiting on the port) and then each
+    subscriber with the ``MotorCallbackEvent`` reason. Nothing on that path allocates or formats
+    a string, handlers that do are best deferred, see :class:`spikedev.scheduler.Scheduler`.
+    """
 
-    elif reason == MotorCallbackEvent.STALL:
-        mtr.interrupted = False
-        mtr.stalled = True
-        log_msg("{}: _callback STALL".format(mtr))
+    def __init__(self, key):
+        self.key = key
+        self.owner = None
+        self.subscribers = []
+        self.callback = self._callback
 
-    else:
-        raise ValueError("invalid callback reason {}".format(reason))
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, self.key)
 
-    mtr.rxed_callback = True
+    def _callback(self, reason):
+        if self.owner is not None:
+            self.owner(reason)
 
+        for func in self.subscribers:
+            func(reason)
 
-def _callback_A(reason):
-    mtr = _portletter2motor["A"]
-    _callback(mtr, reason)
+    def subscribe(self, func):
+        """
+        Call ``func(reason)`` on every callback, after the owner
+        """
+        if func not in self.subscribers:
+            self.subscribers.append(func)
 
+    def unsubscribe(self, func):
+        if func in self.subscribers:
+            self.subscribers.remove(func)
 
-def _callback_B(reason):
-    mtr = _portletter2motor["B"]
-    _callback(mtr, reason)
 
+# dispatch table, port letter (or both letters for a motor pair) to its MotorCallbacks
+_motor_callbacks = {}
 
-def _callback_C(reason):
-    mtr = _portletter2motor["C"]
-    _callback(mtr, reason)
 
+def motor_callbacks(key):
+    """
+    Returns:
+        MotorCallbacks: the callback dispatch for port ``key`` (``A`` to ``F``), created on first use
+    """
+    callbacks = _motor_callbacks.get(key)
 
-def _callback_D(reason):
-    mtr = _portletter2motor["D"]
-    _callback(mtr, reason)
+    if callbacks is None:
+        callbacks = MotorCallbacks(key)
+        _motor_callbacks[key] = callbacks
+
+    return callbacks
+
+
+class StallDetector:
+    """
+    Detect a stall in software, sooner than the firmware reports one.
+
+    Every :meth:`update` records the motor's position in a ring buffer covering the last
+    ``window_ms``. Once the motor has had ``settle_ms`` to get up to speed, it has stalled
+    if over that window it moved at less than ``ratio`` of the commanded speed. Do not use
+    a window longer than the move's deceleration, the motor legitimately slows down there.
+
+    Normally :meth:`Motor.start_stall_detection` creates one and blocking moves update it
+    while they wait. :meth:`update` allocates nothing so it can also run as a
+    :class:`spikedev.scheduler.Scheduler` task for moves started with ``block=False``.
+
+    Args:
+        motor (Motor): the motor to watch
+        window_ms (int): how far back to compare the commanded and measured speed
+        ratio (float): below this fraction of the commanded speed counts as stalled
+        settle_ms (int): how long after a command starts before checking
+        period_ms (int): how often :meth:`update` is called
+    """
+
+    def __init__(self, motor, window_ms=100, ratio=0.25, settle_ms=150, period_ms=10):
+        if motor.MAX_DPS is None:
+            raise ValueError("{}: stall detection needs a motor class with MAX_DPS".format(motor))
+
+        self.motor = motor
+        self.ratio = ratio
+        self.settle_ms = settle_ms
+        self.period_ms = period_ms
+        self.detections = 0
+
+        size = window_ms // period_ms + 1
+        self._positions = [0] * size
+        self._ms = [0] * size
+        self._size = size
+        self._index = 0
+        self._count = 0
+        self._threshold = 0
+        self._started = 0
+
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, self.motor)
+
+    def reset(self, raw_speed):
+        """
+        A new command started at ``raw_speed`` percent
+        """
+        # the slowest a motor can move without being stalled, in degrees per second
+        self._threshold = abs(raw_speed) * self.ratio / self.motor.SCALE_DPS
+        self._started = utime.ticks_ms()
+        self._count = 0
+
+    def update(self):
+        """
+        Returns:
+            bool: True if the motor has stalled
+        """
+        if not self._threshold:
+            return False
 
+        now_ms = utime.ticks_ms()
 
-def _callback_E(reason):
-    mtr = _portletter2motor["E"]
-    _callback(mtr, reason)
+        if utime.ticks_diff(now_ms, self._started) < self.settle_ms:
+            return False
 
+        position = self.motor.position
+        index = self._index
+        self._positions[index] = position
+        self._ms[index] = now_ms
+        index += 1
 
-def _callback_F(reason):
-    mtr = _portletter2motor["F"]
-    _callback(mtr, reason)
+        if index == self._size:
+            index = 0
+
+        self._index = index
+
+        if self._count < self._size:
+            self._count += 1
+
+            if self._count < self._size:
+                return False
+
+        # index is now the oldest sample in the window
+        dt_ms = utime.ticks_diff(now_ms, self._ms[index])
+        return dt_ms > 0 and abs(position - self._positions[index]) * 1000 < self._threshold * dt_ms
 
 
 class Motor:
@@ -409,6 +581,16 @@ class Motor:
         desc (str): defaults to None
     """
 
+    # set by each motor class
+    MAX_RPM = None
+    MAX_RPS = None
+    MAX_DPM = None
+    MAX_DPS = None
+
+    # 100 / MAX_DPS, the multiplier from degrees-per-second to a speed percentage, see _precompute_scales()
+    SCALE_DPS = None
+    _scaled_class = None
+
     def __init__(self, port, polarity=MotorPolarity.NORMAL, desc=None):
         super().__init__()
         self.port = port
@@ -417,33 +599,50 @@ class Motor:
         self.stalled = False
         self.polarity = polarity
         self.desc = desc
-        self.rxed_callback = False
+        self._precompute_scales()
+
+        # see set_stall_policy() and start_stall_detection()
+        self.stall_policy = StallPolicy.IGNORE
+        self.back_off_degrees = 0
+        self.stall_retries = 0
+        self.stall_power_step = 0
+        self.stall_detector = None
+        self._move = None
+
+        # see hold_position()
+        self.hold_task = None
+        self.hold_target = None
+        self.hold_tolerance = 0
+        self.hold_corrections = 0
+        self._hold_speed = 0
+
+        # nothing is in flight yet
+        self.completion = Completion()
+        self.completion.set()
+        self._stale = False
+
+        # state cache, see start_sampling()
+        self.sampling = False
+        self.max_age_ms = 0
+        self._position = 0
+        self._speed = 0
+        self._power = 0
+        self._sampled_ms = 0
 
         # wait for motor to connect
         while self.port.motor is None:
             utime.sleep(0.1)
 
         # dwalton
-        self.port.motor.mode(MotorMode.POS)
+        self._set_mode(MotorMode.POS)
 
         # callback setup
-        if self.port_letter == "A":
-            self.port.motor.callback(_callback_A)
-        elif self.port_letter == "B":
-            self.port.motor.callback(_callback_B)
-        elif self.port_letter == "C":
-            self.port.motor.callback(_callback_C)
-        elif self.port_letter == "D":
-            self.port.motor.callback(_callback_D)
-        elif self.port_letter == "E":
-            self.port.motor.callback(_callback_E)
-        elif self.port_letter == "F":
-            self.port.motor.callback(_callback_F)
-        else:
+        if self.port_letter not in "ABCDEF":
             raise ValueError("invalid port {}".format(self.port_letter))
 
-        global _portletter2motor
-        _portletter2motor[self.port_letter] = self
+        self.callbacks = motor_callbacks(self.port_letter)
+        self.callbacks.owner = self._callback
+        self.port.motor.callback(self.callbacks.callback)
 
     def __str__(self):
         if self.desc is not None:
@@ -451,10 +650,252 @@ class Motor:
         else:
             return "{}(port {})".format(self.__class__.__name__, self.port_letter)
 
+    @property
+    def rxed_callback(self):
+        """
+        Returns:
+            bool: True if the last command has completed, been interrupted or stalled
+        """
+        return self.completion.done
+
+    @rxed_callback.setter
+    def rxed_callback(self, value):
+        if value:
+            self.completion.set()
+        else:
+            self.completion.clear()
+
+    def _callback(self, reason):
+        # called from the firmware callback, must not allocate
+        if self._stale:
+            # the end of the move that _begin() replaced, not of the one we are waiting on
+            self._stale = False
+            return
+
+        (self.interrupted, self.stalled) = _REASON_FLAGS[reason]
+        self.completion.set(reason)
+
+    def _begin(self, expected_ms=None):
+        """
+        Clear :attr:`completion` before starting a move. If the last move has not reported
+        back yet the firmware reports it, usually ``INTERRUPTED``, after the new one starts,
+        so that report is dropped rather than ending the wait for the new move. A move ended
+        by the stall detector may still be waiting for its report too.
+        """
+        self._stale = self._stale or not self.completion.done
+        self.completion.clear(expected_ms)
+
+    def _wait_for_move(self):
+        detector = self.stall_detector
+
+        if detector is None:
+            self.completion.wait()
+            return
+
+        while not self.completion.wait(detector.period_ms):
+            if detector.update():
+                self._stop_stalled()
+                return
+
+    async def _wait_for_move_async(self):
+        detector = self.stall_detector
+
+        if detector is None:
+            await self.completion.wait_async()
+            return
+
+        while not await self.completion.wait_async(detector.period_ms):
+            if detector.update():
+                self._stop_stalled()
+                return
+
+    def _stop_stalled(self):
+        self.stall_detector.detections += 1
+
+        # stopping the move makes the firmware report it INTERRUPTED, wait for
+        # that so it does not complete whatever we do next
+        self.completion.clear()
+        self.stop(self._move[3])
+        self.completion.wait(STOP_TIMEOUT_MS)
+
+        # if the report is later than that drop it, like _begin(), so it cannot end the next move
+        self._stale = not self.completion.done
+        (self.interrupted, self.stalled) = (False, True)
+        self.completion.set(MotorCallbackEvent.STALL)
+
     def _wait(self):
-        # This is ugly but SPIKE does not have the _thread module :(
-        while not self.rxed_callback:
-            utime.sleep(0.01)
+        self._wait_for_move()
+        self._finish_move()
+
+    async def _wait_async(self):
+        await self._wait_for_move_async()
+        self._finish_move()
+
+    def _finish_move(self):
+        """
+        Log how a move ended and apply the stall policy, shared by blocking moves and
+        the ``*_async`` methods
+        """
+        # logged here rather than in the callback, which must not allocate
+        if self.interrupted:
+            log_msg("{}: INTERRUPTED".format(self))
+        elif self.stalled:
+            log_msg("{}: STALL".format(self))
+
+            if self.stall_policy != StallPolicy.IGNORE:
+                self._handle_stall()
+
+    def _track(self, raw_speed, stop, kwargs, degrees=None, position=None):
+        """
+        Remember a move for the stall policy and reset the stall detector
+        """
+        if self.stall_policy == StallPolicy.IGNORE and self.stall_detector is None:
+            return
+
+        if degrees is not None:
+            direction = -1 if raw_speed < 0 else 1
+            target = self.position + direction * degrees
+        elif position is not None:
+            # "shortest" may go the other way around so we cannot retry it
+            direction = -1 if position < self.position else 1
+            target = None
+        else:
+            direction = -1 if raw_speed < 0 else 1
+            target = None
+
+        self._move = (target, direction, abs(raw_speed), stop, kwargs)
+
+        if self.stall_detector is not None:
+            self.stall_detector.reset(raw_speed)
+
+    def _handle_stall(self):
+        (target, direction, raw_speed, stop, kwargs) = self._move
+
+        if self.stall_policy == StallPolicy.RETRY and target is not None:
+            max_power = kwargs.get("max_power", 100)
+
+            for _ in range(self.stall_retries):
+                if max_power >= 100:
+                    break
+
+                max_power = min(100, max_power + self.stall_power_step)
+                remaining = target - self.position
+
+                if not remaining:
+                    return
+
+                log_msg("{}: retrying the last {} degrees at max_power {}".format(self, abs(remaining), max_power))
+                retry_kwargs = dict(kwargs)
+                retry_kwargs["max_power"] = max_power
+                retry_speed = raw_speed if remaining > 0 else -raw_speed
+                self._track(retry_speed, stop, kwargs, degrees=abs(remaining))
+                self._begin(self._expected_ms(remaining, retry_speed))
+                self.port.motor.run_for_degrees(abs(remaining), retry_speed, stop=stop, **retry_kwargs)
+                self._wait_for_move()
+
+                if not self.stalled:
+                    return
+
+        self.stop(MotorStop.BRAKE)
+
+        if self.stall_policy == StallPolicy.BACK_OFF and self.back_off_degrees:
+            self._begin(self._expected_ms(self.back_off_degrees, raw_speed))
+            self.port.motor.run_for_degrees(self.back_off_degrees, -direction * raw_speed, stop=stop)
+            self.completion.wait()
+            self.stalled = True
+
+        elif self.stall_policy == StallPolicy.RAISE:
+            raise MotorStalled("{}: stalled".format(self))
+
+    def set_stall_policy(self, policy, back_off_degrees=30, retries=2, power_step=20):
+        """
+        Choose what blocking moves do when this motor stalls, see :class:`StallPolicy`
+
+        Args:
+            policy (StallPolicy): what to do
+            back_off_degrees (int): how far ``BACK_OFF`` reverses
+            retries (int): how many times ``RETRY`` tries again
+            power_step (int): how much ``max_power`` ``RETRY`` adds each time
+
+        Example:
+
+        .. code:: python
+
+            import hub
+            from spikedev.motor import SpikeMediumMotor, StallPolicy
+
+            claw = SpikeMediumMotor(hub.port.C)
+            claw.set_stall_policy(StallPolicy.BACK_OFF, back_off_degrees=20)
+            claw.start_stall_detection()
+
+            # closes on whatever it grabs, then eases off so the motor is not straining
+            claw.run_for_degrees(180, 50, max_power=60)
+        """
+        if policy not in (
+            StallPolicy.IGNORE,
+            StallPolicy.ABORT,
+            StallPolicy.BACK_OFF,
+            StallPolicy.RETRY,
+            StallPolicy.RAISE,
+        ):
+            raise ValueError("stall policy {} is invalid".format(policy))
+
+        self.stall_policy = policy
+        self.back_off_degrees = abs(back_off_degrees)
+        self.stall_retries = retries
+        self.stall_power_step = power_step
+
+    def start_stall_detection(self, window_ms=100, ratio=0.25, settle_ms=150, period_ms=10):
+        """
+        Watch blocking moves with a :class:`StallDetector` instead of waiting for the firmware
+        to report a stall. The arguments are those of :class:`StallDetector`.
+        """
+        self.stall_detector = StallDetector(self, window_ms, ratio, settle_ms, period_ms)
+
+    def stop_stall_detection(self):
+        """
+        Go back to relying on the firmware to report stalls
+        """
+        self.stall_detector = None
+
+    def subscribe(self, func):
+        """
+        Call ``func(reason)`` with the ``MotorCallbackEvent`` each time this motor's command
+        completes, is interrupted or stalls. ``func`` is called from the firmware callback
+        so it must be quick and should not allocate.
+
+        Example:
+
+        .. code:: python
+
+            import hub
+            from spikedev.motor import MotorCallbackEvent, SpikeMediumMotor
+
+            stalls = [0]
+
+            def stall_monitor(reason):
+                if reason == MotorCallbackEvent.STALL:
+                    stalls[0] += 1
+
+            mtr = SpikeMediumMotor(hub.port.E)
+            mtr.subscribe(stall_monitor)
+        """
+        self.callbacks.subscribe(func)
+
+    def unsubscribe(self, func):
+        """
+        Stop calling ``func``, see :meth:`subscribe`
+        """
+        self.callbacks.unsubscribe(func)
+
+    def _expected_ms(self, degrees, raw_speed):
+        """
+        How long moving ``degrees`` at ``raw_speed`` takes at a constant speed. The real
+        move also has to accelerate and decelerate so this never overestimates.
+        """
+        if not raw_speed or self.MAX_DPS is None:
+            return None
+        return int(abs(degrees) * 100000 / (abs(raw_speed) * self.MAX_DPS))
 
     def _validate_degrees(self, degrees):
         if degrees < MININT or degrees > MAXINT:
@@ -517,22 +958,92 @@ class Motor:
 
     def _speed_percentage(self, speed):
 
-        if isinstance(speed, MotorSpeed):
-            return speed.to_native_units(self)
+        # If speed is not a MotorSpeed object we treat it as a percentage. This is
+        # the common case so handle it here rather than via a MotorSpeedPercent.
+        if isinstance(speed, (float, int)):
+            if speed < -100 or speed > 100:
+                raise ValueError("{} is an invalid percentage, must be between -100 and 100 (inclusive)".format(speed))
+            return int(speed)
 
-        # If speed is not a MotorSpeed object we treat it as a percentage
-        elif isinstance(speed, (float, int)):
-            return MotorSpeedPercent(speed).to_native_units(self)
+        elif isinstance(speed, MotorSpeed):
+            return speed.to_native_units(self)
 
         else:
             raise TypeError(type(speed))
 
+    @classmethod
+    def _precompute_scales(cls):
+        """
+        Compute SCALE_DPS once per motor class
+        """
+        if cls._scaled_class is cls or cls.MAX_DPS is None:
+            return
+
+        cls.SCALE_DPS = 100 / cls.MAX_DPS
+        cls._scaled_class = cls
+
+    def _set_mode(self, mode):
+        self._mode = mode
+        self.port.motor.mode(mode)
+
+    def start_sampling(self, max_age_ms=10):
+        """
+        Cache the motor's position, speed and power. :attr:`position` and :attr:`speed` then
+        answer from the cache as long as it is at most ``max_age_ms`` old, else they refresh
+        it first. Call :meth:`sample` once per control loop tick so every read in that tick
+        shares one ``get()`` call to the firmware. :attr:`is_running` still asks the firmware,
+        a speed of 0 does not mean the move is over.
+
+        Args:
+            max_age_ms (int): how stale a cached value may be
+
+        Example:
+
+        .. code:: python
+
+            import hub
+            from spikedev.motor import SpikeMediumMotor
+            from spikedev.scheduler import Scheduler
+
+            mtr = SpikeMediumMotor(hub.port.E)
+            mtr.start_sampling(max_age_ms=20)
+
+            sched = Scheduler()
+            sched.every(10, mtr.sample)
+        """
+        self._set_mode(SAMPLING_MODE)
+        self.max_age_ms = max_age_ms
+        self.sampling = True
+        self.sample()
+
+    def stop_sampling(self):
+        """
+        Go back to reading the firmware on every access
+        """
+        self.sampling = False
+        self._set_mode(MotorMode.POS)
+
+    def sample(self):
+        """
+        Read position, speed and power from the firmware into the cache
+        """
+        (self._position, self._speed, self._power) = self.port.motor.get()
+        self._sampled_ms = utime.ticks_ms()
+
+    def _refresh(self):
+        if utime.ticks_diff(utime.ticks_ms(), self._sampled_ms) > self.max_age_ms:
+            self.sample()
+
     @property
     def position(self):
         """
         Returns:
             int: the motor's position encoder value
         """
+        if self.sampling:
+            self._refresh()
+            return self._position
+
         return self.port.motor.get()[0]
 
     @position.setter
@@ -544,6 +1055,7 @@ class Motor:
             value (int): the new value for the motor's position encoder
         """
         self.port.motor.preset(value)
+        self._position = value
 
     @property
     def is_stalled(self):
@@ -559,8 +1071,38 @@ class Motor:
         Returns:
             bool: True if the motor is running
         """
+        # not from the sample, its speed can be 0 while a move is still running or stale
+        # after it has finished
         return bool(self.port.motor.busy(BUSY_MOTOR))
 
+    @property
+    def speed(self):
+        """
+        Only available while sampling, see :meth:`start_sampling`
+
+        Returns:
+            int: the motor's speed as a percentage of its maximum speed
+        """
+        if not self.sampling:
+            raise InvalidMotorMode("{}: speed is only available after start_sampling()".format(self))
+
+        self._refresh()
+        return self._speed
+
+    @property
+    def power(self):
+        """
+        Only available while sampling, see :meth:`start_sampling`
+
+        Returns:
+            int: the motor's power as a percentage
+        """
+        if not self.sampling:
+            raise InvalidMotorMode("{}: power is only available after start_sampling()".format(self))
+
+        self._refresh()
+        return self._power
+
     def _number_with_polarity(self, value):
         if self.polarity == MotorPolarity.NORMAL:
             return value
@@ -580,8 +1122,8 @@ class Motor:
         Initialize the POS value from the APOS value
         """
         self.port.motor.mode(MotorMode.APOS)
-        a_pos = self.position
-        self.port.motor.mode(MotorMode.POS)
+        a_pos = self.port.motor.get()[0]
+        self._set_mode(SAMPLING_MODE if self.sampling else MotorMode.POS)
         self.position = a_pos
 
     def stop(self, stop_action=MotorStop.BRAKE):
@@ -640,7 +1182,8 @@ class Motor:
         #         self, degrees, speed, raw_speed, stop, block
         #     )
         # )
-        self.rxed_callback = False
+        self._track(raw_speed, stop, kwargs, degrees=degrees)
+        self._begin(self._expected_ms(degrees, raw_speed))
         self.port.motor.run_for_degrees(degrees, raw_speed, stop=stop, **kwargs)
 
         if block:
@@ -658,8 +1201,8 @@ class Motor:
             block (bool): if True this function will not return until the motors have finished moving
             **kwargs: optional kwargs that will pass all the way down to the LEGO ``hub.port.X.motor`` API call
         """
-        if self.port.motor.mode() != [(2, 0)]:
-            raise InvalidMotorMode("MotorMode must be POS, it is {}".format(self.port.motor.mode()))
+        if self._mode != MotorMode.POS and not self.sampling:
+            raise InvalidMotorMode("MotorMode must be POS, it is {}".format(self._mode))
 
         delta = abs(self.position - position)
 
@@ -685,11 +1228,14 @@ class Motor:
         #         self, direction, self.position, position, speed, raw_speed, stop, block
         #     )
         # )
-        self.rxed_callback = False
-
         if direction == "clockwise" or direction == "counterclockwise":
+            self._track(raw_speed, stop, kwargs, degrees=delta)
+            self._begin(self._expected_ms(delta, raw_speed))
             self.port.motor.run_for_degrees(delta, speed=raw_speed, stop=stop, **kwargs)
         elif direction == "shortest":
+            # "shortest" may go the other way around so delta is only an upper bound
+            self._track(raw_speed, stop, kwargs, position=position)
+            self._begin()
             self.port.motor.run_to_position(position, speed=raw_speed, stop=stop, **kwargs)
 
         if block:
@@ -713,17 +1259,128 @@ class Motor:
             return
 
         raw_speed = self._speed_percentage(speed)
+        raw_speed = self._speed_with_polarity(raw_speed)
         log_msg(
             "{}: run_for_time {}ms at speed {}, raw_speed {}, stop {}, block {}".format(
                 self, msec, speed, raw_speed, stop, block
             )
         )
-        self.rxed_callback = False
-        self.port_motor.run_for_time(msec, raw_speed, stop=stop, **kwargs)
+        self._track(raw_speed, stop, kwargs)
+        self._begin(msec)
+        self.port.motor.run_for_time(msec, raw_speed, stop=stop, **kwargs)
 
         if block:
             self._wait()
 
+    def hold_position(self, target, tolerance, scheduler, speed=20, period_ms=20):
+        """
+        Keep the motor within ``tolerance`` degrees of ``target`` from a :class:`spikedev.scheduler.Scheduler` task.
+
+        An arm that sags under load after a move returns does not need a loop of blocking
+        ``run_to_position`` calls. Every ``period_ms`` the task reads the position and, only
+        if it is more than ``tolerance`` off and no correction is already under way, starts a
+        ``run_for_degrees`` back to ``target`` with ``block=False``. Corrections are counted in
+        :attr:`hold_corrections`.
+
+        Call :meth:`stop_holding` before moving the motor anywhere else.
+
+        Args:
+            target (int): the position to hold
+            tolerance (int): how many degrees off is close enough
+            scheduler (Scheduler): runs the correction task
+            speed (MotorSpeed): how fast to correct
+            period_ms (int): how often to check the position
+
+        Returns:
+            Task: the scheduler task
+
+        Example:
+
+        .. code:: python
+
+            import hub
+            from spikedev.motor import SpikeMediumMotor
+            from spikedev.scheduler import Scheduler
+
+            sched = Scheduler()
+            arm = SpikeMediumMotor(hub.port.D)
+            arm.run_to_position(-90, 40)
+            arm.hold_position(-90, 3, sched)
+            sched.run()
+        """
+        self.stop_holding()
+        self.hold_target = target
+        self.hold_tolerance = abs(tolerance)
+        self.hold_corrections = 0
+
+        # corrections are in raw encoder degrees so the speed must not have the polarity applied
+        self._hold_speed = abs(self._speed_percentage(speed))
+        self.hold_task = scheduler.every(period_ms, self._hold, "{} hold".format(self))
+        return self.hold_task
+
+    def _hold(self):
+        if not self.completion.done:
+            return
+
+        error = self.hold_target - self.position
+
+        if error > self.hold_tolerance:
+            speed = self._hold_speed
+        elif error < -self.hold_tolerance:
+            speed = -self._hold_speed
+            error = -error
+        else:
+            return
+
+        self.hold_corrections += 1
+        self._begin(self._expected_ms(error, speed))
+        self.port.motor.run_for_degrees(error, speed, stop=MotorStop.HOLD)
+
+    def stop_holding(self):
+        """
+        Stop the task started by :meth:`hold_position`
+        """
+        if self.hold_task is not None:
+            self.hold_task.cancel()
+            self.hold_task = None
+
+    async def run_for_degrees_async(self, degrees, speed, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`run_for_degrees`, other ``uasyncio`` tasks run while the motor moves
+
+        Example:
+
+        .. code:: python
+
+            import hub
+            import uasyncio
+            from spikedev.motor import SpikeMediumMotor
+
+            arm = SpikeMediumMotor(hub.port.C)
+            lift = SpikeMediumMotor(hub.port.D)
+
+            async def main():
+                await uasyncio.gather(arm.run_for_degrees_async(90, 50), lift.run_for_degrees_async(180, 30))
+
+            uasyncio.run(main())
+        """
+        self.run_for_degrees(degrees, speed, stop=stop, block=False, **kwargs)
+        await self._wait_async()
+
+    async def run_to_position_async(self, position, speed, direction="shortest", stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`run_to_position`
+        """
+        self.run_to_position(position, speed, direction=direction, stop=stop, block=False, **kwargs)
+        await self._wait_async()
+
+    async def run_for_time_async(self, msec, speed, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`run_for_time`
+        """
+        self.run_for_time(msec, speed, stop=stop, block=False, **kwargs)
+        await self._wait_async()
+
 
 class SpikeMediumMotor(Motor):
     """
@@ -0,0 +1,194 @@
+"""
+Track the pose of a MoveDifferential robot from its wheel encoders
+"""
+
+# standard libraries
+import math
+
+import utime
+
+# Pose is integrated in integers so that an update does not allocate. MicroPython
+# floats live on the heap, small ints do not. Positions are in 1/16 micrometres,
+# headings in 1/2**24 of a turn.
+POSITION_SCALE = 16000
+HEADING_BITS = 24
+HEADING_FULL = 1 << HEADING_BITS
+HEADING_HALF = HEADING_FULL >> 1
+
+# sin() comes from a table of 1024 entries scaled by 2**12
+SIN_BITS = 12
+TABLE_BITS = 10
+TABLE_SIZE = 1 << TABLE_BITS
+TABLE_MASK = TABLE_SIZE - 1
+TABLE_QUARTER = TABLE_SIZE >> 2
+TABLE_SHIFT = HEADING_BITS - TABLE_BITS
+_SIN = [int(round(math.sin(2 * math.pi * i / TABLE_SIZE) * (1 << SIN_BITS))) for i in range(TABLE_SIZE)]
+
+
+class Odometry:
+    """
+    Integrate the (x, y, heading) of a :class:`spikedev.tank.MoveDifferential` from its wheel encoders.
+
+    The robot starts at (0, 0) facing along +x, heading is counter-clockwise positive, the
+    same convention as ``simulator/physics.py``. Call :meth:`update` every ``period_ms``,
+    from your own loop or a :class:`spikedev.scheduler.Scheduler` task. An update reads both
+    encoders, integrates the pose in fixed-point and records it in a ring buffer of the last
+    ``depth`` poses. Neither the integration nor the ring buffer allocate, so 100Hz alongside
+    other tasks is no problem. Above about 20 degrees of wheel travel per update the
+    fixed-point products no longer fit a small int, so do not run much below 100Hz.
+
+    Args:
+        drive (MoveDifferential): the robot, for its motors, ``wheel`` and ``wheel_distance_mm``
+        rate_hz (int): how often :meth:`update` will be called
+        depth (int): how many past poses to keep
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.odometry import Odometry
+        from spikedev.scheduler import Scheduler
+        from spikedev.tank import MoveDifferential
+        from spikedev.unit import DistanceStuds
+        from spikedev.wheel import SpikeWheel
+
+        md = MoveDifferential(hub.port.E, hub.port.F, SpikeWheel, DistanceStuds(11))
+        odometry = Odometry(md)
+        sched = Scheduler()
+        sched.every(odometry.period_ms, odometry.update)
+        sched.after(10, lambda: md.run_arc_right(200, 300, 50, block=False))
+        sched.on_motor(md, lambda drive, reason: sched.stop())
+        sched.run()
+        print(odometry.pose())
+    """
+
+    def __init__(self, drive, rate_hz=100, depth=100):
+        self.drive = drive
+        self.period_ms = max(1, 1000 // rate_hz)
+        self.depth = depth
+        self.left_motor = drive.left_motor
+        self.right_motor = drive.right_motor
+
+        # per encoder degree, (left + right) * distance_per_degree is how far the midpoint
+        # moved and (right - left) * turn_per_degree is how far the robot turned
+        mm_per_degree = drive.wheel.circumference_mm / 360
+        self.distance_per_degree = int(round(mm_per_degree * POSITION_SCALE / 2))
+        self.turn_per_degree = int(round(mm_per_degree / drive.wheel_distance_mm * HEADING_FULL / (2 * math.pi)))
+
+        # ring buffer of past poses
+        self._history_ms = [0] * depth
+        self._history_x = [0] * depth
+        self._history_y = [0] * depth
+        self._history_heading = [0] * depth
+        self._next = 0
+        self.count = 0
+
+        self.reset()
+
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, self.drive)
+
+    def _positions(self):
+        left = self.left_motor
+        right = self.right_motor
+        return (left._number_with_polarity(left.position), right._number_with_polarity(right.position))
+
+    def reset(self, x=0, y=0, heading=0):
+        """
+        Set the current pose and forget the pose history
+
+        Args:
+            x (float): millimetres
+            y (float): millimetres
+            heading (float): degrees, counter-clockwise positive
+        """
+        self._x = int(x * POSITION_SCALE)
+        self._y = int(y * POSITION_SCALE)
+        self._heading = int(heading * HEADING_FULL / 360) % HEADING_FULL
+        (self._last_left, self._last_right) = self._positions()
+        self._next = 0
+        self.count = 0
+
+    def update(self):
+        """
+        Read the encoders and integrate the distance travelled since the last update
+        """
+        left = self.left_motor._number_with_polarity(self.left_motor.position)
+        right = self.right_motor._number_with_polarity(self.right_motor.position)
+        left_delta = left - self._last_left
+        right_delta = right - self._last_right
+        self._last_left = left
+        self._last_right = right
+
+        distance = (left_delta + right_delta) * self.distance_per_degree
+        turn = (right_delta - left_delta) * self.turn_per_degree
+
+        # move along the average of the old and new heading, rounded to the nearest table entry
+        index = ((self._heading + (turn >> 1) + (1 << (TABLE_SHIFT - 1))) >> TABLE_SHIFT) & TABLE_MASK
+        self._x += (distance * _SIN[(index + TABLE_QUARTER) & TABLE_MASK]) >> SIN_BITS
+        self._y += (distance * _SIN[index]) >> SIN_BITS
+        self._heading = (self._heading + turn) & (HEADING_FULL - 1)
+
+        i = self._next
+        self._history_ms[i] = utime.ticks_ms()
+        self._history_x[i] = self._x
+        self._history_y[i] = self._y
+        self._history_heading[i] = self._heading
+        self._next = i + 1 if i + 1 < self.depth else 0
+
+        if self.count < self.depth:
+            self.count += 1
+
+    @staticmethod
+    def _degrees(heading):
+        if heading >= HEADING_HALF:
+            heading -= HEADING_FULL
+        return heading * 360 / HEADING_FULL
+
+    def pose(self):
+        """
+        Returns:
+            tuple: (x millimetres, y millimetres, heading degrees from -180 to 180)
+        """
+        return (self._x / POSITION_SCALE, self._y / POSITION_SCALE, self._degrees(self._heading))
+
+    def history(self, age=0):
+        """
+        Args:
+            age (int): 0 for the pose from the most recent update, 1 for the one before it, etc
+
+        Returns:
+            tuple: (``utime.ticks_ms()`` of the update, x, y, heading) like :meth:`pose`
+        """
+        if not 0 <= age < self.count:
+            raise IndexError("{}: age {} is invalid, have {} poses".format(self, age, self.count))
+
+        i = (self._next - 1 - age) % self.depth
+        return (
+            self._history_ms[i],
+            self._history_x[i] / POSITION_SCALE,
+            self._history_y[i] / POSITION_SCALE,
+            self._degrees(self._history_heading[i]),
+        )
+
+    def pose_at(self, ticks_ms):
+        """
+        Args:
+            ticks_ms (int): a ``utime.ticks_ms()`` timestamp
+
+        Returns:
+            tuple: the recorded pose from the update closest to ``ticks_ms``, like :meth:`history`
+        """
+        best_age = 0
+        best_ms = None
+
+        for age in range(self.count):
+            diff_ms = abs(utime.ticks_diff(self._history_ms[(self._next - 1 - age) % self.depth], ticks_ms))
+
+            if best_ms is not None and diff_ms > best_ms:
+                break
+
+            (best_age, best_ms) = (age, diff_ms)
+
+        return self.history(best_age)
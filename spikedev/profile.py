@@ -0,0 +1,483 @@
+"""
+Trapezoidal and S-curve motion profiles streamed to ``run_at_speed``
+"""
+
+# standard libraries
+import math
+
+import utime
+
+# spikedev libraries
+from spikedev.logging import log_msg
+from spikedev.motor import Motor, MotorStalled, MotorStop, StallDetector, StallPolicy
+
+# How often ProfiledMove sends a new speed to the firmware
+DEFAULT_RATE_HZ = 100
+
+# The firmware's default acceleration kwarg is 100ms from 0 to 100%, we default to the same
+DEFAULT_ACCELERATION_MS = 100
+
+# S-curves take this long to ramp the acceleration up to its maximum
+DEFAULT_JERK_MS = 50
+
+# Once the profile has run its course we correct any remaining error for at most this long
+DEFAULT_SETTLE_MS = 500
+
+# Below this fraction of MAX_DPS a closed-loop move crawls the last bit rather than stopping short
+CREEP_FRACTION = 0.02
+
+
+class Profile:
+    """
+    A base class for motion profiles. Do not use this directly. Use one of:
+
+    * :class:`TrapezoidProfile`
+    * :class:`SCurveProfile`
+
+    A profile moves ``distance`` degrees starting and ending at rest. Distances are in
+    degrees and velocities in degrees-per-second, time is in seconds. Each profile provides
+    ``_speed(t)``, its unsigned speed ``t`` seconds into the first half of the move, and
+    :meth:`velocity` mirrors that for the second half.
+    """
+
+    def __init__(self, distance):
+        self.distance = distance
+        self.direction = -1 if distance < 0 else 1
+        self.peak_velocity = 0
+        self.duration = 0
+
+    def __str__(self):
+        return "{}({} deg, peak {:.0f} deg/sec, {}ms)".format(
+            self.__class__.__name__, self.distance, self.peak_velocity, self.duration_ms
+        )
+
+    @property
+    def duration_ms(self):
+        """
+        Returns:
+            int: how long the move is planned to take
+        """
+        return int(self.duration * 1000)
+
+    def velocity(self, t):
+        """
+        Args:
+            t (float): seconds since the start of the move
+
+        Returns:
+            float: the planned velocity in degrees-per-second, signed like ``distance``
+        """
+        if t <= 0 or t >= self.duration:
+            return 0
+
+        # the profile is symmetric, decelerating is accelerating backwards in time
+        return self.direction * self._speed(min(t, self.duration - t))
+
+
+class TrapezoidProfile(Profile):
+    """
+    Accelerate at ``max_acceleration`` to ``max_velocity``, cruise, then decelerate at the same
+    rate. This is the fastest way to cover ``distance`` within those limits. Short moves never
+    reach ``max_velocity`` and become a triangle.
+
+    Args:
+        distance (float): degrees to move, negative to move backwards
+        max_velocity (float): degrees-per-second
+        max_acceleration (float): degrees-per-second per second
+    """
+
+    def __init__(self, distance, max_velocity, max_acceleration):
+        super().__init__(distance)
+        self.max_velocity = abs(max_velocity)
+        self.max_acceleration = abs(max_acceleration)
+
+        if not self.max_velocity or not self.max_acceleration:
+            raise ValueError("{}: max_velocity and max_acceleration must be non-zero".format(self.__class__.__name__))
+
+        length = abs(distance)
+        velocity = self.max_velocity
+
+        # too short to reach max_velocity
+        if velocity * velocity / self.max_acceleration > length:
+            velocity = math.sqrt(length * self.max_acceleration)
+
+        self.peak_velocity = velocity
+        self.accel_time = velocity / self.max_acceleration
+        self.cruise_time = (length - velocity * self.accel_time) / velocity if velocity else 0
+        self.duration = 2 * self.accel_time + self.cruise_time
+
+    def _speed(self, t):
+        if t < self.accel_time:
+            return self.max_acceleration * t
+        return self.peak_velocity
+
+
+class SCurveProfile(Profile):
+    """
+    Like :class:`TrapezoidProfile` but the acceleration itself ramps up and down at
+    ``max_jerk`` instead of switching on and off. That is a little slower but much gentler
+    on the drivetrain, wheels are less likely to slip and loads less likely to swing.
+
+    Args:
+        distance (float): degrees to move, negative to move backwards
+        max_velocity (float): degrees-per-second
+        max_acceleration (float): degrees-per-second per second
+        max_jerk (float): degrees-per-second per second per second
+    """
+
+    def __init__(self, distance, max_velocity, max_acceleration, max_jerk):
+        super().__init__(distance)
+        self.max_velocity = abs(max_velocity)
+        self.max_acceleration = abs(max_acceleration)
+        self.max_jerk = abs(max_jerk)
+
+        if not self.max_velocity or not self.max_acceleration or not self.max_jerk:
+            raise ValueError(
+                "{}: max_velocity, max_acceleration and max_jerk must be non-zero".format(self.__class__.__name__)
+            )
+
+        length = abs(distance)
+        velocity = self.max_velocity
+
+        # Too short to reach max_velocity, find the fastest peak that fits. Getting
+        # to velocity v and back covers v * accel_time(v), which grows with v.
+        if velocity * self._ramp(velocity)[0] > length:
+            (low, high) = (0, velocity)
+
+            for _ in range(30):
+                velocity = (low + high) / 2
+
+                if velocity * self._ramp(velocity)[0] > length:
+                    high = velocity
+                else:
+                    low = velocity
+
+            velocity = low
+
+        (self.accel_time, self.jerk_time, self.peak_acceleration) = self._ramp(velocity)
+        self.peak_velocity = velocity
+        self.cruise_time = (length - velocity * self.accel_time) / velocity if velocity else 0
+        self.duration = 2 * self.accel_time + self.cruise_time
+
+    def _ramp(self, velocity):
+        """
+        Returns:
+            tuple: (seconds to reach ``velocity`` from rest, seconds spent ramping the acceleration, peak acceleration)
+        """
+        if velocity * self.max_jerk < self.max_acceleration * self.max_acceleration:
+            # we never reach max_acceleration
+            jerk_time = math.sqrt(velocity / self.max_jerk)
+            return (2 * jerk_time, jerk_time, self.max_jerk * jerk_time)
+
+        jerk_time = self.max_acceleration / self.max_jerk
+        return (velocity / self.max_acceleration + jerk_time, jerk_time, self.max_acceleration)
+
+    def _speed(self, t):
+        if t >= self.accel_time:
+            return self.peak_velocity
+
+        if t < self.jerk_time:
+            return self.max_jerk * t * t / 2
+
+        # ramping the acceleration back down
+        if t > self.accel_time - self.jerk_time:
+            remaining = self.accel_time - t
+            return self.peak_velocity - self.max_jerk * remaining * remaining / 2
+
+        return self.max_jerk * self.jerk_time * self.jerk_time / 2 + self.peak_acceleration * (t - self.jerk_time)
+
+
+def trapezoid_for(motor, distance, speed_fraction=1.0, acceleration_ms=DEFAULT_ACCELERATION_MS):
+    """
+    A :class:`TrapezoidProfile` within ``motor``'s limits
+
+    Args:
+        motor (Motor): the motor, or a :class:`spikedev.tank.MoveTank`, that will make the move
+        distance (float): degrees to move
+        speed_fraction (float): the fraction of the motor's ``MAX_DPS`` to cruise at
+        acceleration_ms (int): milliseconds to go from 0 to ``MAX_DPS``
+    """
+    max_dps = _motor_of(motor).MAX_DPS
+    return TrapezoidProfile(distance, max_dps * speed_fraction, max_dps * 1000 / acceleration_ms)
+
+
+def scurve_for(motor, distance, speed_fraction=1.0, acceleration_ms=DEFAULT_ACCELERATION_MS, jerk_ms=DEFAULT_JERK_MS):
+    """
+    An :class:`SCurveProfile` within ``motor``'s limits
+
+    Args:
+        motor (Motor): the motor, or a :class:`spikedev.tank.MoveTank`, that will make the move
+        distance (float): degrees to move
+        speed_fraction (float): the fraction of the motor's ``MAX_DPS`` to cruise at
+        acceleration_ms (int): milliseconds to go from 0 to ``MAX_DPS``
+        jerk_ms (int): milliseconds to ramp the acceleration from 0 to its maximum
+    """
+    max_dps = _motor_of(motor).MAX_DPS
+    max_acceleration = max_dps * 1000 / acceleration_ms
+    return SCurveProfile(distance, max_dps * speed_fraction, max_acceleration, max_acceleration * 1000 / jerk_ms)
+
+
+def _motor_of(motor):
+    return motor if isinstance(motor, Motor) else motor.left_motor
+
+
+def run_pair_at(drive, left_dps, right_dps):
+    """
+    Set the wheel speeds of ``drive`` in degrees-per-second, with no firmware ramp. Moves that
+    stream their own speeds, :class:`ProfiledMove`, :class:`spikedev.motion.MotionQueue`,
+    :class:`spikedev.pursuit.PathFollower` and :class:`spikedev.gyro.GyroDrive`, do the ramping.
+
+    Args:
+        drive (MoveTank): the robot
+        left_dps (float): degrees-per-second for the left wheel
+        right_dps (float): degrees-per-second for the right wheel
+    """
+    scale = drive.left_motor.SCALE_DPS
+    left_speed = int(max(-100, min(100, left_dps * scale)))
+    right_speed = int(max(-100, min(100, right_dps * scale)))
+
+    # talk to the pair directly, MoveSteering.run_at_speed takes a steering and a speed
+    (left_speed, right_speed) = drive._speed_with_polarity(left_speed, right_speed)
+    drive.pair.run_at_speed(left_speed, right_speed, acceleration=0, deceleration=0)
+
+
+def next_tick(next_ms, period_ms):
+    """
+    Sleep until ``next_ms``, a ``utime.ticks_ms()`` value
+
+    Returns:
+        int: ``period_ms`` after ``next_ms``, when to wake up next
+    """
+    sleep_ms = utime.ticks_diff(next_ms, utime.ticks_ms())
+
+    if sleep_ms > 0:
+        utime.sleep_ms(sleep_ms)
+
+    return utime.ticks_add(next_ms, period_ms)
+
+
+def run_every(period_ms, update, start_ms):
+    """
+    Call ``update`` every ``period_ms`` from ``start_ms`` until it returns False. Sleeping until
+    the next tick rather than for ``period_ms`` keeps the rate steady however long ``update`` takes.
+
+    Args:
+        period_ms (int): milliseconds between updates
+        update (callable): returns True to be called again
+        start_ms (int): the ``utime.ticks_ms()`` the first update ran at
+    """
+    next_ms = utime.ticks_add(start_ms, period_ms)
+
+    while update():
+        next_ms = next_tick(next_ms, period_ms)
+
+
+class PairStallDetector:
+    """
+    Notice that a closed-loop move of both wheels of a :class:`spikedev.tank.MoveTank` is not
+    getting anywhere, e.g. the robot has driven into a wall. Moves that never command a wheel
+    slower than a creep speed would otherwise keep pushing forever.
+
+    Each motor is watched by its own ``stall_detector`` if :meth:`spikedev.motor.Motor.start_stall_detection`
+    gave it one, or by a :class:`spikedev.motor.StallDetector` with the default settings if not.
+    Both wheels turning at less than ``ratio`` of the creep speed counts as a stall. The moves
+    only keep the faster wheel at the creep speed, a tight arc can all but stop the inner one.
+
+    Args:
+        drive (MoveTank): the robot
+        period_ms (int): how often :meth:`update` is called
+    """
+
+    def __init__(self, drive, period_ms):
+        self.drive = drive
+        self.left_motor = drive.left_motor
+        self.right_motor = drive.right_motor
+        self._left_default = StallDetector(self.left_motor, period_ms=period_ms)
+        self._right_default = StallDetector(self.right_motor, period_ms=period_ms)
+        self._left = self._left_default
+        self._right = self._right_default
+
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, self.drive)
+
+    def reset(self, creep_dps):
+        """
+        A move that never turns a wheel slower than ``creep_dps`` degrees-per-second is starting
+        """
+        self._left = self.left_motor.stall_detector or self._left_default
+        self._right = self.right_motor.stall_detector or self._right_default
+        self._left.reset(creep_dps * self.left_motor.SCALE_DPS)
+        self._right.reset(creep_dps * self.right_motor.SCALE_DPS)
+        self.left_motor.stalled = False
+        self.right_motor.stalled = False
+
+    def update(self):
+        """
+        Returns:
+            bool: True if both wheels have stalled, the motors' :attr:`stalled` are set
+        """
+        # each detector needs every sample, update both before comparing
+        left = self._left.update()
+        right = self._right.update()
+
+        if not (left and right):
+            return False
+
+        self._left.detections += 1
+        self._right.detections += 1
+        self.left_motor.stalled = True
+        self.right_motor.stalled = True
+        return True
+
+    def handle(self, owner):
+        """
+        Log the stall, call once the wheels have been stopped. If either motor's stall policy is
+        :attr:`spikedev.motor.StallPolicy.RAISE` this raises :class:`spikedev.motor.MotorStalled`,
+        the other policies end the move like ``ABORT``.
+        """
+        log_msg("{}: STALL".format(owner))
+
+        if StallPolicy.RAISE in (self.left_motor.stall_policy, self.right_motor.stall_policy):
+            raise MotorStalled("{}: stalled".format(owner))
+
+
+class ProfiledMove:
+    """
+    Stream a :class:`Profile` to ``run_at_speed`` at ``rate_hz``
+
+    Each tick the planned velocity is sent to the firmware plus a correction of ``kp`` times
+    the difference between where the profile says we should be and where the encoders say
+    we are. Once the profile has finished we keep correcting until we are within
+    ``tolerance`` degrees, for at most ``settle_ms``, then stop.
+
+    :meth:`run` blocks, or call :meth:`start` then :meth:`update` from your own loop or a
+    :class:`spikedev.scheduler.Scheduler` task. Afterwards :attr:`planned_ms` and
+    :attr:`actual_ms` say how long the move was planned to take and how long it took.
+
+    Args:
+        motor (Motor): a :class:`spikedev.motor.Motor`, or a :class:`spikedev.tank.MoveTank`
+            to move both wheels the same distance
+        profile (Profile): the profile to follow
+        rate_hz (int): how often to update the speed
+        kp (float): degrees-per-second of correction per degree of error
+        tolerance (int): degrees
+        stop (MotorStop): how to stop a single motor once done, defaults to :class:`MotorStop.BRAKE`.
+            A ``MoveTank`` always brakes.
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.motor import SpikeLargeMotor
+        from spikedev.profile import ProfiledMove, scurve_for
+
+        mtr = SpikeLargeMotor(hub.port.A)
+        move = ProfiledMove(mtr, scurve_for(mtr, 3600))
+        move.run()
+        print("planned {}ms, took {}ms".format(move.planned_ms, move.actual_ms))
+    """
+
+    def __init__(self, motor, profile, rate_hz=DEFAULT_RATE_HZ, kp=5, tolerance=2, stop=MotorStop.BRAKE):
+        self.motor = motor
+        self.profile = profile
+        self.period_ms = max(1, 1000 // rate_hz)
+        self.kp = kp
+        self.tolerance = tolerance
+        self.stop_action = stop
+        self.scale = _motor_of(motor).SCALE_DPS
+        self.is_tank = not isinstance(motor, Motor)
+        self.running = False
+        self.planned_ms = profile.duration_ms
+        self.actual_ms = None
+        self.error = None
+        self._start_ms = 0
+        self._start_position = 0
+        self._last_t = 0
+        self._planned_position = 0
+
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, self.motor)
+
+    def _position(self):
+        """
+        Degrees moved so far in the direction the wheels are driven
+        """
+        if self.is_tank:
+            left = self.motor.left_motor
+            right = self.motor.right_motor
+            return (left._number_with_polarity(left.position) + right._number_with_polarity(right.position)) / 2
+
+        return self.motor._number_with_polarity(self.motor.position)
+
+    def _run_at(self, dps):
+        # no firmware ramp, the profile is the ramp
+        if self.is_tank:
+            run_pair_at(self.motor, dps, dps)
+        else:
+            self.motor.run_at_speed(max(-100, min(100, dps * self.scale)), acceleration=0, deceleration=0)
+
+    def start(self):
+        """
+        Start the move, then call :meth:`update` every ``period_ms``
+        """
+        self._start_position = self._position()
+        self._start_ms = utime.ticks_ms()
+        self._last_t = 0
+        self._planned_position = 0
+        self.actual_ms = None
+        self.error = None
+        self.running = True
+        self._run_at(self.profile.velocity(0))
+
+    def update(self):
+        """
+        Send the next setpoint
+
+        Returns:
+            bool: True while the move is still running
+        """
+        if not self.running:
+            return False
+
+        elapsed_ms = utime.ticks_diff(utime.ticks_ms(), self._start_ms)
+        t = elapsed_ms / 1000
+        velocity = self.profile.velocity(t)
+
+        # where the profile says we should be, integrated as we go
+        if t >= self.profile.duration:
+            self._planned_position = self.profile.distance
+        else:
+            self._planned_position += (self.profile.velocity(self._last_t) + velocity) * (t - self._last_t) / 2
+
+        self._last_t = t
+        error = self._planned_position - (self._position() - self._start_position)
+
+        if t >= self.profile.duration:
+            settled = abs(error) <= self.tolerance
+
+            if settled or elapsed_ms >= self.planned_ms + DEFAULT_SETTLE_MS:
+                if self.is_tank:
+                    self.motor.stop()
+                else:
+                    self.motor.stop(self.stop_action)
+
+                self.running = False
+                self.actual_ms = elapsed_ms
+                self.error = error
+                return False
+
+        self._run_at(velocity + self.kp * error)
+        return True
+
+    def run(self):
+        """
+        Make the move, return once it is done
+        """
+        self.start()
+        run_every(self.period_ms, self.update, self._start_ms)
+        log_msg(
+            "{}: {} planned {}ms, took {}ms, ended {:.1f} deg off".format(
+                self, self.profile, self.planned_ms, self.actual_ms, self.error
+            )
+        )
@@ -0,0 +1,307 @@
+"""
+Follow a path of waypoints with pure pursuit
+"""
+
+# standard libraries
+import math
+
+import utime
+
+# spikedev libraries
+from spikedev.logging import log_msg
+from spikedev.odometry import Odometry
+from spikedev.profile import (
+    CREEP_FRACTION,
+    DEFAULT_ACCELERATION_MS,
+    DEFAULT_RATE_HZ,
+    PairStallDetector,
+    run_every,
+    run_pair_at,
+)
+from spikedev.unit import distance_in_mm
+
+# How far along the path ahead of the robot we steer towards
+DEFAULT_LOOKAHEAD_MM = 80
+
+
+class PathFollower:
+    """
+    Steer a :class:`spikedev.tank.MoveDifferential` along a path of waypoints with pure pursuit.
+
+    Each update finds the point ``lookahead`` millimetres further along the path than the
+    robot, drives along the arc that reaches it, and sets both wheel speeds through
+    ``pair.run_at_speed``. The robot never stops at a waypoint, it rounds the corner. A
+    longer ``lookahead`` rounds corners more widely but wobbles less.
+
+    :meth:`set_path` does all the per-path work up front, each segment's direction, length
+    and how fast the robot can take the corner at its end. An update only moves two indexes
+    forward along the path so every update costs the same however long the path is.
+
+    Waypoints are in millimetres in the :class:`spikedev.odometry.Odometry` frame. If you do
+    not pass an ``odometry`` the robot starts at (0, 0) facing along +x.
+
+    Following ends early, with the motors stopped, if it takes longer than ``timeout_ms`` or
+    if the robot stops moving, see :class:`spikedev.profile.PairStallDetector`.
+    :attr:`timed_out` and :attr:`stalled` say whether the last path did.
+
+    Args:
+        drive (MoveDifferential): the robot
+        odometry (Odometry): where the robot is, defaults to a new :class:`spikedev.odometry.Odometry`
+        lookahead (DistanceValue): how far ahead to steer towards, an int of mm or any DistanceValue object
+        acceleration_ms (int): milliseconds for a wheel to go from 0 to ``MAX_DPS``
+        rate_hz (int): how often to update the wheel speeds
+        tolerance (DistanceValue): how close to the final waypoint counts as there
+        timeout_ms (int): give up on a path after this many milliseconds, defaults to no limit
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.tank import MoveDifferential
+        from spikedev.unit import DistanceStuds
+        from spikedev.wheel import SpikeWheel
+
+        md = MoveDifferential(hub.port.E, hub.port.F, SpikeWheel, DistanceStuds(11))
+        md.follow_path([(500, 0), (500, 500), (0, 500)], 60)
+    """
+
+    def __init__(
+        self,
+        drive,
+        odometry=None,
+        lookahead=DEFAULT_LOOKAHEAD_MM,
+        acceleration_ms=DEFAULT_ACCELERATION_MS,
+        rate_hz=DEFAULT_RATE_HZ,
+        tolerance=5,
+        timeout_ms=None,
+    ):
+        self.drive = drive
+        self.odometry = odometry if odometry is not None else Odometry(drive, rate_hz=rate_hz)
+        self.lookahead_mm = distance_in_mm(lookahead)
+        self.tolerance_mm = distance_in_mm(tolerance)
+        self.period_ms = max(1, 1000 // rate_hz)
+        self.timeout_ms = timeout_ms
+        self.running = False
+        self.actual_ms = None
+        self.timed_out = False
+        self.stalled = False
+        self.stall_detector = PairStallDetector(drive, self.period_ms)
+
+        motor = drive.left_motor
+        self.scale = motor.SCALE_DPS
+        self.half_width_mm = drive.wheel_distance_mm / 2
+        self.mm_per_degree = drive.wheel.circumference_mm / 360
+        self.acceleration = motor.MAX_DPS * 1000 / acceleration_ms * self.mm_per_degree
+        self.creep_dps = motor.MAX_DPS * CREEP_FRACTION
+        self.creep = self.creep_dps * self.mm_per_degree
+
+        # the path, one entry per segment
+        self._x = []
+        self._y = []
+        self._ux = []
+        self._uy = []
+        self._length = []
+        self._start = []
+        self._exit_velocity = []
+        self.total_mm = 0
+        self.max_velocity = 0
+
+        self._index = 0
+        self._look_index = 0
+        self._velocity = 0
+        self._start_ms = 0
+        self._last_ms = 0
+
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, self.drive)
+
+    def set_path(self, waypoints, speed):
+        """
+        Plan a path from where the robot is now through ``waypoints``
+
+        Args:
+            waypoints (list): (x, y) millimetre tuples
+            speed (MotorSpeed): the fastest either wheel may turn
+        """
+        # catch up with any moves made since the odometry was last updated
+        self.odometry.update()
+        (x, y, _) = self.odometry.pose()
+        points = [(x, y)]
+
+        for (px, py) in waypoints:
+            # skip repeated points, they make zero length segments
+            if (px - points[-1][0]) ** 2 + (py - points[-1][1]) ** 2 > 1:
+                points.append((px, py))
+
+        if len(points) < 2:
+            raise ValueError("{}: the path {} goes nowhere".format(self, waypoints))
+
+        self.max_velocity = abs(self.drive._speed_percentage(speed)) / self.scale * self.mm_per_degree
+        (self._x, self._y, self._ux, self._uy, self._length, self._start) = ([], [], [], [], [], [])
+        self.total_mm = 0
+
+        for i in range(len(points) - 1):
+            ((x0, y0), (x1, y1)) = (points[i], points[i + 1])
+            length = math.sqrt((x1 - x0) ** 2 + (y1 - y0) ** 2)
+            self._x.append(x0)
+            self._y.append(y0)
+            self._ux.append((x1 - x0) / length)
+            self._uy.append((y1 - y0) / length)
+            self._length.append(length)
+            self._start.append(self.total_mm)
+            self.total_mm += length
+
+        # How fast we can take the corner at the end of each segment. We cut a corner of
+        # angle theta on a circle of radius about lookahead / (2 sin(theta / 2)), the outer
+        # wheel goes 1 + half_width / radius times faster than the midpoint.
+        last = len(self._length) - 1
+        self._exit_velocity = [0] * (last + 1)
+
+        for i in range(last - 1, -1, -1):
+            cos_theta = self._ux[i] * self._ux[i + 1] + self._uy[i] * self._uy[i + 1]
+            sin_half = math.sqrt(max(0, (1 - cos_theta) / 2))
+            corner = self.max_velocity / (1 + self.half_width_mm * 2 * sin_half / self.lookahead_mm)
+            stoppable = math.sqrt(self._exit_velocity[i + 1] ** 2 + 2 * self.acceleration * self._length[i + 1])
+            self._exit_velocity[i] = min(corner, stoppable)
+
+        self._index = 0
+        self._look_index = 0
+
+    def start(self):
+        """
+        Start following the path from :meth:`set_path`, then call :meth:`update` every ``period_ms``
+        """
+        self._start_ms = utime.ticks_ms()
+        self._last_ms = self._start_ms
+        self._velocity = 0
+        self.actual_ms = None
+        self.timed_out = False
+        self.stalled = False
+        self.stall_detector.reset(self.creep_dps)
+        self.running = True
+
+    def _finish(self, now_ms):
+        self.drive.stop()
+        self.running = False
+        self._velocity = 0
+        self.actual_ms = utime.ticks_diff(now_ms, self._start_ms)
+
+        if self.timed_out:
+            log_msg("{}: TIMEOUT".format(self))
+        elif self.stalled:
+            self.stall_detector.handle(self)
+
+    def update(self):
+        """
+        Update the pose and the wheel speeds
+
+        Returns:
+            bool: True until the robot reaches the final waypoint, times out or stalls
+        """
+        if not self.running:
+            return False
+
+        now_ms = utime.ticks_ms()
+
+        if self.timeout_ms is not None and utime.ticks_diff(now_ms, self._start_ms) >= self.timeout_ms:
+            self.timed_out = True
+        elif self.stall_detector.update():
+            self.stalled = True
+
+        if self.timed_out or self.stalled:
+            self._finish(now_ms)
+            return False
+
+        dt = utime.ticks_diff(now_ms, self._last_ms) / 1000
+        self._last_ms = now_ms
+        self.odometry.update()
+        (x, y, heading) = self.odometry.pose()
+        last = len(self._length) - 1
+
+        # project the robot onto the path, moving on to the next segment once we are past this one
+        i = self._index
+
+        while True:
+            along = (x - self._x[i]) * self._ux[i] + (y - self._y[i]) * self._uy[i]
+
+            if along < self._length[i] or i == last:
+                break
+
+            i += 1
+
+        self._index = i
+        travelled = self._start[i] + max(0, min(along, self._length[i]))
+
+        if i == last and along >= self._length[i] - self.tolerance_mm:
+            self._finish(now_ms)
+            return False
+
+        # The lookahead point. Past the end of the path it carries on in a straight line,
+        # so we keep steering towards the final waypoint rather than circling it.
+        target = travelled + self.lookahead_mm
+        j = max(self._look_index, i)
+
+        while j < last and self._start[j] + self._length[j] < target:
+            j += 1
+
+        self._look_index = j
+        offset = target - self._start[j]
+        dx = self._x[j] + self._ux[j] * offset - x
+        dy = self._y[j] + self._uy[j] * offset - y
+
+        # the lookahead point in the robot's frame
+        radians = math.radians(heading)
+        (cos_h, sin_h) = (math.cos(radians), math.sin(radians))
+        ahead = cos_h * dx + sin_h * dy
+        lateral = cos_h * dy - sin_h * dx
+
+        # as fast as allowed, as fast as we can accelerate to, slow enough to make the next corner
+        braking = math.sqrt(
+            self._exit_velocity[i] ** 2 + 2 * self.acceleration * max(0, self._length[i] - along)
+        )
+        velocity = max(self.creep, min(self.max_velocity, self._velocity + self.acceleration * dt, braking))
+
+        if ahead <= 0:
+            # the path is behind us, turn in place towards it
+            velocity = min(velocity, self.max_velocity / 2)
+            turn = velocity if lateral > 0 else -velocity
+            (left, right) = (-turn, turn)
+        else:
+            # pure pursuit, the arc through the lookahead point has curvature 2 * lateral / distance^2
+            curvature = 2 * lateral / (ahead * ahead + lateral * lateral)
+            left = velocity * (1 - curvature * self.half_width_mm)
+            right = velocity * (1 + curvature * self.half_width_mm)
+            fastest = max(abs(left), abs(right))
+
+            if fastest > self.max_velocity:
+                left = left * self.max_velocity / fastest
+                right = right * self.max_velocity / fastest
+
+        self._velocity = velocity
+        run_pair_at(self.drive, left / self.mm_per_degree, right / self.mm_per_degree)
+        return True
+
+    def run(self):
+        """
+        Follow the path, return once the robot reaches the final waypoint, times out or stalls
+        """
+        self.start()
+        run_every(self.period_ms, self.update, self._start_ms)
+        (x, y, heading) = self.odometry.pose()
+        log_msg(
+            "{}: {:.0f}mm path took {}ms, ended at ({:.1f}, {:.1f}) heading {:.1f}".format(
+                self, self.total_mm, self.actual_ms, x, y, heading
+            )
+        )
+
+    def follow_path(self, waypoints, speed):
+        """
+        Drive through ``waypoints``, return once the robot reaches the last one
+
+        Args:
+            waypoints (list): (x, y) millimetre tuples
+            speed (MotorSpeed): the fastest either wheel may turn
+        """
+        self.set_path(waypoints, speed)
+        self.run()
@@ -0,0 +1,412 @@
+"""
+A cooperative scheduler for running several spikedev jobs on one hub
+"""
+
+# standard libraries
+import utime
+
+# spikedev libraries
+from spikedev.logging import log_msg
+
+# The longest we sleep while idle. Motor and button callbacks do not wake a
+# sleeping hub early so this bounds how late an event handler can run.
+IDLE_MS = 2
+
+# How many motor and button events can be waiting for their handlers
+EVENT_QUEUE_SIZE = 16
+
+
+class Task:
+    """
+    A periodic task or one-shot timer created by :meth:`Scheduler.every` or :meth:`Scheduler.after`.
+    Do not create these directly.
+
+    Each run records how late it started (jitter) and how long it took. A periodic task that is
+    still running when its next run comes due has overrun, the missed runs are skipped rather
+    than run back to back.
+    """
+
+    def __init__(self, scheduler, func, period_ms, due_ms, name=None):
+        self.scheduler = scheduler
+        self.func = func
+        self.period_ms = period_ms
+        self.due_ms = due_ms
+        self.name = name if name is not None else getattr(func, "__name__", "task")
+        self.cancelled = False
+
+        # statistics
+        self.runs = 0
+        self.overruns = 0
+        self.jitter_max_ms = 0
+        self.jitter_total_ms = 0
+        self.run_max_us = 0
+        self.run_total_us = 0
+
+    def __str__(self):
+        return "{}: {} runs, {} overruns, jitter avg {}ms max {}ms, run avg {}us max {}us".format(
+            self.name,
+            self.runs,
+            self.overruns,
+            self.jitter_avg_ms,
+            self.jitter_max_ms,
+            self.run_avg_us,
+            self.run_max_us,
+        )
+
+    @property
+    def jitter_avg_ms(self):
+        """
+        Returns:
+            float: how late, on average, each run started
+        """
+        return self.jitter_total_ms / self.runs if self.runs else 0
+
+    @property
+    def run_avg_us(self):
+        """
+        Returns:
+            int: how long, on average, each run took
+        """
+        return self.run_total_us // self.runs if self.runs else 0
+
+    def cancel(self):
+        """
+        Stop running this task. It is moved to :attr:`Scheduler.finished` at the end of the
+        scheduler's next pass, so that a pass never has to copy its list of tasks.
+        """
+        self.cancelled = True
+        self.scheduler._cancelled = True
+
+    def _run(self, now_ms):
+        jitter_ms = utime.ticks_diff(now_ms, self.due_ms)
+        start_us = utime.ticks_us()
+        self.func()
+        run_us = utime.ticks_diff(utime.ticks_us(), start_us)
+
+        self.runs += 1
+        self.jitter_total_ms += jitter_ms
+        self.run_total_us += run_us
+
+        if jitter_ms > self.jitter_max_ms:
+            self.jitter_max_ms = jitter_ms
+
+        if run_us > self.run_max_us:
+            self.run_max_us = run_us
+
+        if self.period_ms is None:
+            self.cancel()
+            return
+
+        # Fixed rate, the next run is due one period after this one was due, not
+        # one period after it ran. Skip any runs we have already missed.
+        self.due_ms = utime.ticks_add(self.due_ms, self.period_ms)
+        late_ms = utime.ticks_diff(utime.ticks_ms(), self.due_ms)
+
+        if late_ms > 0:
+            missed = late_ms // self.period_ms + 1
+            self.overruns += missed
+            self.due_ms = utime.ticks_add(self.due_ms, missed * self.period_ms)
+
+
+class _Subscription:
+    """
+    The handlers for one motor or button. ``callback`` is bound once so that it can be
+    unsubscribed again and so that a firmware callback allocates nothing.
+    """
+
+    def __init__(self, scheduler, source, is_motor):
+        self.scheduler = scheduler
+        self.source = source
+        self.is_motor = is_motor
+        self.handlers = []
+        self.callback = self._motor_event if is_motor else self._button_event
+
+    def _motor_event(self, reason):
+        self.scheduler._queue(self, reason)
+
+    def _button_event(self, button, held_ms):
+        self.scheduler._queue(self, held_ms)
+
+    def dispatch(self, value):
+        for (func, wanted) in self.handlers:
+            if self.is_motor:
+                if wanted is None or wanted == value:
+                    func(self.source, value)
+            elif wanted == (value == 0):
+                func(self.source, value)
+
+
+class Scheduler:
+    """
+    Run periodic tasks, one-shot timers and motor/button event handlers from a single loop.
+
+    SPIKE does not have threads so every blocking spikedev call (``run_for_degrees(block=True)``,
+    ``wait_for_pressed()``, etc) stops everything else the robot is doing until it returns. With a
+    ``Scheduler`` you start moves with ``block=False`` and react to their completion with
+    :meth:`on_motor` instead. Every function you hand the scheduler must return quickly, a slow
+    one delays the rest and shows up as jitter in :meth:`log_stats`.
+
+    Motor and button callbacks only queue their event, the handlers run from :meth:`run`.
+    The queue is a ring of ``queue_size`` preallocated slots so a callback allocates nothing.
+    Events that arrive while it is full are dropped and counted in :attr:`dropped`.
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.button import ButtonLeft
+        from spikedev.motor import MotorCallbackEvent, SpikeMediumMotor
+        from spikedev.scheduler import Scheduler
+
+        sched = Scheduler()
+        arm = SpikeMediumMotor(hub.port.C)
+
+        def check_for_obstacles():
+            ...
+
+        def arm_down(motor, reason):
+            arm.run_for_degrees(90, -50, block=False)
+
+        sched.every(20, check_for_obstacles)
+        sched.on_motor(arm, arm_down, MotorCallbackEvent.COMPLETED)
+        sched.on_button(ButtonLeft(), lambda button, held_ms: sched.stop())
+        arm.run_for_degrees(90, 50, block=False)
+        sched.run()
+        sched.log_stats()
+    """
+
+    def __init__(self, idle_ms=IDLE_MS, queue_size=EVENT_QUEUE_SIZE):
+        self.idle_ms = idle_ms
+        self.tasks = []
+
+        # tasks that have been cancelled, or one-shot timers that have fired, kept for log_stats()
+        self.finished = []
+        self._cancelled = False
+        self.running = False
+        self.dropped = 0
+        self._motors = {}
+        self._buttons = {}
+
+        # the event ring, one slot is always left empty to tell full from empty
+        self._size = queue_size + 1
+        self._event_subscriptions = [None] * self._size
+        self._event_values = [0] * self._size
+        self._head = 0
+        self._tail = 0
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def every(self, period_ms, func, name=None):
+        """
+        Call ``func()`` every ``period_ms`` milliseconds, the first call is one period from now
+
+        Returns:
+            Task: call ``cancel()`` on this to stop it
+        """
+        if period_ms <= 0:
+            raise ValueError("period_ms {} is invalid, must be > 0".format(period_ms))
+
+        task = Task(self, func, period_ms, utime.ticks_add(utime.ticks_ms(), period_ms), name)
+        self.tasks.append(task)
+        return task
+
+    def after(self, delay_ms, func, name=None):
+        """
+        Call ``func()`` once, ``delay_ms`` milliseconds from now
+
+        Returns:
+            Task: call ``cancel()`` on this to stop it from firing
+        """
+        task = Task(self, func, None, utime.ticks_add(utime.ticks_ms(), delay_ms), name)
+        self.tasks.append(task)
+        return task
+
+    def _queue(self, subscription, value):
+        # called from the motor or button callback, defer the handlers to the loop
+        tail = self._tail
+        next_tail = tail + 1 if tail + 1 < self._size else 0
+
+        if next_tail == self._head:
+            self.dropped += 1
+            return
+
+        self._event_subscriptions[tail] = subscription
+        self._event_values[tail] = value
+        self._tail = next_tail
+
+    @staticmethod
+    def _remove(subscriptions, source, func, unsubscribe):
+        subscription = subscriptions.get(source)
+
+        if subscription is None:
+            return
+
+        subscription.handlers = [h for h in subscription.handlers if func is not None and h[0] != func]
+
+        if not subscription.handlers:
+            unsubscribe(subscription.callback)
+            del subscriptions[source]
+
+    def on_motor(self, motor, func, reason=None):
+        """
+        Call ``func(motor, reason)`` when ``motor`` reports ``reason``
+
+        Args:
+            motor (Motor): a :class:`spikedev.motor.Motor` or :class:`spikedev.tank.MoveTank`
+            func (callable): the handler
+            reason (MotorCallbackEvent): ``COMPLETED``, ``INTERRUPTED`` or ``STALL``, ``None`` for all three
+        """
+        subscription = self._motors.get(motor)
+
+        if subscription is None:
+            subscription = _Subscription(self, motor, True)
+            self._motors[motor] = subscription
+            motor.subscribe(subscription.callback)
+
+        subscription.handlers.append((func, reason))
+
+    def off_motor(self, motor, func=None):
+        """
+        Stop calling ``func``, or every handler if ``func`` is ``None``, for ``motor``
+        """
+        self._remove(self._motors, motor, func, motor.unsubscribe)
+
+    def on_button(self, button, func, pressed=True):
+        """
+        Call ``func(button, held_ms)`` when ``button`` is pressed, or released if ``pressed`` is False.
+        ``held_ms`` is 0 for a press.
+
+        Args:
+            button (Button): a :class:`spikedev.button.Button`
+            func (callable): the handler
+            pressed (bool): handle presses if True, releases if False
+        """
+        subscription = self._buttons.get(button)
+
+        if subscription is None:
+            subscription = _Subscription(self, button, False)
+            self._buttons[button] = subscription
+            button.subscribe(subscription.callback)
+
+        subscription.handlers.append((func, pressed))
+
+    def off_button(self, button, func=None):
+        """
+        Stop calling ``func``, or every handler if ``func`` is ``None``, for ``button``
+        """
+        self._remove(self._buttons, button, func, button.unsubscribe)
+
+    def run_once(self):
+        """
+        Run any queued event handlers and any tasks that are due
+
+        Returns:
+            int: milliseconds until the next task is due, at most ``idle_ms``
+        """
+        while self._head != self._tail:
+            head = self._head
+            subscription = self._event_subscriptions[head]
+            value = self._event_values[head]
+            self._event_subscriptions[head] = None
+            self._head = head + 1 if head + 1 < self._size else 0
+            subscription.dispatch(value)
+
+        now_ms = utime.ticks_ms()
+        next_ms = self.idle_ms
+
+        # by index, and only over the tasks there were when the pass started, so that a task
+        # added by a handler waits for the next pass. Cancelled tasks are removed afterwards.
+        tasks = self.tasks
+
+        for i in range(len(tasks)):
+            task = tasks[i]
+
+            if task.cancelled:
+                continue
+
+            until_ms = utime.ticks_diff(task.due_ms, now_ms)
+
+            if until_ms <= 0:
+                task._run(now_ms)
+                now_ms = utime.ticks_ms()
+
+                if task.cancelled:
+                    continue
+
+                until_ms = utime.ticks_diff(task.due_ms, now_ms)
+
+            if until_ms < next_ms:
+                next_ms = until_ms
+
+        if self._cancelled:
+            self._remove_cancelled()
+
+        return max(0, next_ms)
+
+    def _remove_cancelled(self):
+        # in place, keeping the order of the tasks that are left
+        tasks = self.tasks
+        kept = 0
+
+        for i in range(len(tasks)):
+            task = tasks[i]
+
+            if task.cancelled:
+                self.finished.append(task)
+            else:
+                tasks[kept] = task
+                kept += 1
+
+        del tasks[kept:]
+        self._cancelled = False
+
+    def run(self, duration_ms=None, until=None):
+        """
+        Run the scheduler until :meth:`stop` is called, ``duration_ms`` has passed or ``until()`` returns True
+
+        Args:
+            duration_ms (int): how long to run for, ``None`` runs forever
+            until (callable): checked after each pass, e.g. ``motor.completion.is_set``
+
+        Returns:
+            bool: False if ``duration_ms`` expired before ``until()`` returned True, else True
+        """
+        start = utime.ticks_ms()
+        self.running = True
+
+        while self.running:
+            sleep_ms = self.run_once()
+
+            if until is not None and until():
+                break
+
+            if duration_ms is not None:
+                remaining_ms = duration_ms - utime.ticks_diff(utime.ticks_ms(), start)
+
+                if remaining_ms <= 0:
+                    self.running = False
+                    return until is None
+
+                sleep_ms = min(sleep_ms, remaining_ms)
+
+            if sleep_ms and self._head == self._tail:
+                utime.sleep_ms(sleep_ms)
+
+        self.running = False
+        return True
+
+    def stop(self):
+        """
+        Make :meth:`run` return once the current task or handler finishes
+        """
+        self.running = False
+
+    def log_stats(self):
+        """
+        log_msg the overrun and jitter statistics of every task, including the ones that
+        have been cancelled or have fired
+        """
+        for task in self.finished + self.tasks:
+            log_msg("{}: {}".format(self, task))
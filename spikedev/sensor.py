@@ -19,6 +19,19 @@ class Sensor:
         self.desc = desc
         self.mode = None
 
+        # how many times set_mode() changed the mode and how long that took
+        self.mode_switches = 0
+        self.mode_switch_us = 0
+
+        # see start_sampling()
+        self.sampling = False
+        self.sampling_task = None
+        self.sample_count = 0
+        self.depth = 0
+        self._ring = []
+        self._ring_ms = []
+        self._next = 0
+
         # wait for sensor to connect
         while self.port.device is None:
             utime.sleep(0.1)
@@ -31,10 +44,18 @@ class Sensor:
 
     def set_mode(self, mode):
         """
-        Set the mode for the sensor to ``mode``
+        Set the mode for the sensor to ``mode``. Changes of mode are counted in
+        :attr:`mode_switches` and the time they took in :attr:`mode_switch_us`.
         """
+        if mode == self.mode:
+            self.port.device.mode(mode)
+            return
+
+        start_us = utime.ticks_us()
         self.mode = mode
         self.port.device.mode(mode)
+        self.mode_switches += 1
+        self.mode_switch_us += utime.ticks_diff(utime.ticks_us(), start_us)
 
     def _ensure_mode(self, mode):
         """
@@ -49,6 +70,129 @@ class Sensor:
         """
         return self.port.device.get()
 
+    def start_sampling(self, rate_hz=50, depth=50, scheduler=None):
+        """
+        Keep the last ``depth`` readings of :meth:`value` in a ring buffer, so code that needs
+        a reading asks :meth:`latest` instead of waiting on the device. However many places
+        read it, the device is read once per :meth:`sample`.
+
+        The buffer is allocated here, :meth:`sample` only overwrites the oldest slot. Pass a
+        :class:`spikedev.scheduler.Scheduler` to have it call :meth:`sample` at ``rate_hz``,
+        else call :meth:`sample` yourself.
+
+        Args:
+            rate_hz (int): how often the scheduler task samples
+            depth (int): how many readings to keep
+            scheduler (Scheduler): runs the sampling task, ``None`` to call :meth:`sample` yourself
+
+        Example:
+
+        .. code:: python
+
+            import hub
+            from spikedev.scheduler import Scheduler
+            from spikedev.sensor import DistanceSensor
+
+            sched = Scheduler()
+            ds = DistanceSensor(hub.port.A)
+            ds.start_sampling(rate_hz=20, depth=10, scheduler=sched)
+
+            def report():
+                print(ds.latest(), ds.window(5))
+
+            sched.every(500, report)
+            sched.run()
+        """
+        if depth < 1:
+            raise ValueError("depth {} is invalid, must be >= 1".format(depth))
+
+        self.stop_sampling()
+        self.depth = depth
+        self._ring = [None] * depth
+        self._ring_ms = [0] * depth
+        self._next = 0
+        self.sample_count = 0
+        self.sampling = True
+        self.sample()
+
+        if scheduler is not None:
+            self.sampling_task = scheduler.every(max(1, 1000 // rate_hz), self.sample, "{} sampling".format(self))
+
+    def stop_sampling(self):
+        """
+        Stop the task started by :meth:`start_sampling`, the readings already taken are kept
+        """
+        if self.sampling_task is not None:
+            self.sampling_task.cancel()
+            self.sampling_task = None
+
+        self.sampling = False
+
+    def sample(self):
+        """
+        Read the sensor into the ring buffer
+        """
+        i = self._next
+        self._ring[i] = self.value()
+        self._ring_ms[i] = utime.ticks_ms()
+        self._next = i + 1 if i + 1 < self.depth else 0
+        self.sample_count += 1
+
+    def latest(self):
+        """
+        Returns:
+            the newest reading in the ring buffer, as :meth:`value` returned it
+        """
+        if not self.sample_count:
+            raise ValueError("{}: nothing sampled yet, call start_sampling() first".format(self))
+
+        return self._ring[self._next - 1]
+
+    def snapshot(self, age=0):
+        """
+        Args:
+            age (int): 0 for the newest reading, 1 for the one before, up to ``depth - 1``
+
+        Returns:
+            tuple: (``utime.ticks_ms()`` of the reading, the reading)
+        """
+        if not self.sample_count:
+            raise ValueError("{}: nothing sampled yet, call start_sampling() first".format(self))
+
+        kept = min(self.sample_count, self.depth)
+
+        if age >= kept:
+            raise ValueError("{}: age {} is invalid, only {} readings are kept".format(self, age, kept))
+
+        i = (self._next - 1 - age) % self.depth
+        return (self._ring_ms[i], self._ring[i])
+
+    def window(self, n, out=None):
+        """
+        The newest ``n`` readings, oldest first
+
+        Args:
+            n (int): how many, at most ``depth``
+            out (list): a list of at least ``n`` entries to fill in, to avoid allocating a new one
+
+        Returns:
+            list: the readings
+        """
+        if not self.sample_count:
+            raise ValueError("{}: nothing sampled yet, call start_sampling() first".format(self))
+
+        n = min(n, self.sample_count, self.depth)
+
+        if out is None:
+            out = [None] * n
+
+        start = self._next - n
+
+        for j in range(n):
+            out[j] = self._ring[(start + j) % self.depth]
+
+        return out
+
 
 class TouchSensorMode:
     """
@@ -171,10 +315,39 @@ class TouchSensor(Sensor):
                 log_msg("{} was not bumped within {}ms".format(self, timeout_ms))
                 return False
 
+    async def _poll_async(self, pressed, timeout_ms):
+        # third party libraries
+        import uasyncio
 
-def rgb2lab(red, green, blue):
+        stopwatch = StopWatch()
+        stopwatch.start()
+
+        while self.is_pressed() != pressed:
+            if timeout_ms is not None and stopwatch.value_ms >= timeout_ms:
+                return False
+
+            await uasyncio.sleep_ms(10)
+
+        return True
+
+    async def pressed(self, timeout_ms=None):
+        """
+        Awaitable :meth:`wait_for_pressed`, other ``uasyncio`` tasks run while we wait.
+        The ``TouchSensor`` has no callback so this polls every 10ms.
+        """
+        return await self._poll_async(True, timeout_ms)
+
+    async def released(self, timeout_ms=None):
+        """
+        Awaitable :meth:`wait_for_released`
+        """
+        return await self._poll_async(False, timeout_ms)
+
+
+def rgb2lab_reference(red, green, blue):
     """
     Convert RGB (``red``, ``green``, ``blue``) to `CIELAB <https://en.wikipedia.org/wiki/CIELAB_color_space>`_
+    with the full formulas, see :func:`rgb2lab` for a faster version
     """
 
     # XYZ -> Standard-RGB
@@ -238,6 +411,207 @@ def rgb2lab(red, green, blue):
     return (L, a, b)
 
 
+# rgb2lab is within this of rgb2lab_reference in each of L, a and b
+RGB2LAB_TOLERANCE = 0.01
+
+# rgb2lab clamps each channel to 0 to this, the most a raw color sensor channel reads
+RGB2LAB_CHANNEL_MAX = 1024
+
+# The cube root table has this many steps from 0 to 1
+CUBE_ROOT_STEPS = 256
+
+# The sRGB channel values 0 to 255 linearised and scaled to 0 to 100, the cube roots of 0 to 1
+# in CUBE_ROOT_STEPS steps and the slope from each to the next, built the first time rgb2lab is called
+_SRGB_LINEAR = None
+_CUBE_ROOT = None
+_CUBE_ROOT_SLOPE = None
+
+
+def _srgb_linear(channel):
+    value = channel / 255
+
+    if value > 0.04045:
+        return pow(((value + 0.055) / 1.055), 2.4) * 100
+
+    return value / 12.92 * 100
+
+
+def _build_lab_tables():
+    global _SRGB_LINEAR, _CUBE_ROOT, _CUBE_ROOT_SLOPE
+    _SRGB_LINEAR = [_srgb_linear(channel) for channel in range(256)]
+    _CUBE_ROOT = [pow(step / CUBE_ROOT_STEPS, 1 / 3) for step in range(CUBE_ROOT_STEPS + 1)]
+    _CUBE_ROOT_SLOPE = [_CUBE_ROOT[step + 1] - _CUBE_ROOT[step] for step in range(CUBE_ROOT_STEPS)]
+
+
+def rgb2lab(red, green, blue):
+    """
+    Convert RGB (``red``, ``green``, ``blue``) to `CIELAB <https://en.wikipedia.org/wiki/CIELAB_color_space>`_
+
+    :func:`rgb2lab_reference` does three ``pow(x, 2.4)`` and three cube roots per call. Here
+    channels from 0 to 255 are linearised by looking them up in a 256 entry table, and the
+    cube roots are interpolated from a table and refined with one Newton step. The result
+    is within ``RGB2LAB_TOLERANCE`` of :func:`rgb2lab_reference`. Channels above 255, which
+    ``scale_by_intensity`` can produce, and floats are linearised with the full formula. Each
+    channel is clamped to 0 to ``RGB2LAB_CHANNEL_MAX`` first, a negative one would otherwise
+    index the table from the end.
+    """
+    if _SRGB_LINEAR is None:
+        _build_lab_tables()
+
+    linear = _SRGB_LINEAR
+
+    try:
+        var_R = linear[red] if 0 <= red < 256 else _srgb_linear(min(max(red, 0), RGB2LAB_CHANNEL_MAX))
+        var_G = linear[green] if 0 <= green < 256 else _srgb_linear(min(max(green, 0), RGB2LAB_CHANNEL_MAX))
+        var_B = linear[blue] if 0 <= blue < 256 else _srgb_linear(min(max(blue, 0), RGB2LAB_CHANNEL_MAX))
+    except TypeError:
+        # floats are not table indexes
+        var_R = _srgb_linear(min(max(red, 0), RGB2LAB_CHANNEL_MAX))
+        var_G = _srgb_linear(min(max(green, 0), RGB2LAB_CHANNEL_MAX))
+        var_B = _srgb_linear(min(max(blue, 0), RGB2LAB_CHANNEL_MAX))
+
+    # Standard-RGB -> XYZ, each divided by the reference white up front
+    var_X = var_R * 0.0043389060 + var_G * 0.0037623492 + var_B * 0.0018990605
+    var_Y = var_R * 0.002126 + var_G * 0.007152 + var_B * 0.000722
+    var_Z = var_R * 0.00017725448 + var_G * 0.0010947531 + var_B * 0.0087295537
+
+    # XYZ -> CIE-L*ab, the cube roots are interpolated from the table then one Newton step
+    # squares the error, written out three times as a function call costs more than the maths
+    (roots, slopes) = (_CUBE_ROOT, _CUBE_ROOT_SLOPE)
+
+    if var_X <= 0.008856:
+        var_X = (7.787 * var_X) + (16 / 116)
+    elif var_X < 1:
+        position = var_X * CUBE_ROOT_STEPS
+        index = int(position)
+        root = roots[index] + slopes[index] * (position - index)
+        var_X = (root + root + var_X / (root * root)) / 3
+    else:
+        var_X = pow(var_X, 1 / 3)
+
+    if var_Y <= 0.008856:
+        var_Y = (7.787 * var_Y) + (16 / 116)
+    elif var_Y < 1:
+        position = var_Y * CUBE_ROOT_STEPS
+        index = int(position)
+        root = roots[index] + slopes[index] * (position - index)
+        var_Y = (root + root + var_Y / (root * root)) / 3
+    else:
+        var_Y = pow(var_Y, 1 / 3)
+
+    if var_Z <= 0.008856:
+        var_Z = (7.787 * var_Z) + (16 / 116)
+    elif var_Z < 1:
+        position = var_Z * CUBE_ROOT_STEPS
+        index = int(position)
+        root = roots[index] + slopes[index] * (position - index)
+        var_Z = (root + root + var_Z / (root * root)) / 3
+    else:
+        var_Z = pow(var_Z, 1 / 3)
+
+    return ((116 * var_Y) - 16, 500 * (var_X - var_Y), 200 * (var_Y - var_Z))
+
+
+def rgb2lab_batch(rgb):
+    """
+    :func:`rgb2lab_reference` for a whole array of samples at once with `NumPy <https://numpy.org>`_,
+    for analysing logged readings on a computer. NumPy is not available on the hub.
+
+    Args:
+        rgb (array_like): red, green and blue along the last axis, e.g. shape ``(samples, 3)``
+
+    Returns:
+        numpy.ndarray: L, a and b along the last axis, the same shape as ``rgb``
+    """
+    # third party libraries
+    import numpy
+
+    linear = numpy.asarray(rgb, dtype=numpy.float64) / 255
+    linear = numpy.where(
+        linear > 0.04045, numpy.power((numpy.maximum(linear, 0.04045) + 0.055) / 1.055, 2.4), linear / 12.92
+    )
+    linear *= 100
+
+    xyz = linear @ numpy.array(
+        [[0.4124, 0.2126, 0.0193], [0.3576, 0.7152, 0.1192], [0.1805, 0.0722, 0.9505]], dtype=numpy.float64
+    )
+    xyz /= numpy.array([95.047, 100.0, 108.883])
+    xyz = numpy.where(xyz > 0.008856, numpy.cbrt(xyz), (7.787 * xyz) + (16 / 116))
+
+    lab = numpy.empty_like(xyz)
+    lab[..., 0] = (116 * xyz[..., 1]) - 16
+    lab[..., 1] = 500 * (xyz[..., 0] - xyz[..., 1])
+    lab[..., 2] = 200 * (xyz[..., 1] - xyz[..., 2])
+    return lab
+
+
+def rgb2hsv(red, green, blue):
+    """
+    Convert RGB (``red``, ``green``, ``blue``), each 0 to 255, to hue, saturation and value,
+    each 0 to 255 like :meth:`ColorSensor.hsv`
+    """
+    high = max(red, green, blue)
+    low = min(red, green, blue)
+    delta = high - low
+
+    if not delta:
+        return (0, 0, high)
+
+    if high == red:
+        hue = ((green - blue) / delta) % 6
+    elif high == green:
+        hue = (blue - red) / delta + 2
+    else:
+        hue = (red - green) / delta + 4
+
+    return (int(hue * 255 / 6), delta * 255 // high, high)
+
+
+# (upper hue, color number) for rgb2color, hue is on a 0 to 255 scale
+COLOR_HUES = ((15, 9), (60, 7), (115, 5), (145, 4), (185, 3), (225, 1))
+
+
+def rgb2color(red, green, blue):
+    """
+    Approximate the color number ``ColorSensorMode.COLOR`` reports from RGB (``red``,
+    ``green``, ``blue``), each 0 to 255. Dark is black, grey and bright is white, anything
+    else goes by hue.
+
+    Returns:
+        int: 0 black, 1 violet, 3 blue, 4 azure, 5 green, 7 yellow, 9 red or 10 white
+    """
+    (hue, saturation, value) = rgb2hsv(red, green, blue)
+
+    if value < 40:
+        return 0
+
+    if saturation < 60:
+        return 10 if value > 150 else 0
+
+    # hue is 0 to 255, red wraps around
+    for (upper, color) in COLOR_HUES:
+        if hue < upper:
+            return color
+
+    return 9
+
+
+def _rgb_from_rgbi(values, scale_by_intensity):
+    # the RGB_I readings, each 0 to 1024, as 0 to 255
+    (red, green, blue, intensity) = values
+    red = int((red / 1024) * 255)
+    green = int((green / 1024) * 255)
+    blue = int((blue / 1024) * 255)
+
+    if scale_by_intensity:
+        intensity_scale = 1024 / intensity
+        red = int(red * intensity_scale)
+        green = int(green * intensity_scale)
+        blue = int(blue * intensity_scale)
+
+    return (red, green, blue)
+
+
 class ColorSensorMode:
     """
     * ``COLOR`` single value, LED is on
@@ -313,18 +687,7 @@ class ColorSensor(Sensor):
         The LED is on.
         """
         self._ensure_mode(ColorSensorMode.RGB_I)
-        (red, green, blue, intensity) = self.value()
-        red = int((red / 1024) * 255)
-        green = int((green / 1024) * 255)
-        blue = int((blue / 1024) * 255)
-
-        if scale_by_intensity:
-            intensity_scale = 1024 / intensity
-            red = int(red * intensity_scale)
-            green = int(green * intensity_scale)
-            blue = int(blue * intensity_scale)
-
-        return (red, green, blue)
+        return _rgb_from_rgbi(self.value(), scale_by_intensity)
 
     def lab(self, scale_by_intensity=True):
         """
@@ -336,6 +699,178 @@ class ColorSensor(Sensor):
         return rgb2lab(red, green, blue)
 
 
+class ColorReading:
+    """
+    The readings a :class:`ColorSampler` can take
+
+    * ``COLOR`` as :meth:`ColorSensor.color`
+    * ``REFLECTED`` as :meth:`ColorSensor.reflected_light_intensity`
+    * ``AMBIENT`` as :meth:`ColorSensor.ambient_light_intensity`, the only one that needs the LED off
+    * ``RGB`` as :meth:`ColorSensor.rgb`
+    * ``HSV`` as :meth:`ColorSensor.hsv`
+    * ``LAB`` as :meth:`ColorSensor.lab`
+    """
+
+    COLOR = 0
+    REFLECTED = 1
+    AMBIENT = 2
+    RGB = 3
+    HSV = 4
+    LAB = 5
+
+
+# The mode that reads each ColorReading directly...
+_NATIVE_MODES = {
+    ColorReading.COLOR: ColorSensorMode.COLOR,
+    ColorReading.REFLECTED: ColorSensorMode.REFLT,
+    ColorReading.AMBIENT: ColorSensorMode.AMBI,
+    ColorReading.RGB: ColorSensorMode.RGB_I,
+    ColorReading.HSV: ColorSensorMode.HSV,
+    ColorReading.LAB: ColorSensorMode.RGB_I,
+}
+
+# ...and the mode to derive it from on the host
+_DERIVED_MODES = {
+    ColorReading.COLOR: ColorSensorMode.RGB_I,
+    ColorReading.REFLECTED: ColorSensorMode.RGB_I,
+    ColorReading.AMBIENT: ColorSensorMode.AMBI,
+    ColorReading.RGB: ColorSensorMode.RGB_I,
+    ColorReading.HSV: ColorSensorMode.RGB_I,
+    ColorReading.LAB: ColorSensorMode.RGB_I,
+}
+
+
+class ColorSampler:
+    """
+    Take the set of :class:`ColorReading` a loop needs from a :class:`ColorSensor` with as few
+    mode switches as possible.
+
+    Calling ``reflected_light_intensity()``, ``rgb()`` and ``color()`` in turn switches the
+    sensor's mode three times every tick, and each switch costs the real sensor tens of
+    milliseconds before its readings settle. The sampler works out up front which modes the
+    readings need and reads each of those once per :meth:`sample`:
+
+    * with ``derive=True``, the default, everything but ``AMBIENT`` is worked out on the host
+      from ``RGB_I``. ``REFLECTED`` is the ``RGB_I`` intensity as a percentage and ``COLOR``
+      comes from :func:`rgb2color`, both approximate what the sensor's own modes report.
+    * with ``derive=False`` each reading comes from its own mode. The modes are read in the
+      reverse order every other tick, so each tick starts in the mode the last one ended in
+      and saves a switch.
+
+    If every reading comes from one mode the sensor is switched once and stays there. The
+    sensor's :attr:`Sensor.mode_switches` and :attr:`Sensor.mode_switch_us` count the cost.
+
+    Args:
+        sensor (ColorSensor): the sensor
+        readings (list): the :class:`ColorReading` wanted
+        derive (bool): derive readings from ``RGB_I`` on the host where possible
+        scale_by_intensity (bool): as for :meth:`ColorSensor.rgb`
+
+    Example:
+
+    .. code:: python
+
+        import hub
+        from spikedev.sensor import ColorReading, ColorSampler, ColorSensor
+
+        sampler = ColorSampler(ColorSensor(hub.port.B), (ColorReading.REFLECTED, ColorReading.RGB, ColorReading.COLOR))
+
+        while True:
+            sampler.sample()
+            print(sampler.reflected, sampler.rgb, sampler.color)
+    """
+
+    def __init__(self, sensor, readings, derive=True, scale_by_intensity=True):
+        self.sensor = sensor
+        self.readings = tuple(readings)
+        self.derive = derive
+        self.scale_by_intensity = scale_by_intensity
+        sources = _DERIVED_MODES if derive else _NATIVE_MODES
+        self._sources = {}
+
+        for reading in self.readings:
+            if reading not in sources:
+                raise ValueError("{}: reading {} is invalid".format(sensor, reading))
+
+            self._sources[reading] = sources[reading]
+
+        # each mode once, in the order the readings first need them
+        self.modes = []
+
+        for reading in self.readings:
+            if self._sources[reading] not in self.modes:
+                self.modes.append(self._sources[reading])
+
+        self._reversed = list(reversed(self.modes))
+        self._forward = True
+        self._values = {}
+        self.samples = 0
+
+        self.color = None
+        self.reflected = None
+        self.ambient = None
+        self.rgb = None
+        self.hsv = None
+        self.lab = None
+
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, self.sensor)
+
+    def sample(self):
+        """
+        Read every mode the readings need, once, and update the readings
+        """
+        sensor = self.sensor
+
+        for mode in self.modes if self._forward else self._reversed:
+            sensor._ensure_mode(mode)
+            self._values[mode] = sensor.value()
+
+        if len(self.modes) > 1:
+            self._forward = not self._forward
+
+        for reading in self.readings:
+            self._update(reading, self._sources[reading])
+
+        self.samples += 1
+
+    def _update(self, reading, mode):
+        values = self._values[mode]
+
+        if reading == ColorReading.AMBIENT:
+            self.ambient = values[0]
+
+        elif reading == ColorReading.REFLECTED:
+            self.reflected = values[0] if mode == ColorSensorMode.REFLT else values[3] * 100 // 1024
+
+        elif reading == ColorReading.COLOR:
+            if mode == ColorSensorMode.COLOR:
+                self.color = values[0]
+            else:
+                self.color = rgb2color(*_rgb_from_rgbi(values, False))
+
+        elif reading == ColorReading.HSV and mode == ColorSensorMode.HSV:
+            (hue, saturation, value) = values
+            self.hsv = (int((hue / 1024) * 255), int((saturation / 1024) * 255), int((value / 1024) * 255))
+
+        else:
+            # RGB, LAB or HSV derived from RGB_I
+            self.rgb = _rgb_from_rgbi(values, self.scale_by_intensity)
+
+            if reading == ColorReading.LAB:
+                self.lab = rgb2lab(*self.rgb)
+            elif reading == ColorReading.HSV:
+                self.hsv = rgb2hsv(*self.rgb)
+
+    @property
+    def switches_per_sample(self):
+        """
+        Returns:
+            float: the sensor's mode switches per :meth:`sample`, including any made outside the sampler
+        """
+        return self.sensor.mode_switches / self.samples if self.samples else 0
+
+
 class DistanceSensorMode:
     """
     * ``DISTL`` returns a number from 4 to 49
@@ -25,25 +25,11 @@
 
 # standard libraries
 import math
-import utime
 
 # spikedev libraries
+from spikedev.completion import Completion
 from spikedev.logging import log_msg
-from spikedev.motor import _callback  # noqa: F401
-from spikedev.motor import _portletter2motor  # noqa: F401
-from spikedev.motor import (
-    MotorPolarity,
-    MotorSpeed,
-    MotorSpeedPercent,
-    MotorStop,
-    SpikeMediumMotor,
-    _callback_A,
-    _callback_B,
-    _callback_C,
-    _callback_D,
-    _callback_E,
-    _callback_F,
-)
+from spikedev.motor import _REASON_FLAGS, MotorPolarity, MotorStop, SpikeMediumMotor, motor_callbacks
 from spikedev.unit import distance_in_mm
 
 
@@ -91,26 +77,14 @@ class MoveTank:
         self.stalled = False
         self.pair = self.left_motor.port.motor.pair(self.right_motor.port.motor)
         self.desc = None
-        self.rxed_callback = True
+        self.completion = Completion()
+        self.completion.set()
+        self._stale = False
 
         # callback setup
-        if self.left_motor.port_letter == "A":
-            self.pair.callback(_callback_A)
-        elif self.left_motor.port_letter == "B":
-            self.pair.callback(_callback_B)
-        elif self.left_motor.port_letter == "C":
-            self.pair.callback(_callback_C)
-        elif self.left_motor.port_letter == "D":
-            self.pair.callback(_callback_D)
-        elif self.left_motor.port_letter == "E":
-            self.pair.callback(_callback_E)
-        elif self.left_motor.port_letter == "F":
-            self.pair.callback(_callback_F)
-        else:
-            raise ValueError("invalid port {}".format(self.port_letter))
-
-        global _portletter2motor
-        _portletter2motor[self.left_motor.port_letter] = self
+        self.callbacks = motor_callbacks(self.left_motor.port_letter + self.right_motor.port_letter)
+        self.callbacks.owner = self._callback
+        self.pair.callback(self.callbacks.callback)
 
     def __str__(self):
         if self.desc is not None:
@@ -118,19 +92,64 @@ class MoveTank:
         else:
             return self.__class__.__name__
 
+    @property
+    def rxed_callback(self):
+        """
+        Returns:
+            bool: True if the last command has completed, been interrupted or stalled
+        """
+        return self.completion.done
+
+    @rxed_callback.setter
+    def rxed_callback(self, value):
+        if value:
+            self.completion.set()
+        else:
+            self.completion.clear()
+
+    def _callback(self, reason):
+        # called from the firmware callback, must not allocate
+        if self._stale:
+            self._stale = False
+            return
+
+        (self.interrupted, self.stalled) = _REASON_FLAGS[reason]
+        self.completion.set(reason)
+
+    def _begin(self, expected_ms=None):
+        """
+        Clear :attr:`completion` before starting a move, see :meth:`spikedev.motor.Motor._begin`
+        """
+        self._stale = not self.completion.done
+        self.completion.clear(expected_ms)
+
     def _wait(self):
-        # This is ugly but SPIKE does not have the _thread module :(
-        while not self.rxed_callback:
-            utime.sleep(0.01)
+        self.completion.wait()
+        self._finish_move()
 
-    def _speed_percentage(self, speed):
+    async def _wait_async(self):
+        await self.completion.wait_async()
+        self._finish_move()
 
-        if isinstance(speed, MotorSpeed):
-            return speed.to_native_units(self.left_motor)
+    def _finish_move(self):
+        # shared by blocking moves and the *_async methods
+        if self.interrupted:
+            log_msg("{}: INTERRUPTED".format(self))
+        elif self.stalled:
+            log_msg("{}: STALL".format(self))
 
-        # If speed is not a MotorSpeed object we treat it as a percentage
-        else:
-            return MotorSpeedPercent(speed).to_native_units(self.left_motor)
+    def subscribe(self, func):
+        """
+        Call ``func(reason)`` each time a move of the pair completes, is interrupted or
+        stalls, see :meth:`spikedev.motor.Motor.subscribe`
+        """
+        self.callbacks.subscribe(func)
+
+    def unsubscribe(self, func):
+        self.callbacks.unsubscribe(func)
+
+    def _speed_percentage(self, speed):
+        return self.left_motor._speed_percentage(speed)
 
     def _speed_with_polarity(self, left_speed, right_speed):
         if self.left_motor.polarity == MotorPolarity.NORMAL:
@@ -186,7 +205,8 @@ class MoveTank:
         )
         left_speed = self._speed_percentage(left_speed)
         right_speed = self._speed_percentage(right_speed)
-        self.rxed_callback = False
+        # the two motors combined move an average of degrees at their average speed
+        self._begin(self.left_motor._expected_ms(degrees, (abs(left_speed) + abs(right_speed)) / 2))
         (left_speed, right_speed) = self._speed_with_polarity(left_speed, right_speed)
         self.pair.run_for_degrees(degrees, left_speed, right_speed, stop=stop, **kwargs)
 
@@ -211,7 +231,7 @@ class MoveTank:
             )
         )
         speed = self._speed_percentage(speed)
-        self.rxed_callback = False
+        self._begin()
         self.pair.run_to_position(left_position, right_position, speed, stop=stop, **kwargs)
 
         if block:
@@ -247,12 +267,51 @@ class MoveTank:
         left_speed = self._speed_percentage(left_speed)
         right_speed = self._speed_percentage(right_speed)
         (left_speed, right_speed) = self._speed_with_polarity(left_speed, right_speed)
-        self.rxed_callback = False
+        self._begin(msec)
         self.pair.run_for_time(msec, left_speed, right_speed, stop=stop, **kwargs)
 
         if block:
             self._wait()
 
+    async def run_for_degrees_async(self, degrees, left_speed, right_speed, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`run_for_degrees`, other ``uasyncio`` tasks run while the motors move
+
+        Example:
+
+        .. code:: python
+
+            import hub
+            import uasyncio
+            from spikedev.motor import SpikeMediumMotor
+            from spikedev.tank import MoveTank
+
+            tank = MoveTank(hub.port.E, hub.port.F)
+            arm = SpikeMediumMotor(hub.port.C)
+
+            async def main():
+                # drive and raise the arm at the same time
+                await uasyncio.gather(tank.run_for_degrees_async(720, 50, 50), arm.run_for_degrees_async(90, 30))
+
+            uasyncio.run(main())
+        """
+        MoveTank.run_for_degrees(self, degrees, left_speed, right_speed, stop=stop, block=False, **kwargs)
+        await self._wait_async()
+
+    async def run_to_position_async(self, left_position, right_position, speed, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`run_to_position`
+        """
+        MoveTank.run_to_position(self, left_position, right_position, speed, stop=stop, block=False, **kwargs)
+        await self._wait_async()
+
+    async def run_for_time_async(self, msec, left_speed, right_speed, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`run_for_time`
+        """
+        MoveTank.run_for_time(self, msec, left_speed, right_speed, stop=stop, block=False, **kwargs)
+        await self._wait_async()
+
 
 class MoveSteering(MoveTank):
     """
@@ -357,6 +416,20 @@ class MoveSteering(MoveTank):
         (left_speed, right_speed) = self._get_speed_steering(steering, speed)
         MoveTank.run_for_time(self, msec, left_speed, right_speed, stop=stop, block=block, **kwargs)
 
+    async def run_for_degrees_async(self, steering, speed, degrees, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`run_for_degrees`
+        """
+        self.run_for_degrees(steering, speed, degrees, stop=stop, block=False, **kwargs)
+        await self._wait_async()
+
+    async def run_for_time_async(self, msec, steering, speed, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`run_for_time`
+        """
+        self.run_for_time(msec, steering, speed, stop=stop, block=False, **kwargs)
+        await self._wait_async()
+
 
 class MoveDifferential(MoveTank):
     """
@@ -432,6 +505,9 @@ class MoveDifferential(MoveTank):
 
         self.min_circle_radius_mm = self.wheel_distance_mm / 2
 
+        # created by the first follow_path(), see there
+        self.odometry = None
+
     def run_for_distance(self, distance, speed, stop=MotorStop.BRAKE, block=True, **kwargs):
         """
         Drive in a straight line for ``distance``
@@ -550,13 +626,16 @@ class MoveDifferential(MoveTank):
         rotations = distance_mm / self.wheel.circumference_mm
         degrees = int(rotations * 360)
 
+        # negate the speed percentage rather than allocate a negated MotorSpeed
+        speed = self._speed_percentage(speed)
+
         # If degrees is positive rotate clockwise
         if degrees > 0:
-            MoveTank.run_for_degrees(self, degrees, speed, speed * -1, stop=stop, block=block, **kwargs)
+            MoveTank.run_for_degrees(self, degrees, speed, -speed, stop=stop, block=block, **kwargs)
 
         # If degrees is negative rotate counter-clockwise
         else:
-            MoveTank.run_for_degrees(self, degrees, speed * -1, speed, stop=stop, block=block, **kwargs)
+            MoveTank.run_for_degrees(self, degrees, -speed, speed, stop=stop, block=block, **kwargs)
 
     def turn_right(self, degrees, speed, stop=MotorStop.BRAKE, block=True, **kwargs):
         """
@@ -583,3 +662,81 @@ class MoveDifferential(MoveTank):
             **kwargs: optional kwargs that will pass all the way down to the LEGO ``hub.port.X.motor`` API call
         """
         self.turn_degrees(abs(degrees) * -1, speed, stop, block, **kwargs)
+
+    def follow_path(self, waypoints, speed, **kwargs):
+        """
+        Drive through ``waypoints`` without stopping at any of them, see :class:`spikedev.pursuit.PathFollower`
+
+        Unless you pass an ``odometry`` every call shares :attr:`odometry`, created by the first
+        one with the robot at (0, 0) facing along +x, so a series of :meth:`drive_to` calls
+        are all relative to the same origin. It is only updated while following a path, moves
+        made in between by other methods are folded in, approximately, when the next path starts.
+
+        Args:
+            waypoints (list): (x, y) tuples in millimetres, relative to ``odometry``
+            speed (MotorSpeed): the fastest either wheel may turn
+            **kwargs: passed to :class:`spikedev.pursuit.PathFollower`, e.g. ``odometry``, ``lookahead``
+                or ``timeout_ms``
+
+        Returns:
+            PathFollower: call ``odometry.pose()`` on this for where the robot ended up
+        """
+        # spikedev libraries
+        from spikedev.odometry import Odometry
+        from spikedev.pursuit import PathFollower
+
+        if "odometry" not in kwargs:
+            if self.odometry is None:
+                self.odometry = Odometry(self)
+
+            kwargs["odometry"] = self.odometry
+
+        follower = PathFollower(self, **kwargs)
+        follower.follow_path(waypoints, speed)
+        return follower
+
+    def drive_to(self, x, y, speed, **kwargs):
+        """
+        Drive to (``x``, ``y``) millimetres, :meth:`follow_path` with a single waypoint
+        """
+        return self.follow_path([(x, y)], speed, **kwargs)
+
+    async def run_for_distance_async(self, distance, speed, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`run_for_distance`
+        """
+        self.run_for_distance(distance, speed, stop=stop, block=False, **kwargs)
+        await self._wait_async()
+
+    async def run_arc_right_async(self, radius, distance, speed, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`run_arc_right`
+        """
+        self.run_arc_right(radius, distance, speed, stop=stop, block=False, **kwargs)
+        await self._wait_async()
+
+    async def run_arc_left_async(self, radius, distance, speed, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`run_arc_left`
+        """
+        self.run_arc_left(radius, distance, speed, stop=stop, block=False, **kwargs)
+        await self._wait_async()
+
+    async def turn_degrees_async(self, degrees, speed, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`turn_degrees`
+        """
+        self.turn_degrees(degrees, speed, stop=stop, block=False, **kwargs)
+        await self._wait_async()
+
+    async def turn_right_async(self, degrees, speed, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`turn_right`
+        """
+        await self.turn_degrees_async(abs(degrees), speed, stop=stop, **kwargs)
+
+    async def turn_left_async(self, degrees, speed, stop=MotorStop.BRAKE, **kwargs):
+        """
+        Awaitable :meth:`turn_left`
+        """
+        await self.turn_degrees_async(abs(degrees) * -1, speed, stop=stop, **kwargs)
@@ -31,6 +31,9 @@ FOOT_MM = 304.8
 YARD_MM = 914.4
 STUD_MM = 8
 
+# Distance(n) for a whole n returns one shared object per class and n, created on first use
+_distance_interned = {}
+
 
 class DistanceValue:
     """
@@ -44,15 +47,83 @@ class DistanceValue:
     * :class:`DistanceFeet`
     * :class:`DistanceYards`
     * :class:`DistanceStuds`.
+
+    Distances are immutable and have no instance ``__dict__``. Each one stores a single
+    number, its distance in millimeters, the unit everything else works in. A whole number
+    of units between -100 and 100 returns one shared object per class and value, created on
+    first use, so ``DistanceStuds(11)`` in a loop does not allocate. Each class takes its value
+    by its own name as well, e.g. ``DistanceInches(inches=6)``.
     """
 
+    __slots__ = ("_mm",)
+
+    # set by each distance class, MM is how many millimeters one unit is
+    MM = None
+    UNIT = None
+
+    def __new__(cls, value):
+        if isinstance(value, int) and -100 <= value <= 100:
+            interned = _distance_interned.get(cls)
+
+            if interned is None:
+                interned = [None] * 201
+                _distance_interned[cls] = interned
+
+            distance = interned[value + 100]
+
+            if distance is None:
+                distance = object.__new__(cls)
+                distance._mm = value * cls.MM
+                interned[value + 100] = distance
+
+            return distance
+
+        distance = object.__new__(cls)
+        distance._mm = value * cls.MM
+        return distance
+
+    def __str__(self):
+        return "{:g}".format(self._unit_value()) + self.UNIT
+
+    def _unit_value(self):
+        # rounded so that DistanceInches(6).inches is 6 and not 5.999999999999999
+        return round(self._mm / self.MM, 6)
+
+    def __eq__(self, other):
+        return isinstance(other, DistanceValue) and self._mm == other._mm
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._mm)
+
     # This allows us to sort lists of DistanceValue objects
     def __lt__(self, other):
-        return self.mm < other.mm
+        return self._mm < other._mm
+
+    def __mul__(self, other):
+        if not isinstance(other, (float, int)):
+            raise TypeError("{} can only be multiplied by an int or float".format(self))
+
+        if other == 1:
+            return self
+
+        distance = object.__new__(self.__class__)
+        distance._mm = self._mm * other
+        return distance
 
     def __rmul__(self, other):
         return self.__mul__(other)
 
+    @property
+    def mm(self):
+        """
+        Returns:
+            int: our distance in millimeters
+        """
+        return self._mm
+
 
 class DistanceMillimeters(DistanceValue):
     """
@@ -76,24 +147,20 @@ class DistanceMillimeters(DistanceValue):
         md.run_for_distance(DistanceMillimeters(600), MotorSpeedDPS(100))
     """
 
-    def __init__(self, millimeters):
-        self.millimeters = millimeters
+    __slots__ = ()
+    MM = 1
+    UNIT = "mm"
 
-    def __str__(self):
-        return str(self.millimeters) + "mm"
+    def __new__(cls, millimeters):
+        return DistanceValue.__new__(cls, millimeters)
 
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return DistanceMillimeters(self.millimeters * other)
+    def __init__(self, millimeters):
+        # __new__ did all of the work
+        pass
 
     @property
-    def mm(self):
-        """
-        Returns:
-            int: our distance in millimeters
-        """
-        return self.millimeters
+    def millimeters(self):
+        return self._mm
 
 
 class DistanceCentimeters(DistanceValue):
@@ -118,24 +185,20 @@ class DistanceCentimeters(DistanceValue):
         md.run_for_distance(DistanceCentimeters(60), MotorSpeedDPS(100))
     """
 
-    def __init__(self, centimeters):
-        self.centimeters = centimeters
+    __slots__ = ()
+    MM = CENTIMETER_MM
+    UNIT = "cm"
 
-    def __str__(self):
-        return str(self.centimeters) + "cm"
+    def __new__(cls, centimeters):
+        return DistanceValue.__new__(cls, centimeters)
 
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return DistanceCentimeters(self.centimeters * other)
+    def __init__(self, centimeters):
+        # __new__ did all of the work
+        pass
 
     @property
-    def mm(self):
-        """
-        Returns:
-            int: our distance in millimeters
-        """
-        return self.centimeters * CENTIMETER_MM
+    def centimeters(self):
+        return self._unit_value()
 
 
 class DistanceDecimeters(DistanceValue):
@@ -160,24 +223,20 @@ class DistanceDecimeters(DistanceValue):
         md.run_for_distance(DistanceDecimeters(6), MotorSpeedDPS(100))
     """
 
-    def __init__(self, decimeters):
-        self.decimeters = decimeters
+    __slots__ = ()
+    MM = DECIMETER_MM
+    UNIT = "dm"
 
-    def __str__(self):
-        return str(self.decimeters) + "dm"
+    def __new__(cls, decimeters):
+        return DistanceValue.__new__(cls, decimeters)
 
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return DistanceDecimeters(self.decimeters * other)
+    def __init__(self, decimeters):
+        # __new__ did all of the work
+        pass
 
     @property
-    def mm(self):
-        """
-        Returns:
-            int: our distance in millimeters
-        """
-        return self.decimeters * DECIMETER_MM
+    def decimeters(self):
+        return self._unit_value()
 
 
 class DistanceMeters(DistanceValue):
@@ -202,24 +261,20 @@ class DistanceMeters(DistanceValue):
         md.run_for_distance(DistanceMeters(2), MotorSpeedDPS(100))
     """
 
-    def __init__(self, meters):
-        self.meters = meters
+    __slots__ = ()
+    MM = METER_MM
+    UNIT = "m"
 
-    def __str__(self):
-        return str(self.meters) + "m"
+    def __new__(cls, meters):
+        return DistanceValue.__new__(cls, meters)
 
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return DistanceMeters(self.meters * other)
+    def __init__(self, meters):
+        # __new__ did all of the work
+        pass
 
     @property
-    def mm(self):
-        """
-        Returns:
-            int: our distance in millimeters
-        """
-        return self.meters * METER_MM
+    def meters(self):
+        return self._unit_value()
 
 
 class DistanceInches(DistanceValue):
@@ -244,24 +299,20 @@ class DistanceInches(DistanceValue):
         md.run_for_distance(DistanceInches(6), MotorSpeedDPS(100))
     """
 
-    def __init__(self, inches):
-        self.inches = inches
+    __slots__ = ()
+    MM = INCH_MM
+    UNIT = "in"
 
-    def __str__(self):
-        return str(self.inches) + "in"
+    def __new__(cls, inches):
+        return DistanceValue.__new__(cls, inches)
 
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return DistanceInches(self.inches * other)
+    def __init__(self, inches):
+        # __new__ did all of the work
+        pass
 
     @property
-    def mm(self):
-        """
-        Returns:
-            int: our distance in millimeters
-        """
-        return self.inches * INCH_MM
+    def inches(self):
+        return self._unit_value()
 
 
 class DistanceFeet(DistanceValue):
@@ -286,24 +337,20 @@ class DistanceFeet(DistanceValue):
         md.run_for_distance(DistanceFeet(3), MotorSpeedDPS(100))
     """
 
-    def __init__(self, feet):
-        self.feet = feet
+    __slots__ = ()
+    MM = FOOT_MM
+    UNIT = "ft"
 
-    def __str__(self):
-        return str(self.feet) + "ft"
+    def __new__(cls, feet):
+        return DistanceValue.__new__(cls, feet)
 
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return DistanceFeet(self.feet * other)
+    def __init__(self, feet):
+        # __new__ did all of the work
+        pass
 
     @property
-    def mm(self):
-        """
-        Returns:
-            int: our distance in millimeters
-        """
-        return self.feet * FOOT_MM
+    def feet(self):
+        return self._unit_value()
 
 
 class DistanceYards(DistanceValue):
@@ -328,24 +375,20 @@ class DistanceYards(DistanceValue):
         md.run_for_distance(DistanceYards(2), MotorSpeedDPS(100))
     """
 
-    def __init__(self, yards):
-        self.yards = yards
+    __slots__ = ()
+    MM = YARD_MM
+    UNIT = "yd"
 
-    def __str__(self):
-        return str(self.yards) + "yd"
+    def __new__(cls, yards):
+        return DistanceValue.__new__(cls, yards)
 
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return DistanceYards(self.yards * other)
+    def __init__(self, yards):
+        # __new__ did all of the work
+        pass
 
     @property
-    def mm(self):
-        """
-        Returns:
-            int: our distance in millimeters
-        """
-        return self.yards * YARD_MM
+    def yards(self):
+        return self._unit_value()
 
 
 class DistanceStuds(DistanceValue):
@@ -370,24 +413,20 @@ class DistanceStuds(DistanceValue):
         md.run_for_distance(DistanceStuds(6), MotorSpeedDPS(100))
     """
 
-    def __init__(self, studs):
-        self.studs = studs
+    __slots__ = ()
+    MM = STUD_MM
+    UNIT = "stud"
 
-    def __str__(self):
-        return str(self.studs) + "stud"
+    def __new__(cls, studs):
+        return DistanceValue.__new__(cls, studs)
 
-    def __mul__(self, other):
-        if not isinstance(other, (float, int)):
-            raise TypeError("{} can only be multiplied by an int or float".format(self))
-        return DistanceStuds(self.studs * other)
+    def __init__(self, studs):
+        # __new__ did all of the work
+        pass
 
     @property
-    def mm(self):
-        """
-        Returns:
-            int: our distance in millimeters
-        """
-        return self.studs * STUD_MM
+    def studs(self):
+        return self._unit_value()
 
 
 def distance_in_mm(distance):
@@ -0,0 +1,1724 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark spikedev hot paths on the host against the simulated ``hub`` in ./simulator
+"""
+
+# standard libraries
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+log = logging.getLogger(__name__)
+
+REPO_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIRECTORY)
+sys.path.insert(0, os.path.join(REPO_DIRECTORY, "simulator"))
+
+# third party libraries
+import hub  # noqa: E402
+from simclock import clock  # noqa: E402
+
+BENCHMARKS: Dict[str, Callable[[int], List[Tuple]]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    """
+    Register a benchmark under ``name``. A benchmark takes an iteration count and
+    returns a list of ``(label, operations, host_seconds)`` with an optional fourth
+    entry, a note to print alongside.
+    """
+
+    def register(func: Callable) -> Callable:
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+def timed(label: str, count: int, func: Callable[[], None]) -> Tuple[str, int, float]:
+    """
+    Call ``func`` ``count`` times with spikedev's log output discarded
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+
+        for _ in range(count):
+            func()
+
+        elapsed = time.perf_counter() - start
+
+    return (label, count, elapsed)
+
+
+@benchmark("moves")
+def bench_moves(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Blocking moves that complete in simulated time
+    """
+    # spikedev libraries
+    from spikedev.button import ButtonCenter
+    from spikedev.motor import SpikeMediumMotor
+    from spikedev.tank import MoveTank
+
+    hub.sim_reset()
+    mtr = SpikeMediumMotor(hub.port.A)
+    tank = MoveTank(hub.port.E, hub.port.F)
+    btn = ButtonCenter()
+
+    def button_wait():
+        hub.button.center.sim_bump(after_ms=20, held_ms=20)
+        btn.wait_for_pressed(1000)
+        btn.wait_for_released(1000)
+
+    return [
+        timed("Motor.run_for_degrees", count, lambda: mtr.run_for_degrees(90, 50)),
+        timed("MoveTank.run_for_degrees", count, lambda: tank.run_for_degrees(90, 50, 50)),
+        timed("Button.wait_for_bump", count, button_wait),
+    ]
+
+
+@benchmark("completion")
+def bench_completion(count: int) -> List[Tuple[str, int, float]]:
+    """
+    How late a blocking move notices its completion callback: the old fixed
+    10ms sleep-poll versus spikedev.completion.Completion
+    """
+    # standard libraries
+    import random
+    import utime
+
+    # spikedev libraries
+    from spikedev.motor import SpikeMediumMotor
+
+    hub.sim_reset()
+    mtr = SpikeMediumMotor(hub.port.A)
+    rng = random.Random(0)
+    callback_us = [0]
+    firmware_callback = hub.port.A.motor.callback()
+
+    def stamped_callback(reason):
+        callback_us[0] = clock.now_us
+        firmware_callback(reason)
+
+    hub.port.A.motor.callback(stamped_callback)
+
+    def old_wait():
+        while not mtr.rxed_callback:
+            utime.sleep(0.01)
+
+    def new_wait():
+        mtr.completion.wait()
+
+    results = []
+
+    for (label, wait) in (("10ms sleep-poll", old_wait), ("Completion.wait", new_wait)):
+        latencies = []
+        sleeps = [0]
+        real_advance = clock.advance
+
+        def counting_advance(delta_us):
+            sleeps[0] += 1
+            real_advance(delta_us)
+
+        clock.advance = counting_advance
+
+        def move():
+            degrees = rng.randint(10, 720)
+            mtr.run_for_degrees(degrees, 50, block=False)
+            wait()
+            latencies.append(clock.now_us - callback_us[0])
+
+        try:
+            (_, operations, elapsed) = timed(label, count, move)
+        finally:
+            clock.advance = real_advance
+
+        latencies.sort()
+        note = "latency avg {:.2f}ms p99 {:.2f}ms, {:.1f} sleeps/move".format(
+            sum(latencies) / len(latencies) / 1000, latencies[int(len(latencies) * 0.99)] / 1000, sleeps[0] / count
+        )
+        results.append((label, operations, elapsed, note))
+
+    return results
+
+
+@benchmark("callbacks")
+def bench_callbacks(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Motor callbacks/sec: the old per-port function, dict lookup and reason if/elif chain
+    (which formatted a log message for STALL) versus the MotorCallbacks dispatch table
+    """
+    # spikedev libraries
+    from spikedev.logging import log_msg
+    from spikedev.motor import MotorCallbackEvent, SpikeMediumMotor
+
+    hub.sim_reset()
+    mtr = SpikeMediumMotor(hub.port.A)
+    portletter2motor = {"A": mtr}
+
+    def legacy_callback(mtr, reason):
+        if reason == MotorCallbackEvent.COMPLETED:
+            mtr.interrupted = False
+            mtr.stalled = False
+        elif reason == MotorCallbackEvent.INTERRUPTED:
+            mtr.interrupted = True
+            mtr.stalled = False
+            log_msg("{}: _callback INTERRUPTED".format(mtr))
+        elif reason == MotorCallbackEvent.STALL:
+            mtr.interrupted = False
+            mtr.stalled = True
+            log_msg("{}: _callback STALL".format(mtr))
+        else:
+            raise ValueError("invalid callback reason {}".format(reason))
+
+        mtr.completion.set(reason)
+
+    def legacy_callback_A(reason):
+        legacy_callback(portletter2motor["A"], reason)
+
+    callback = hub.port.A.motor.callback()
+    stalls = [0]
+
+    def stall_monitor(reason):
+        if reason == MotorCallbackEvent.STALL:
+            stalls[0] += 1
+
+    results = [
+        timed("legacy COMPLETED", count, lambda: legacy_callback_A(MotorCallbackEvent.COMPLETED)),
+        timed("legacy STALL", count, lambda: legacy_callback_A(MotorCallbackEvent.STALL)),
+        timed("table COMPLETED", count, lambda: callback(MotorCallbackEvent.COMPLETED)),
+        timed("table STALL", count, lambda: callback(MotorCallbackEvent.STALL)),
+    ]
+    mtr.subscribe(stall_monitor)
+    results.append(timed("table STALL + stall monitor", count, lambda: callback(MotorCallbackEvent.STALL)))
+    return results
+
+
+@benchmark("conversions")
+def bench_conversions(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Motor._speed_percentage conversions/sec: the old path, which built a MotorSpeedPercent
+    for plain numbers and divided by MAX_DPS on every call, versus the cached fast path
+    """
+    # spikedev libraries
+    from spikedev.motor import MotorSpeed, MotorSpeedDPS, MotorSpeedPercent, SpikeMediumMotor
+
+    hub.sim_reset()
+    mtr = SpikeMediumMotor(hub.port.A)
+    dps = MotorSpeedDPS(180)
+
+    def legacy_speed_percentage(speed):
+        if isinstance(speed, MotorSpeed):
+            if isinstance(speed, MotorSpeedDPS):
+                if abs(speed.degrees_per_second) > mtr.MAX_DPS:
+                    raise ValueError("invalid degrees-per-second")
+                return int((speed.degrees_per_second / mtr.MAX_DPS) * 100)
+            return speed.to_native_units(mtr)
+        elif isinstance(speed, (float, int)):
+            return MotorSpeedPercent(speed).to_native_units(mtr)
+        else:
+            raise TypeError(type(speed))
+
+    return [
+        timed("legacy percent", count, lambda: legacy_speed_percentage(50)),
+        timed("legacy MotorSpeedDPS", count, lambda: legacy_speed_percentage(dps)),
+        timed("fast path percent", count, lambda: mtr._speed_percentage(50)),
+        timed("fast path MotorSpeedDPS", count, lambda: mtr._speed_percentage(dps)),
+    ]
+
+
+@benchmark("conversion-matrix")
+def bench_conversion_matrix(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Not a speed test, a correctness sweep of the speed conversion across every MotorSpeed
+    class, both motor classes and both polarities, with count random speeds per combination
+    plus the edges. Raises AssertionError if any check fails.
+
+    * in range speeds convert to the exact speed percentage truncated towards zero, give or
+      take one for float rounding, and the simulated motor is driven at that percentage in
+      the direction the polarity says
+    * out of range speeds raise ValueError
+    * a speed converted for one motor class then another gives each its own answer
+    """
+    # standard libraries
+    import math
+    import random
+    from fractions import Fraction
+
+    # spikedev libraries
+    from spikedev.motor import (
+        MotorPolarity,
+        MotorSpeedDPM,
+        MotorSpeedDPS,
+        MotorSpeedPercent,
+        MotorSpeedRPM,
+        MotorSpeedRPS,
+        SpikeLargeMotor,
+        SpikeMediumMotor,
+    )
+
+    rng = random.Random(0)
+    hub.sim_reset()
+    hub.sim_attach_motor("A", SpikeMediumMotor.MAX_DPS)
+    hub.sim_attach_motor("B", SpikeLargeMotor.MAX_DPS)
+    motors = []
+
+    for (letter, motor_class) in (("A", SpikeMediumMotor), ("B", SpikeLargeMotor)):
+        for polarity in (MotorPolarity.NORMAL, MotorPolarity.REVERSED):
+            motors.append(motor_class(getattr(hub.port, letter), polarity=polarity))
+
+    speed_classes = (MotorSpeedPercent, MotorSpeedRPS, MotorSpeedRPM, MotorSpeedDPS, MotorSpeedDPM)
+    failures = []
+    # checks, in range conversions, exact conversions
+    checks = [0, 0, 0]
+
+    def check(ok, msg):
+        checks[0] += 1
+
+        if not ok and len(failures) < 10:
+            failures.append(msg)
+
+    def exact_percent(speed_class, value, motor):
+        # the ideal answer, in exact arithmetic
+        if speed_class is MotorSpeedPercent:
+            return Fraction(value)
+        return Fraction(value) * Fraction(speed_class.DPS).limit_denominator() * 100 / Fraction(motor.MAX_DPS)
+
+    def sweep():
+        for speed_class in speed_classes:
+            for mtr in motors:
+                if speed_class is MotorSpeedPercent:
+                    limit = 100
+                else:
+                    limit = mtr.MAX_DPS / speed_class.DPS
+
+                values = [0, limit, -limit, limit * 1.01, -limit * 1.01]
+                values += [rng.uniform(-limit * 1.2, limit * 1.2) for _ in range(count)]
+
+                for value in values:
+                    ideal = exact_percent(speed_class, value, mtr)
+
+                    # too close to the limit to say which side float rounding lands on
+                    if abs(abs(ideal) - 100) < Fraction(1, 10 ** 6):
+                        continue
+
+                    if abs(ideal) > 100:
+                        try:
+                            speed_class(value).to_native_units(mtr)
+                            check(False, f"{speed_class.__name__}({value}) on {mtr} did not raise ValueError")
+                        except ValueError:
+                            check(True, "")
+                        continue
+
+                    speed = speed_class(value)
+                    native = speed.to_native_units(mtr)
+                    expected = math.trunc(ideal)
+                    check(abs(native - expected) <= 1, f"{speed} on {mtr}: got {native}, expected {expected}")
+                    checks[1] += 1
+                    checks[2] += native == expected
+
+                    # the simulated motor must run at that percentage, in the direction of the polarity
+                    direction = -1 if mtr.polarity == MotorPolarity.REVERSED else 1
+
+                    for run in (mtr.run_for_time, mtr.run_for_degrees):
+                        run(100, speed, block=False)
+                        dps = mtr.port.motor._dps
+                        want = direction * native * mtr.port.motor.max_dps / 100
+                        check(abs(dps - want) < 1e-6, f"{run.__name__} {speed} on {mtr}: {dps} dps, wanted {want}")
+
+                    mtr.stop()
+
+                    # the per-object cache must not leak between motor classes
+                    for other in motors:
+                        if other.__class__ is mtr.__class__ or abs(exact_percent(speed_class, value, other)) > 100:
+                            continue
+
+                        speed.to_native_units(other)
+                        check(speed.to_native_units(mtr) == native, f"{speed}: cached value leaked from {other}")
+
+    result = timed("speed conversion matrix", 1, sweep)
+
+    if failures:
+        raise AssertionError("\n".join(failures))
+
+    return [(result[0], checks[0], result[2], f"all passed, {checks[2]} of {checks[1]} conversions exact")]
+
+
+@benchmark("units")
+def bench_units(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Memory per MotorSpeed/Distance object and garbage collections while building count of
+    them, the old dict-based classes versus the __slots__ value types. The old classes are
+    re-created here since they are gone from spikedev.
+    """
+    # standard libraries
+    import gc
+    import tracemalloc
+
+    # third party libraries
+    import hub
+
+    # spikedev libraries
+    from spikedev.motor import MotorSpeedDPS, MotorSpeedPercent, SpikeMediumMotor
+    from spikedev.unit import DistanceInches
+
+    class LegacyMotorSpeedDPS:
+        def __init__(self, degrees_per_second):
+            self.degrees_per_second = degrees_per_second
+
+    class LegacyDistanceInches:
+        def __init__(self, inches):
+            self.inches = inches
+
+    class LegacyMotorSpeedPercent:
+        def __init__(self, percent):
+            self.percent = int(percent)
+
+    collections = [0]
+
+    def count_collections(phase, info):
+        if phase == "start":
+            collections[0] += 1
+
+    def measure(label, build):
+        gc.collect()
+        collections[0] = 0
+        gc.callbacks.append(count_collections)
+        tracemalloc.start()
+        start = time.perf_counter()
+        objects = [build(i) for i in range(count)]
+        elapsed = time.perf_counter() - start
+        (current, _) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        gc.callbacks.remove(count_collections)
+
+        # subtract the list holding them
+        per_object = (current - sys.getsizeof(objects)) / count
+        note = f"{per_object:.0f} bytes/object, {collections[0]} collections"
+        return (label, count, elapsed, note)
+
+    # looking up a shared speed again must not throw away its conversion cache
+    mtr = SpikeMediumMotor(hub.port.E)
+    speed = MotorSpeedPercent(40)
+    speed.to_native_units(mtr)
+
+    if MotorSpeedPercent(40) is not speed or speed._native_class is not mtr.__class__:
+        raise AssertionError("MotorSpeedPercent(40) lost its conversion cache when it was looked up again")
+
+    return [
+        measure("legacy MotorSpeedDPS", lambda i: LegacyMotorSpeedDPS(i % 810)),
+        measure("MotorSpeedDPS", lambda i: MotorSpeedDPS(i % 810)),
+        measure("legacy DistanceInches", lambda i: LegacyDistanceInches(i % 100 + 0.5)),
+        measure("DistanceInches", lambda i: DistanceInches(i % 100 + 0.5)),
+        measure("DistanceInches (interned)", lambda i: DistanceInches(i % 100)),
+        measure("legacy MotorSpeedPercent", lambda i: LegacyMotorSpeedPercent(i % 100)),
+        measure("MotorSpeedPercent (interned)", lambda i: MotorSpeedPercent(i % 100)),
+    ]
+
+
+@benchmark("motor-state")
+def bench_motor_state(count: int) -> List[Tuple[str, int, float]]:
+    """
+    A control loop tick that reads position three times and is_running once, straight
+    from the firmware versus position from the Motor.start_sampling() cache
+    """
+    # spikedev libraries
+    from spikedev.motor import SpikeMediumMotor
+
+    hub.sim_reset()
+    mtr = SpikeMediumMotor(hub.port.A)
+    mtr.run_at_speed(50)
+    firmware = hub.port.A.motor
+    calls = [0]
+    (real_get, real_busy) = (firmware.get, firmware.busy)
+
+    def counting_get(*args):
+        calls[0] += 1
+        return real_get(*args)
+
+    def counting_busy(*args):
+        calls[0] += 1
+        return real_busy(*args)
+
+    (firmware.get, firmware.busy) = (counting_get, counting_busy)
+
+    def tick():
+        mtr.position
+        mtr.position
+        mtr.position
+        mtr.is_running
+
+    def sampled_tick():
+        mtr.sample()
+        tick()
+
+    results = []
+
+    for (label, func) in (("uncached tick", tick), ("sampled tick", sampled_tick)):
+        if func is sampled_tick:
+            mtr.start_sampling()
+
+        calls[0] = 0
+        (_, operations, elapsed) = timed(label, count, func)
+        results.append((label, operations, elapsed, f"{calls[0] / count:.1f} firmware calls/tick"))
+
+    # a move that finishes while the sample is stale must not still look like it is running
+    (firmware.get, firmware.busy) = (real_get, real_busy)
+    mtr.start_sampling(max_age_ms=1000)
+    mtr.run_for_degrees(90, 50, block=False)
+    mtr.sample()
+    clock.advance(500000)
+
+    if mtr.is_running != bool(firmware.busy(1)):
+        raise AssertionError(f"is_running {mtr.is_running} disagrees with the firmware after the move finished")
+
+    return results
+
+
+@benchmark("scheduler")
+def bench_scheduler(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Line following, obstacle detection, a slow planner and an arm going up and down,
+    all at once on one Scheduler. Runs for count/10 simulated seconds.
+    """
+    # standard libraries
+    import utime
+
+    # spikedev libraries
+    from spikedev.button import ButtonLeft
+    from spikedev.motor import MotorCallbackEvent, SpikeMediumMotor
+    from spikedev.scheduler import Scheduler
+
+    hub.sim_reset()
+    sched = Scheduler()
+    arm = SpikeMediumMotor(hub.port.C)
+    btn = ButtonLeft()
+    seconds = max(1, count // 10)
+    arm_moves = [0]
+
+    def arm_done(motor, reason):
+        arm_moves[0] += 1
+        arm.run_for_degrees(90, 50 if arm_moves[0] % 2 else -50, block=False)
+
+    tasks = [
+        sched.every(10, lambda: hub.port.B.device.get(), name="line follower"),
+        sched.every(50, lambda: hub.port.D.device.get(), name="obstacle"),
+        sched.every(100, lambda: utime.sleep_ms(15), name="planner (15ms)"),
+    ]
+    # the port's callback dispatch outlives sim_reset(), other benchmarks may have subscribed to it
+    subscribed = len(arm.callbacks.subscribers)
+    sched.on_motor(arm, arm_done, MotorCallbackEvent.COMPLETED)
+    sched.on_button(btn, lambda button, held_ms: sched.stop())
+
+    # the scheduler must not take the button from anyone else listening to it
+    presses = []
+    btn.subscribe(lambda button, held_ms: presses.append(held_ms))
+
+    # the left button ends the run
+    hub.button.left.sim_bump(after_ms=seconds * 1000)
+    arm.run_for_degrees(90, 50, block=False)
+    (label, operations, elapsed) = timed(f"Scheduler.run ({seconds}s)", 1, sched.run)
+    results = [(label, operations, elapsed, f"{arm_moves[0]} arm moves, {sched.dropped} events dropped")]
+    assert presses == [0], f"the other button subscriber saw {presses}"
+
+    for task in tasks:
+        note = f"{task.overruns} overruns, jitter avg {task.jitter_avg_ms:.1f}ms max {task.jitter_max_ms}ms"
+        results.append((f"  {task.name}", task.runs, elapsed, note))
+
+    sched.off_motor(arm)
+    sched.off_button(btn)
+    assert len(arm.callbacks.subscribers) == subscribed and len(btn.subscribers) == 1, "off_* left a subscriber"
+
+    # a task that takes exactly its period is never late, so it never overruns
+    hub.sim_reset()
+    sched = Scheduler()
+    task = sched.every(10, lambda: utime.sleep_ms(10), name="exactly one period")
+    (label, operations, elapsed) = timed("  exactly one period", 1, lambda: sched.run(duration_ms=1000))
+    assert not task.overruns, f"{task.overruns} overruns of a task that was never late"
+    results.append((label, task.runs, elapsed, f"{task.overruns} overruns"))
+
+    # a fired timer and a task cancelled by another task leave the pass alone and stay in the stats
+    hub.sim_reset()
+    sched = Scheduler()
+    victim = sched.every(20, lambda: None, name="victim")
+    timer = sched.after(300, victim.cancel, name="timer")
+    sched.run(duration_ms=1000)
+    assert sched.tasks == [] and sched.finished == [victim, timer], f"finished {[t.name for t in sched.finished]}"
+    assert victim.runs <= 15, f"victim ran {victim.runs} times, it was cancelled after 300ms"
+
+    with contextlib.redirect_stdout(io.StringIO()) as logged:
+        sched.log_stats()
+
+    assert logged.getvalue().count("\n") == 2, "log_stats left out finished tasks"
+    return results
+
+
+@benchmark("physics")
+def bench_physics(count: int) -> List[Tuple[str, int, float]]:
+    """
+    MoveDifferential on the physics model, and a batch of robots stepped in parallel
+    """
+    # third party libraries
+    import numpy as np
+    from physics import DriveBatch
+
+    # spikedev libraries
+    from spikedev.motor import SpikeLargeMotor
+    from spikedev.tank import MoveDifferential
+    from spikedev.unit import DistanceStuds
+    from spikedev.wheel import SpikeLargeWheel
+
+    hub.sim_reset()
+    hub.sim_attach_motor("A", SpikeLargeMotor.MAX_DPS)
+    hub.sim_attach_motor("E", SpikeLargeMotor.MAX_DPS)
+    hub.sim_use_physics()
+    adb = MoveDifferential(hub.port.A, hub.port.E, SpikeLargeWheel, DistanceStuds(19), motor_class=SpikeLargeMotor)
+    moves = max(1, count // 100)
+
+    def mission():
+        adb.run_for_distance(100, 50)
+        adb.turn_right(90, 30)
+
+    batch = DriveBatch(count, SpikeLargeWheel, DistanceStuds(19), SpikeLargeMotor)
+    batch.run_at_speed(50, np.linspace(-50, 50, count))
+    steps = 1000
+
+    return [
+        timed("MoveDifferential distance+turn", moves, mission),
+        timed(f"DriveBatch step ({count} robots)", steps, batch.step),
+    ]
+
+
+@benchmark("profile")
+def bench_profile(count: int) -> List[Tuple[str, int, float]]:
+    """
+    run_for_degrees against trapezoid and S-curve profiles streamed to run_at_speed, on the physics model
+    """
+    # spikedev libraries
+    from spikedev.motor import SpikeLargeMotor
+    from spikedev.profile import ProfiledMove, scurve_for, trapezoid_for
+
+    hub.sim_reset()
+    hub.sim_attach_motor("A", SpikeLargeMotor.MAX_DPS)
+    hub.sim_use_physics()
+    mtr = SpikeLargeMotor(hub.port.A)
+    degrees = 3600
+    results = []
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        (start_position, start_us, start) = (mtr.position, clock.now_us, time.perf_counter())
+        mtr.run_for_degrees(degrees, 100)
+        elapsed = time.perf_counter() - start
+
+    firmware_ms = (clock.now_us - start_us) // 1000
+    note = f"took {firmware_ms}ms, {degrees - (mtr.position - start_position)} deg off"
+    results.append((f"run_for_degrees({degrees}, 100)", 1, elapsed, note))
+
+    for make_profile in (trapezoid_for, scurve_for):
+        move = ProfiledMove(mtr, make_profile(mtr, degrees))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            move.run()
+            elapsed = time.perf_counter() - start
+
+        note = f"planned {move.planned_ms}ms, took {move.actual_ms}ms, {move.error} deg off"
+        updates = move.actual_ms // move.period_ms
+        results.append((f"  {make_profile.__name__}", updates, elapsed, note))
+
+    return results
+
+
+@benchmark("motion-queue")
+def bench_motion_queue(count: int) -> List[Tuple[str, int, float]]:
+    """
+    A mission driven move by move against the same mission queued on a MotionQueue, on the physics model
+    """
+    # spikedev libraries
+    from spikedev.motion import MotionQueue
+    from spikedev.motor import SpikeLargeMotor
+    from spikedev.tank import MoveDifferential
+    from spikedev.unit import DistanceStuds
+    from spikedev.wheel import SpikeLargeWheel
+
+    def mission(drive) -> None:
+        drive.run_for_distance(300, 80)
+        drive.run_arc_right(200, 300, 80)
+        drive.run_for_distance(300, 80)
+        drive.run_arc_left(300, 200, 80)
+        drive.turn_left(90, 40)
+        drive.run_for_distance(200, 80)
+
+    results = []
+    sim_ms = {}
+
+    for name in ("stop-and-go", "MotionQueue"):
+        hub.sim_reset()
+        hub.sim_attach_motor("A", SpikeLargeMotor.MAX_DPS)
+        hub.sim_attach_motor("E", SpikeLargeMotor.MAX_DPS)
+        hub.sim_use_physics()
+        adb = MoveDifferential(hub.port.A, hub.port.E, SpikeLargeWheel, DistanceStuds(19), motor_class=SpikeLargeMotor)
+        queue = MotionQueue(adb)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+
+            if name == "MotionQueue":
+                mission(queue)
+                queue.run()
+            else:
+                mission(adb)
+
+            elapsed = time.perf_counter() - start
+
+        sim_ms[name] = clock.now_us // 1000
+        note = f"took {sim_ms[name]}ms, ended at {adb.left_motor.position}, {adb.right_motor.position}"
+
+        if name == "MotionQueue":
+            saved_ms = sim_ms["stop-and-go"] - sim_ms[name]
+            note += f", saved {saved_ms}ms (planned {queue.planned_ms}ms vs {queue.stop_and_go_ms}ms stop-and-go)"
+
+        results.append((name, 1, elapsed, note))
+
+    # the ideal model, a negative speed must drive backwards as it does for MoveDifferential
+    hub.sim_reset()
+    hub.sim_attach_motor("A", SpikeLargeMotor.MAX_DPS)
+    hub.sim_attach_motor("E", SpikeLargeMotor.MAX_DPS)
+    adb = MoveDifferential(hub.port.A, hub.port.E, SpikeLargeWheel, DistanceStuds(19), motor_class=SpikeLargeMotor)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        adb.run_for_distance(300, -50)
+        expected = (adb.left_motor.position, adb.right_motor.position)
+        (adb.left_motor.position, adb.right_motor.position) = (0, 0)
+        queue = MotionQueue(adb)
+        queue.run_for_distance(300, -50)
+        queue.run()
+
+    for (actual, wanted) in zip((adb.left_motor.position, adb.right_motor.position), expected):
+        assert abs(actual - wanted) < 10, f"MotionQueue speed -50 ended at {actual}, MoveDifferential at {wanted}"
+
+    # a queue into a wall must stall and one that takes too long must time out
+    with contextlib.redirect_stdout(io.StringIO()):
+        # the left motor is reversed, forwards is negative
+        hub.port.A.motor.sim_jam(adb.left_motor.position - 360)
+        hub.port.E.motor.sim_jam(adb.right_motor.position + 360)
+        queue = MotionQueue(adb)
+        queue.run_for_distance(1000, 80)
+        start_ms = clock.now_us // 1000
+        start = time.perf_counter()
+        queue.run()
+        elapsed = time.perf_counter() - start
+        assert queue.stalled and not queue.timed_out, "MotionQueue did not notice the wall"
+        assert queue.actual_ms is None and queue.saved_ms is None, "MotionQueue reported a mission it did not finish"
+        assert not hub.port.A.motor.busy() and not hub.port.E.motor.busy(), "MotionQueue left the motors running"
+        note = f"stalled after {clock.now_us // 1000 - start_ms}ms"
+        results.append(("MotionQueue into a wall", 1, elapsed, note))
+
+        hub.port.A.motor.sim_jam(None)
+        hub.port.E.motor.sim_jam(None)
+        queue = MotionQueue(adb, timeout_ms=500)
+        queue.run_for_distance(2000, 80)
+        start_ms = clock.now_us // 1000
+        start = time.perf_counter()
+        queue.run()
+        elapsed = time.perf_counter() - start
+        assert queue.timed_out and not queue.stalled, "MotionQueue did not time out"
+        assert not hub.port.A.motor.busy() and not hub.port.E.motor.busy(), "MotionQueue left the motors running"
+        note = f"timed out after {clock.now_us // 1000 - start_ms}ms"
+        results.append(("MotionQueue with timeout_ms", 1, elapsed, note))
+
+    return results
+
+
+@benchmark("odometry")
+def bench_odometry(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Odometry sampled at 100Hz through a mission, against the physics model's own pose
+    """
+    # standard libraries
+    import math
+
+    # spikedev libraries
+    from spikedev.motor import SpikeLargeMotor
+    from spikedev.odometry import Odometry
+    from spikedev.tank import MoveDifferential
+    from spikedev.unit import DistanceStuds
+    from spikedev.wheel import SpikeLargeWheel
+
+    hub.sim_reset()
+    hub.sim_attach_motor("A", SpikeLargeMotor.MAX_DPS)
+    hub.sim_attach_motor("E", SpikeLargeMotor.MAX_DPS)
+    world = hub.sim_use_physics()
+    truth = world.add_chassis(hub.port.A.motor, hub.port.E.motor, SpikeLargeWheel, DistanceStuds(19))
+    adb = MoveDifferential(hub.port.A, hub.port.E, SpikeLargeWheel, DistanceStuds(19), motor_class=SpikeLargeMotor)
+    odometry = Odometry(adb, rate_hz=100)
+    clock.add_stepper(odometry.period_ms * 1000, lambda now_us, dt_us: odometry.update())
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+
+        for _ in range(4):
+            adb.run_for_distance(300, 80)
+            adb.run_arc_left(150, 200, 60)
+            adb.turn_right(45, 30)
+
+        elapsed = time.perf_counter() - start
+
+    (x, y, heading) = odometry.pose()
+    true_heading = math.degrees(truth.heading[0])
+    true_heading = (true_heading + 180) % 360 - 180
+    note = (
+        f"pose ({x:.1f}, {y:.1f}, {heading:.2f}) vs ({truth.x[0]:.1f}, {truth.y[0]:.1f}, {true_heading:.2f}), "
+        + f"{odometry.count} poses kept"
+    )
+
+    return [
+        ("mission at 100Hz", 1, elapsed, note),
+        timed("Odometry.update", count, odometry.update),
+        timed("Odometry.pose", count, odometry.pose),
+    ]
+
+
+@benchmark("pursuit")
+def bench_pursuit(count: int) -> List[Tuple[str, int, float]]:
+    """
+    A 500mm square driven with blocking moves against follow_path, on the physics model
+    """
+    # standard libraries
+    import math
+
+    # spikedev libraries
+    from spikedev.motor import SpikeLargeMotor
+    from spikedev.tank import MoveDifferential
+    from spikedev.unit import DistanceStuds
+    from spikedev.wheel import SpikeLargeWheel
+
+    results = []
+
+    for name in ("stop-and-go", "follow_path"):
+        hub.sim_reset()
+        hub.sim_attach_motor("A", SpikeLargeMotor.MAX_DPS)
+        hub.sim_attach_motor("E", SpikeLargeMotor.MAX_DPS)
+        world = hub.sim_use_physics()
+        truth = world.add_chassis(hub.port.A.motor, hub.port.E.motor, SpikeLargeWheel, DistanceStuds(19))
+        adb = MoveDifferential(hub.port.A, hub.port.E, SpikeLargeWheel, DistanceStuds(19), motor_class=SpikeLargeMotor)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+
+            if name == "follow_path":
+                follower = adb.follow_path([(500, 0), (500, 500), (0, 500), (0, 0)], 80)
+                updates = follower.actual_ms // follower.period_ms
+            else:
+                for _ in range(3):
+                    adb.run_for_distance(500, 80)
+                    adb.turn_left(90, 40)
+
+                adb.run_for_distance(500, 80)
+                updates = 1
+
+            elapsed = time.perf_counter() - start
+
+        miss_mm = math.hypot(truth.x[0], truth.y[0])
+        note = f"took {clock.now_us // 1000}ms, ended {miss_mm:.1f}mm from the start"
+        results.append((name, updates, elapsed, note))
+
+    # chained drive_to()s share the drive's odometry, so every corner is relative to the start
+    hub.sim_reset()
+    hub.sim_attach_motor("A", SpikeLargeMotor.MAX_DPS)
+    hub.sim_attach_motor("E", SpikeLargeMotor.MAX_DPS)
+    world = hub.sim_use_physics()
+    truth = world.add_chassis(hub.port.A.motor, hub.port.E.motor, SpikeLargeWheel, DistanceStuds(19))
+    adb = MoveDifferential(hub.port.A, hub.port.E, SpikeLargeWheel, DistanceStuds(19), motor_class=SpikeLargeMotor)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+
+        for (x, y) in ((500, 0), (500, 500), (0, 500), (0, 0)):
+            adb.drive_to(x, y, 80)
+
+        elapsed = time.perf_counter() - start
+
+    miss_mm = math.hypot(truth.x[0], truth.y[0])
+    assert miss_mm < 50, f"chained drive_to ended {miss_mm:.1f}mm from the start"
+    note = f"took {clock.now_us // 1000}ms, ended {miss_mm:.1f}mm from the start"
+    results.append(("chained drive_to", 4, elapsed, note))
+
+    # the ideal model, a path into a wall must stall and one that takes too long must time out
+    hub.sim_reset()
+    hub.sim_attach_motor("A", SpikeLargeMotor.MAX_DPS)
+    hub.sim_attach_motor("E", SpikeLargeMotor.MAX_DPS)
+    adb = MoveDifferential(hub.port.A, hub.port.E, SpikeLargeWheel, DistanceStuds(19), motor_class=SpikeLargeMotor)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        # the left motor is reversed, forwards is negative
+        hub.port.A.motor.sim_jam(-360)
+        hub.port.E.motor.sim_jam(360)
+        start = time.perf_counter()
+        follower = adb.drive_to(1000, 0, 60)
+        elapsed = time.perf_counter() - start
+        assert follower.stalled and not follower.timed_out, "follow_path did not notice the wall"
+        assert not hub.port.A.motor.busy() and not hub.port.E.motor.busy(), "follow_path left the motors running"
+        results.append(("follow_path into a wall", 1, elapsed, f"stalled after {follower.actual_ms}ms"))
+
+        hub.port.A.motor.sim_jam(None)
+        hub.port.E.motor.sim_jam(None)
+        start = time.perf_counter()
+        follower = adb.drive_to(2000, 0, 60, timeout_ms=500)
+        elapsed = time.perf_counter() - start
+        assert follower.timed_out and not follower.stalled, "follow_path did not time out"
+        assert not hub.port.A.motor.busy() and not hub.port.E.motor.busy(), "follow_path left the motors running"
+        results.append(("follow_path with timeout_ms", 1, elapsed, f"timed out after {follower.actual_ms}ms"))
+
+    return results
+
+
+@benchmark("gyro")
+def bench_gyro(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Open-loop turns and straights against GyroDrive on a physics chassis with the virtual IMU.
+    The drive is configured with the wrong wheel_distance and the left tyre is 3% smaller.
+    """
+    # standard libraries
+    import math
+
+    # spikedev libraries
+    from spikedev.gyro import GyroDrive
+    from spikedev.motor import SpikeLargeMotor
+    from spikedev.tank import MoveDifferential
+    from spikedev.unit import DistanceStuds
+    from spikedev.wheel import SpikeLargeWheel
+
+    results = []
+
+    for (name, closed_loop) in (("open-loop", False), ("GyroDrive", True)):
+        hub.sim_reset()
+        hub.sim_attach_motor("A", SpikeLargeMotor.MAX_DPS)
+        hub.sim_attach_motor("E", SpikeLargeMotor.MAX_DPS)
+        world = hub.sim_use_physics()
+        truth = world.add_chassis(
+            hub.port.A.motor, hub.port.E.motor, SpikeLargeWheel, DistanceStuds(19), left_forward=-0.97
+        )
+        hub.motion.sim_mount(truth)
+        adb = MoveDifferential(hub.port.A, hub.port.E, SpikeLargeWheel, DistanceStuds(17), motor_class=SpikeLargeMotor)
+        drive = GyroDrive(adb) if closed_loop else adb
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+
+            for _ in range(4):
+                drive.run_for_distance(500, 60)
+                drive.turn_right(90, 40)
+
+            elapsed = time.perf_counter() - start
+
+        # a square should bring us back to the start facing the same way
+        heading = (-math.degrees(truth.heading[0]) + 180) % 360 - 180
+        miss_mm = math.hypot(truth.x[0], truth.y[0])
+        note = f"took {clock.now_us // 1000}ms, ended {miss_mm:.0f}mm from the start, heading off by {heading:.1f} deg"
+        results.append((f"500mm square {name}", 1, elapsed, note))
+
+    # The ideal model with an unmounted IMU. Drive into a wall, which must stall rather than
+    # creep forever, then turn while the IMU never moves, which must time out.
+    hub.sim_reset()
+    hub.sim_attach_motor("A", SpikeLargeMotor.MAX_DPS)
+    hub.sim_attach_motor("E", SpikeLargeMotor.MAX_DPS)
+    drive = GyroDrive(
+        MoveDifferential(hub.port.A, hub.port.E, SpikeLargeWheel, DistanceStuds(17), motor_class=SpikeLargeMotor)
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        # the left motor is reversed, forwards is negative
+        hub.port.A.motor.sim_jam(-360)
+        hub.port.E.motor.sim_jam(360)
+        start_ms = clock.now_us // 1000
+        start = time.perf_counter()
+        drive.run_for_distance(1000, 60)
+        elapsed = time.perf_counter() - start
+        stall_ms = clock.now_us // 1000 - start_ms
+        assert drive.stalled and not drive.timed_out, "GyroDrive did not notice the wall"
+        assert not hub.port.A.motor.busy() and not hub.port.E.motor.busy(), "GyroDrive left the motors running"
+        results.append(("GyroDrive into a wall", 1, elapsed, f"stalled after {stall_ms}ms"))
+
+        hub.port.A.motor.sim_jam(None)
+        hub.port.E.motor.sim_jam(None)
+        start_ms = clock.now_us // 1000
+        start = time.perf_counter()
+        drive.turn_right(90, 40, timeout_ms=2000)
+        elapsed = time.perf_counter() - start
+        turn_ms = clock.now_us // 1000 - start_ms
+        assert drive.timed_out and not drive.stalled, "GyroDrive did not time out"
+        assert not hub.port.A.motor.busy() and not hub.port.E.motor.busy(), "GyroDrive left the motors running"
+        results.append(("GyroDrive turn, IMU stuck", 1, elapsed, f"timed out after {turn_ms}ms"))
+
+    return results
+
+
+@benchmark("pid")
+def bench_pid(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Control-loop iterations per second of PID and PIDInteger, and how closely they agree
+    """
+    # spikedev libraries
+    from spikedev.control import PID, PIDInteger
+
+    hub.sim_reset()
+    iterations = count * 100
+
+    # a noisy square wave around the setpoint, one reading every 10ms
+    readings = [50 + (20 if (i // 200) % 2 else -20) + (i * 7919) % 7 - 3 for i in range(iterations)]
+    results = []
+    outputs = {}
+    pids = {}
+
+    for pid_class in (PID, PIDInteger):
+        pid = pid_class(1.2, 0.5, 0.05, setpoint=50)
+        pids[pid_class] = pid
+        outputs[pid_class] = []
+
+        def loop() -> None:
+            for (i, reading) in enumerate(readings):
+                outputs[pid_class].append(pid.update(reading, i * 10))
+
+        (label, _, elapsed) = timed(f"{pid_class.__name__}.update", 1, loop)
+        results.append((label, iterations, elapsed))
+
+    worst = max(abs(a - b) for (a, b) in zip(outputs[PID], outputs[PIDInteger]))
+    integral = abs(pids[PID].integral - pids[PIDInteger].integral)
+    results[-1] += (f"output within {worst:.2f} of PID, integral within {integral:.3f}",)
+    return results
+
+
+@benchmark("line-follower")
+def bench_line_follower(count: int) -> List[Tuple[str, int, float]]:
+    """
+    LineFollower with one and two color sensors around a 600mm radius circle of 20mm tape on a physics chassis,
+    plus the host cost of one naive ColorSensor/MoveTank control-loop tick against LineFollower.update
+    """
+    # standard libraries
+    import math
+
+    # spikedev libraries
+    from spikedev.linefollower import LineFollower
+    from spikedev.motor import SpikeMediumMotor
+    from spikedev.sensor import ColorSensor, ColorSensorMode
+    from spikedev.tank import MoveTank
+    from spikedev.wheel import SpikeWheel
+
+    (radius_mm, ahead_mm, spacing_mm) = (600, 60, 20)
+
+    def lateral_mm(pose, sideways_mm):
+        # how far right of the middle of the tape a sensor ``sideways_mm`` left of the robot's centre line is
+        (x, y, heading) = (pose.x[0], pose.y[0], pose.heading[0])
+        sx = x + ahead_mm * math.cos(heading) - sideways_mm * math.sin(heading)
+        sy = y + ahead_mm * math.sin(heading) + sideways_mm * math.cos(heading)
+        return math.hypot(sx, sy - radius_mm) - radius_mm
+
+    def reflect(lateral):
+        # black within 5mm of the middle of the tape, white beyond 15mm, 50 on the edge
+        return 10 + int(80 * min(1, max(0, (abs(lateral) - 5) / 10)))
+
+    results = []
+
+    for sensors in (1, 2):
+        hub.sim_reset()
+        hub.sim_attach_motor("A")
+        hub.sim_attach_motor("E")
+        hub.sim_attach_sensor("C")
+        hub.sim_attach_sensor("D")
+        world = hub.sim_use_physics()
+        pose = world.add_chassis(hub.port.A.motor, hub.port.E.motor, SpikeWheel, 90)
+        errors = []
+
+        if sensors == 1:
+            # ride the inside edge of the tape, 10mm left of its middle
+            def left_reading():
+                lateral = lateral_mm(pose, 0)
+                errors.append(abs(lateral + 10))
+                return [reflect(lateral)]
+
+        else:
+
+            def left_reading():
+                errors.append(abs(lateral_mm(pose, 0)))
+                return [reflect(lateral_mm(pose, spacing_mm / 2))]
+
+        hub.port.C.device.sim_set(ColorSensorMode.REFLT, left_reading)
+        hub.port.D.device.sim_set(ColorSensorMode.REFLT, lambda: [reflect(lateral_mm(pose, -spacing_mm / 2))])
+        tank = MoveTank(hub.port.A, hub.port.E, motor_class=SpikeMediumMotor)
+        right_sensor = ColorSensor(hub.port.D) if sensors == 2 else None
+        follower = LineFollower(tank, ColorSensor(hub.port.C), right_sensor, speed=40)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            follower.run(duration_ms=5000)
+            elapsed = time.perf_counter() - start
+
+        # skip the first second while the robot settles onto the line
+        settled = errors[len(errors) // 5:]
+        note = (
+            f"followed {radius_mm * pose.heading[0]:.0f}mm of tape at {follower.frequency_hz:.0f}Hz, "
+            f"jitter avg {follower.jitter_avg_us}us max {follower.jitter_max_us}us, {follower.overruns} overruns, "
+            f"tracking error avg {sum(settled) / len(settled):.1f}mm max {max(settled):.1f}mm"
+        )
+        results.append((f"LineFollower {sensors} sensor(s), 5s", 1, elapsed, note))
+
+    # the per-tick host cost, with the ideal motor model so only spikedev is being timed
+    hub.sim_reset()
+    tank = MoveTank(hub.port.A, hub.port.E)
+    sensor = ColorSensor(hub.port.C)
+    hub.port.C.device.sim_set(ColorSensorMode.REFLT, [40])
+    follower = LineFollower(tank, sensor, speed=40)
+    iterations = count * 100
+
+    def naive() -> None:
+        for _ in range(iterations):
+            turn = (50 - sensor.reflected_light_intensity()) * 1
+            tank.run_at_speed(40 - turn, 40 + turn, acceleration=0, deceleration=0)
+
+    def update() -> None:
+        for _ in range(iterations):
+            follower.update()
+
+    for (label, func) in (("naive loop tick", naive), ("LineFollower.update", update)):
+        (label, _, elapsed) = timed(label, 1, func)
+        results.append((label, iterations, elapsed))
+
+    return results
+
+
+@benchmark("stall")
+def bench_stall(count: int) -> List[Tuple[str, int, float]]:
+    """
+    A 360 degree run_for_degrees that jams at 90 degrees under each StallPolicy, with the firmware's
+    stall report (simulated as 1s of pushing) against the software StallDetector, on the ideal and
+    the physics motor model
+    """
+    # third party libraries
+    import uasyncio
+
+    # spikedev libraries
+    from spikedev.motor import MotorCallbackEvent, MotorStalled, SpikeMediumMotor, StallPolicy
+
+    cases = (
+        ("firmware STALL, IGNORE", StallPolicy.IGNORE, False, None),
+        ("StallDetector, IGNORE", StallPolicy.IGNORE, True, None),
+        ("StallDetector, BACK_OFF", StallPolicy.BACK_OFF, True, None),
+        ("StallDetector, RETRY", StallPolicy.RETRY, True, 80),
+        ("StallDetector, RAISE", StallPolicy.RAISE, True, None),
+    )
+    cases = [(False,) + case for case in cases] + [(True,) + case for case in cases]
+    results = []
+
+    for (physics, label, policy, detect, break_power) in cases:
+        hub.sim_reset()
+        moves = count
+
+        # the physics model steps every millisecond, far slower than the ideal one
+        if physics:
+            hub.sim_use_physics()
+            label = f"physics, {label}"
+            moves = max(1, count // 100)
+
+        mtr = SpikeMediumMotor(hub.port.A)
+        mtr.set_stall_policy(policy)
+
+        if detect:
+            mtr.start_stall_detection()
+
+        def jammed_move() -> None:
+            mtr.position = 0
+            hub.port.A.motor.sim_jam(90, break_power=break_power)
+
+            try:
+                mtr.run_for_degrees(360, 50, max_power=50)
+            except MotorStalled:
+                pass
+
+        (_, operations, elapsed) = timed(label, moves, jammed_move)
+        note = f"{clock.now_us // 1000 / moves:.0f}ms per move, ended at {mtr.position} degrees"
+        note += ", stalled" if mtr.stalled else ", completed"
+        results.append((label, operations, elapsed, note))
+
+    # run_for_degrees_async must apply the stall policy just like a blocking move
+    hub.sim_reset()
+    mtr = SpikeMediumMotor(hub.port.A)
+    mtr.set_stall_policy(StallPolicy.BACK_OFF)
+    mtr.start_stall_detection()
+
+    def jammed_async_move() -> None:
+        mtr.position = 0
+        hub.port.A.motor.sim_jam(90)
+        uasyncio.run(mtr.run_for_degrees_async(360, 50, max_power=50))
+
+    (label, operations, elapsed) = timed("StallDetector, BACK_OFF, async", count, jammed_async_move)
+
+    if mtr.position != 60:
+        raise AssertionError(f"run_for_degrees_async ended at {mtr.position} degrees, BACK_OFF should leave it at 60")
+
+    note = f"{clock.now_us // 1000 / count:.0f}ms per move, ended at {mtr.position} degrees"
+    results.append((label, operations, elapsed, note))
+
+    # the INTERRUPTED report for a move the StallDetector stopped can arrive after the
+    # next move has started, it must not end that move
+    hub.sim_reset()
+    mtr = SpikeMediumMotor(hub.port.A)
+    mtr.start_stall_detection()
+    firmware = hub.port.A.motor
+    notify = firmware._notify
+
+    def late_notify(reason: int) -> None:
+        if reason == MotorCallbackEvent.INTERRUPTED and firmware._callback is not None:
+            clock.call_later(300000, firmware._callback, reason)
+        else:
+            notify(reason)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        firmware._notify = late_notify
+        firmware.sim_jam(90)
+        mtr.run_for_degrees(360, 50)
+        firmware._notify = notify
+        firmware.sim_jam(None)
+        mtr.run_for_degrees(90, -50)
+
+    if mtr.interrupted or mtr.position != 0:
+        raise AssertionError(f"a late report ended the next move at {mtr.position} degrees")
+
+    # the cost of one StallDetector.update, the per-tick overhead of watching a move
+    hub.sim_reset()
+    mtr = SpikeMediumMotor(hub.port.A)
+    mtr.start_stall_detection()
+    mtr.run_at_speed(50)
+    mtr.stall_detector.reset(50)
+    clock.advance(200000)
+    iterations = count * 100
+
+    def update() -> None:
+        for _ in range(iterations):
+            mtr.stall_detector.update()
+
+    (label, _, elapsed) = timed("StallDetector.update", 1, update)
+    results.append((label, iterations, elapsed))
+    return results
+
+
+@benchmark("motor-group")
+def bench_motor_group(count: int) -> List[Tuple[str, int, float]]:
+    """
+    A drive plus two attachment moves on the advanced driving base, one after another with block=True
+    against all three started together by MotorGroup, and the finish skew of identical moves
+    """
+    # standard libraries
+    import utime
+
+    # spikedev libraries
+    from spikedev.group import GroupWait, MotorGroup
+    from spikedev.motor import MotorCallbackEvent, SpikeLargeMotor, SpikeMediumMotor
+    from spikedev.tank import MoveDifferential
+    from spikedev.unit import DistanceStuds
+    from spikedev.wheel import SpikeLargeWheel
+
+    hub.sim_reset()
+    hub.sim_attach_motor("A", SpikeLargeMotor.MAX_DPS)
+    hub.sim_attach_motor("E", SpikeLargeMotor.MAX_DPS)
+    adb = MoveDifferential(hub.port.A, hub.port.E, SpikeLargeWheel, DistanceStuds(19), motor_class=SpikeLargeMotor)
+    rear = SpikeMediumMotor(hub.port.C)
+    front = SpikeMediumMotor(hub.port.D)
+    group = MotorGroup(adb, rear, front)
+    results = []
+
+    def serial() -> None:
+        adb.run_for_distance(300, 50)
+        rear.run_for_degrees(180, 40)
+        front.run_for_degrees(90, 40)
+
+    def grouped() -> None:
+        group.run((adb.run_for_distance, 300, 50), (rear.run_for_degrees, 180, 40), (front.run_for_degrees, 90, 40))
+
+    for (label, func) in (("block=True one after another", serial), ("MotorGroup.run", grouped)):
+        start_us = clock.now_us
+        (label, operations, elapsed) = timed(label, count, func)
+        results.append((label, operations, elapsed, f"{(clock.now_us - start_us) / 1000 / count:.0f}ms per step"))
+
+    # the same move on four motors, how far apart they finish
+    motors = [rear, front, SpikeMediumMotor(hub.port.B), SpikeMediumMotor(hub.port.F)]
+    group = MotorGroup(*motors)
+    moves = [(mtr.run_for_degrees, 360, 50) for mtr in motors]
+    skews = []
+
+    def same_moves() -> None:
+        group.run(*moves)
+        skews.append(group.skew_ms)
+
+    (label, operations, elapsed) = timed("MotorGroup identical moves", count, same_moves)
+    note = f"finish skew avg {sum(skews) / len(skews):.3f}ms max {max(skews):.3f}ms"
+    results.append((label, operations, elapsed, note))
+
+    # start the group while one member is still busy with a move of its own, the report of
+    # that move arrives after the group's have started and must not count as one of them
+    group = MotorGroup(rear, front)
+
+    for wait_for in (GroupWait.ALL, GroupWait.ANY):
+
+        def busy_start() -> None:
+            rear.run_for_degrees(3600, 50, block=False)
+            utime.sleep_ms(100)
+            group.run((rear.run_for_degrees, 180, 40), (front.run_for_degrees, 360, 40), wait_for=wait_for)
+            first = min(finish_ms for finish_ms in group.finish_ms if finish_ms is not None)
+
+            if MotorCallbackEvent.INTERRUPTED in group.reasons or first < 100:
+                raise AssertionError(f"{group}: reasons {group.reasons} finish_ms {group.finish_ms}")
+
+        label = f"MotorGroup {'ALL' if wait_for == GroupWait.ALL else 'ANY'} with a busy member"
+        (label, operations, elapsed) = timed(label, count, busy_start)
+        results.append((label, operations, elapsed, f"finish_ms {group.finish_ms}"))
+
+    return results
+
+
+@benchmark("hold-position")
+def bench_hold_position(count: int) -> List[Tuple[str, int, float]]:
+    """
+    An arm sagging at 20 deg/s for 10s after moving to -90: left alone, a user loop of blocking
+    run_to_position calls every 100ms, and Motor.hold_position on a Scheduler, the last on the
+    physics motor model too
+    """
+    # standard libraries
+    import utime
+
+    # spikedev libraries
+    from spikedev.motor import SpikeMediumMotor
+    from spikedev.scheduler import Scheduler
+
+    results = []
+
+    for label in ("no correction", "run_to_position loop", "hold_position", "physics, hold_position"):
+        hub.sim_reset()
+
+        if label.startswith("physics"):
+            hub.sim_use_physics()
+
+        arm = SpikeMediumMotor(hub.port.D)
+        worst = [0]
+
+        def watch(now_us, dt_us):
+            worst[0] = max(worst[0], abs(hub.port.D.motor._position() + 90))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            arm.run_to_position(-90, 40)
+            hub.port.D.motor.sim_load(20)
+            clock.add_stepper(1000, watch)
+            (commands, blocked_ms) = (0, 0)
+            start = time.perf_counter()
+
+            if label == "no correction":
+                utime.sleep_ms(10000)
+
+            elif label == "run_to_position loop":
+                end_ms = utime.ticks_add(utime.ticks_ms(), 10000)
+
+                while utime.ticks_diff(end_ms, utime.ticks_ms()) > 0:
+                    before_ms = utime.ticks_ms()
+                    arm.run_to_position(-90, 20)
+                    blocked_ms += utime.ticks_diff(utime.ticks_ms(), before_ms)
+                    commands += 1
+                    utime.sleep_ms(100)
+
+            else:
+                sched = Scheduler()
+                task = arm.hold_position(-90, 3, sched)
+                sched.run(duration_ms=10000)
+                commands = arm.hold_corrections
+
+            elapsed = time.perf_counter() - start
+
+        note = f"worst error {worst[0]:.0f} deg, {commands} moves"
+
+        if blocked_ms:
+            note += f", {blocked_ms}ms blocked"
+
+        if label.endswith("hold_position"):
+            note += f" from {task.runs} checks, 0ms blocked"
+
+        results.append((label, 1, elapsed, note))
+
+    return results
+
+
+@benchmark("color-sampling")
+def bench_color_sampling(count: int) -> List[Tuple[str, int, float]]:
+    """
+    A colour-sorting tick that needs reflected light, RGB and the color number, with every mode
+    switch costing 30ms of simulated settling: ColorSensor calls in turn against ColorSampler
+    """
+    # spikedev libraries
+    from spikedev.sensor import ColorReading, ColorSampler, ColorSensor, ColorSensorMode
+
+    readings = (ColorReading.REFLECTED, ColorReading.RGB, ColorReading.COLOR)
+    results = []
+
+    for label in ("ColorSensor calls", "ColorSampler derive=False", "ColorSampler derive=True"):
+        hub.sim_reset()
+        device = hub.port.B.device
+        device.sim_switch_ms = 30
+        device.sim_set(ColorSensorMode.COLOR, [5])
+        device.sim_set(ColorSensorMode.REFLT, [42])
+        device.sim_set(ColorSensorMode.RGB_I, [200, 600, 250, 430])
+        sensor = ColorSensor(hub.port.B)
+        (switches, switch_us) = (sensor.mode_switches, sensor.mode_switch_us)
+
+        if label == "ColorSensor calls":
+
+            def tick() -> None:
+                sensor.reflected_light_intensity()
+                sensor.rgb()
+                sensor.color()
+
+        else:
+            sampler = ColorSampler(sensor, readings, derive=label.endswith("True"))
+            tick = sampler.sample
+
+        (label, operations, elapsed) = timed(label, count, tick)
+        switches = (sensor.mode_switches - switches) / count
+        switch_ms = (sensor.mode_switch_us - switch_us) / 1000 / count
+        note = f"{switches:.2f} switches and {switch_ms:.1f}ms switching per tick"
+
+        if label != "ColorSensor calls":
+            note += f", reflected {sampler.reflected} color {sampler.color}"
+
+        results.append((label, operations, elapsed, note))
+
+    return results
+
+
+@benchmark("sensor-sampling")
+def bench_sensor_sampling(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Three consumers of one DistanceSensor at 50Hz each for 10s: each reading the device itself
+    against one Sensor.start_sampling task that they all read with latest()
+    """
+    # spikedev libraries
+    from spikedev.scheduler import Scheduler
+    from spikedev.sensor import DistanceSensor
+
+    results = []
+
+    for label in ("value() per consumer", "start_sampling + latest()"):
+        hub.sim_reset()
+        device = hub.port.A.device
+        reads = [0]
+        real_get = device.get
+
+        def counting_get(*args):
+            reads[0] += 1
+            return real_get(*args)
+
+        device.get = counting_get
+        device.sim_set(0, lambda: [clock.now_us // 100000 % 40 + 4])
+        sensor = DistanceSensor(hub.port.A)
+        sched = Scheduler()
+
+        if label == "value() per consumer":
+            read = sensor.value
+        else:
+            sensor.start_sampling(rate_hz=50, depth=25, scheduler=sched)
+            read = sensor.latest
+
+        for offset_ms in (0, 7, 13):
+            sched.after(offset_ms, lambda: sched.every(20, read))
+
+        start = time.perf_counter()
+        sched.run(duration_ms=10000)
+        elapsed = time.perf_counter() - start
+        results.append((label, 1, elapsed, f"{reads[0]} device reads"))
+
+    # the cost of each way of getting at a reading
+    iterations = count * 100
+
+    for (label, func) in (
+        ("Sensor.value", sensor.value),
+        ("Sensor.latest", sensor.latest),
+        ("Sensor.sample", sensor.sample),
+        ("Sensor.window(10)", lambda: sensor.window(10, out)),
+    ):
+        out = [None] * 10
+
+        def loop() -> None:
+            for _ in range(iterations):
+                func()
+
+        (label, _, elapsed) = timed(label, 1, loop)
+        results.append((label, iterations, elapsed))
+
+    return results
+
+
+@benchmark("filters")
+def bench_filters(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Samples per second through each spikedev.filters filter, and how far each output is from the
+    true distance on noisy DistanceSensor-like readings with spikes and dropouts
+    """
+    # standard libraries
+    import random
+
+    # spikedev libraries
+    from spikedev.filters import EMAFilter, FilterChain, KalmanFilter, MedianFilter, OutlierFilter
+
+    hub.sim_reset()
+    iterations = count * 100
+    rng = random.Random(7)
+
+    # the true distance steps every 200 readings, 1 in 50 readings is a spike and 1 in 100 is None
+    truth = [20 + 10 * ((i // 200) % 3) for i in range(iterations)]
+    readings = []
+
+    for distance in truth:
+        roll = rng.random()
+
+        if roll < 0.01:
+            readings.append(None)
+        elif roll < 0.03:
+            readings.append(rng.randint(4, 200))
+        else:
+            readings.append(distance + round(rng.gauss(0, 2)))
+
+    def naive_median(window: int) -> Callable[[int], int]:
+        history: List[int] = []
+
+        def update(reading: int) -> int:
+            if reading is not None:
+                history.append(reading)
+
+            recent = sorted(history[-window:])
+            return recent[len(recent) // 2]
+
+        return update
+
+    results = []
+
+    for (label, update) in (
+        ("raw readings", lambda reading: reading),
+        ("sorted(last 9), 2 new lists per sample", naive_median(9)),
+        ("MedianFilter(9)", MedianFilter(9).update),
+        ("EMAFilter(0.2)", EMAFilter(0.2).update),
+        ("KalmanFilter(4, 0.05)", KalmanFilter(4, 0.05).update),
+        ("OutlierFilter(10)", OutlierFilter(10).update),
+        ("Outlier + Median(5) + EMA(0.5)", FilterChain(OutlierFilter(10), MedianFilter(5), EMAFilter(0.5)).update),
+    ):
+        outputs: List[int] = []
+
+        def loop() -> None:
+            for reading in readings:
+                outputs.append(update(reading))
+
+        (label, _, elapsed) = timed(label, 1, loop)
+
+        # error once each step has settled, skipping the first 20 readings after it
+        errors = [
+            (output - distance) ** 2
+            for (i, (output, distance)) in enumerate(zip(outputs, truth))
+            if i % 200 >= 20 and output is not None
+        ]
+        rms = (sum(errors) / len(errors)) ** 0.5
+        results.append((label, iterations, elapsed, f"settled RMS error {rms:.2f}"))
+
+    return results
+
+
+@benchmark("rgb2lab")
+def bench_rgb2lab(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Conversions per second of rgb2lab_reference, the lookup table rgb2lab and rgb2lab_batch, and a
+    check that the other two agree with rgb2lab_reference to within RGB2LAB_TOLERANCE
+    """
+    # standard libraries
+    import random
+
+    # spikedev libraries
+    from spikedev import sensor
+    from spikedev.sensor import RGB2LAB_TOLERANCE, rgb2lab, rgb2lab_batch, rgb2lab_reference
+
+    hub.sim_reset()
+    rng = random.Random(11)
+
+    # every 5th value of each channel, plus channels above 255 as scale_by_intensity produces
+    steps = range(0, 256, 5)
+    samples = [(red, green, blue) for red in steps for green in steps for blue in steps]
+    samples += [(rng.randint(0, 800), rng.randint(0, 800), rng.randint(0, 800)) for _ in range(count * 50)]
+    rgb2lab(0, 0, 0)
+    results = []
+    outputs = {}
+
+    for func in (rgb2lab_reference, rgb2lab):
+        outputs[func] = []
+
+        def loop() -> None:
+            for (red, green, blue) in samples:
+                outputs[func].append(func(red, green, blue))
+
+        (label, _, elapsed) = timed(func.__name__, 1, loop)
+
+        # pow() is a fast C call on the host but slow on the hub, count how many each makes
+        pow_calls = [0]
+
+        def counting_pow(*args: float) -> float:
+            pow_calls[0] += 1
+            return pow(*args)
+
+        sensor.pow = counting_pow
+
+        for (red, green, blue) in samples:
+            func(red, green, blue)
+
+        del sensor.pow
+        results.append((label, len(samples), elapsed, f"{pow_calls[0] / len(samples):.2f} pow() per conversion,"))
+
+    try:
+        (label, _, elapsed) = timed("rgb2lab_batch", 1, lambda: outputs.update({rgb2lab_batch: rgb2lab_batch(samples)}))
+    except ImportError:
+        results.append(("rgb2lab_batch", 0, 0, "skipped, needs numpy"))
+    else:
+        results.append((label, len(samples), elapsed))
+
+    # a negative channel is clamped to 0 rather than indexing the table from the end
+    for channels in ((-1, 0, 0), (0, -40, 0), (0, 0, -0.5)):
+        if rgb2lab(*channels) != rgb2lab(0, 0, 0):
+            raise AssertionError(f"rgb2lab{channels} is {rgb2lab(*channels)}, not black")
+
+    reference = outputs.pop(rgb2lab_reference)
+
+    for (func, lab) in outputs.items():
+        worst = max(abs(x - y) for (converted, expected) in zip(lab, reference) for (x, y) in zip(converted, expected))
+
+        if worst > RGB2LAB_TOLERANCE:
+            raise AssertionError(f"{func.__name__} is {worst} from rgb2lab_reference, more than {RGB2LAB_TOLERANCE}")
+
+        for (index, result) in enumerate(results):
+            if result[0] == func.__name__:
+                results[index] += (f"within {worst:.2g} of rgb2lab_reference",)
+
+    results[0] += ("the reference",)
+
+    return results
+
+
+@benchmark("color-classifier")
+def bench_color_classifier(count: int) -> List[Tuple[str, int, float]]:
+    """
+    Calibrate a ColorClassifier on six simulated mat colors, then classifications per second by
+    grid lookup against comparing with every centroid, on readings of those colors and on any color
+    """
+    # standard libraries
+    import random
+    import tempfile
+
+    # spikedev libraries
+    from spikedev.colorclassifier import AMBIGUOUS, ColorClassifier
+    from spikedev.sensor import ColorSensor, ColorSensorMode, _rgb_from_rgbi, rgb2lab
+
+    hub.sim_reset()
+    rng = random.Random(5)
+    device = hub.port.B.device
+    sensor = ColorSensor(hub.port.B)
+    classifier = ColorClassifier()
+
+    # RGB_I readings of each color, red, green and blue 0 to 1024 then the intensity
+    mat = {
+        "black": (60, 60, 70, 380),
+        "white": (900, 900, 880, 1000),
+        "red": (700, 120, 110, 500),
+        "green": (120, 500, 180, 450),
+        "blue": (110, 200, 650, 420),
+        "yellow": (850, 760, 150, 800),
+    }
+
+    def noisy(rgbi: Tuple[int, int, int, int]) -> List[int]:
+        return [max(1, int(value * rng.uniform(0.93, 1.07))) for value in rgbi]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for (name, rgbi) in mat.items():
+            device.sim_set(ColorSensorMode.RGB_I, lambda rgbi=rgbi: noisy(rgbi))
+            classifier.calibrate(sensor, name, samples=30)
+
+    (label, _, elapsed) = timed("ColorClassifier.train", 1, classifier.train)
+    ambiguous = classifier.grid.count(AMBIGUOUS)
+    results = [(label, 1, elapsed, f"{ambiguous} of {len(classifier.grid)} cells ambiguous")]
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "colors.bin")
+        classifier.save(filename)
+        size = os.path.getsize(filename)
+        (label, _, elapsed) = timed("ColorClassifier.load", 1, lambda: ColorClassifier.load(filename))
+        results.append((label, 1, elapsed, f"{size} bytes"))
+
+    # fresh readings of the calibrated colors, and of any color at all
+    iterations = count * 20
+    readings = {
+        "mat": [rgb2lab(*_rgb_from_rgbi(noisy(rgbi), True)) for _ in range(iterations) for rgbi in mat.values()],
+        "any": [rgb2lab(rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)) for _ in range(6 * iterations)],
+    }
+
+    for (kind, labs) in readings.items():
+        names = {}
+
+        for (label, func) in (
+            ("nearest centroid", lambda lab: classifier.names[classifier.nearest(lab)]),
+            ("grid lookup", classifier.classify),
+        ):
+            classifier.fallbacks = 0
+
+            def loop() -> None:
+                names[label] = [func(lab) for lab in labs]
+
+            (_, _, elapsed) = timed(label, 1, loop)
+            note = f"{classifier.fallbacks / len(labs):.1%} fell back" if label == "grid lookup" else ""
+            results.append((f"{label}, {kind} colors", len(labs), elapsed, note))
+
+        if names["grid lookup"] != names["nearest centroid"]:
+            raise AssertionError(f"grid lookup and nearest centroid disagree on {kind} colors")
+
+    return results
+
+
+def spike_sim_benchmark(names: List[str], count: int) -> bool:
+    """
+    Run the benchmarks in ``names`` and print a summary of each
+    """
+    for name in names:
+        if name not in BENCHMARKS:
+            log.error(f"unknown benchmark '{name}', must be one of {', '.join(sorted(BENCHMARKS))}")
+            return False
+
+    for name in names:
+        # every benchmark starts with hub.sim_reset() so the clock starts at zero
+        results = BENCHMARKS[name](count)
+        sim_secs = clock.now_us / 1000000
+        print(f"{name} ({sim_secs:.1f}s of simulated time)")
+
+        for (label, operations, elapsed, *note) in results:
+            rate = operations / elapsed if elapsed else float("inf")
+            print(f"    {label:40} {operations:8d} ops {elapsed:8.3f}s {rate:12.1f} ops/sec {' '.join(note)}".rstrip())
+
+    return True
+
+
+if __name__ == "__main__":
+
+    # configure logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(filename)16s %(levelname)8s: %(message)s")
+    log = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("benchmark", type=str, nargs="*", help="benchmarks to run, defaults to all of them")
+    parser.add_argument("--count", type=int, default=1000, help="iterations per benchmark")
+    args = parser.parse_args()
+
+    if not spike_sim_benchmark(args.benchmark or sorted(BENCHMARKS), args.count):
+        sys.exit(1)
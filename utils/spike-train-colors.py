@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+"""
+Train a spikedev ColorClassifier from the color samples a program logged and save it for the hub
+"""
+
+# standard libraries
+import argparse
+import logging
+import os
+import sys
+from typing import Dict, List, Tuple
+
+log = logging.getLogger(__name__)
+
+REPO_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIRECTORY)
+
+# spikedev imports utime, the simulator's stands in for it on a computer
+sys.path.insert(0, os.path.join(REPO_DIRECTORY, "simulator"))
+
+# spikedev libraries
+from spikedev.colorclassifier import AMBIGUOUS, SAMPLE_PREFIX, ColorClassifier  # noqa: E402
+
+
+def read_samples(filenames: List[str]) -> List[Tuple[str, Tuple[float, float, float]]]:
+    """
+    Return the ``(name, (L, a, b))`` of every line ``ColorClassifier.calibrate`` logged in ``filenames``
+    """
+    samples = []
+
+    for filename in filenames:
+        with open(filename, "r") as fh:
+            for (line_number, line) in enumerate(fh, 1):
+                if SAMPLE_PREFIX not in line:
+                    continue
+
+                fields = line.split(SAMPLE_PREFIX, 1)[1].split()
+
+                if len(fields) != 4:
+                    log.warning(f"{filename}:{line_number}: ignoring malformed sample '{line.strip()}'")
+                    continue
+
+                samples.append((fields[0], (float(fields[1]), float(fields[2]), float(fields[3]))))
+
+    return samples
+
+
+def spike_train_colors(filenames: List[str], output: str, step: int) -> bool:
+    """
+    Train a ColorClassifier on the samples logged in ``filenames`` and save it to ``output``
+    """
+    samples = read_samples(filenames)
+
+    if not samples:
+        log.error(f"no '{SAMPLE_PREFIX}' lines found in {', '.join(filenames)}")
+        return False
+
+    classifier = ColorClassifier(step)
+
+    for (name, lab) in samples:
+        classifier.add_sample(name, lab)
+
+    classifier.train()
+    classifier.save(output)
+
+    # how the samples themselves classify, colors that get mixed up need more or better samples
+    confusion: Dict[str, Dict[str, int]] = {name: {} for name in classifier.names}
+
+    for (name, lab) in samples:
+        predicted = classifier.classify(lab)
+        confusion[name][predicted] = confusion[name].get(predicted, 0) + 1
+
+    for (name, centroid) in zip(classifier.names, classifier.centroids):
+        counts = confusion[name]
+        correct = counts.get(name, 0)
+        total = sum(counts.values())
+        mistakes = ", ".join(f"{count} as {other}" for (other, count) in sorted(counts.items()) if other != name)
+        log.info(
+            f"{name:12} L {centroid[0]:6.2f} a {centroid[1]:7.2f} b {centroid[2]:7.2f}, "
+            f"{correct}/{total} samples correct {mistakes}".rstrip()
+        )
+
+    ambiguous = classifier.grid.count(AMBIGUOUS)
+    log.info(
+        f"wrote {output}, {os.path.getsize(output)} bytes, {len(classifier.names)} colors, "
+        f"{ambiguous} of {len(classifier.grid)} grid cells ambiguous"
+    )
+    return True
+
+
+if __name__ == "__main__":
+
+    # configure logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(filename)16s %(levelname)8s: %(message)s")
+    log = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filenames", type=str, nargs="+", help="output of programs that ran ColorClassifier.calibrate")
+    parser.add_argument("--output", type=str, default="colors.bin", help="the file to copy to the hub")
+    parser.add_argument("--step", type=int, default=8, help="the side of each grid cube in LAB units")
+    args = parser.parse_args()
+
+    if not spike_train_colors(args.filenames, args.output, args.step):
+        sys.exit(1)